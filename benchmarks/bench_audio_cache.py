@@ -0,0 +1,139 @@
+"""
+Benchmark AudioCache vs load_many lama (decode semua MP3 ke pygame Sound
+setiap boot) pada clip di assets/sounds.
+
+Tiap skenario jalan di proses baru supaya RSS tidak tercampur:
+- lama        : mixer.Sound(path) untuk semua clip (perilaku sebelum cache)
+- cache dingin: boot pertama, decode sekali lalu tulis PCM ke cache
+- cache hangat: boot berikutnya, hanya hashing, belum ada clip resident
+- hangat+play : cache hangat lalu semua clip diputar sekali (lazy load, LRU)
+
+Jalankan (SDL_AUDIODRIVER=dummy di mesin tanpa sound card):
+    python benchmarks/bench_audio_cache.py [batas_resident_kb]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SOUNDS_DIR = Path(__file__).resolve().parents[1] / "assets" / "sounds"
+SCENARIOS = ("lama", "cache dingin", "cache hangat", "hangat+play")
+
+
+def rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def child(
+    scenario: str, cache_dir: str, max_resident_kb: int
+) -> None:
+    import pygame
+
+    from dispenser_carwash.hardware.audio_cache import AudioCache
+
+    pygame.mixer.init()
+    files = {
+        f.stem: str(f)
+        for f in sorted(SOUNDS_DIR.iterdir())
+        if f.suffix == ".mp3"
+    }
+    rss_before = rss_kb()
+
+    started = time.perf_counter()
+    keep = []
+    if scenario == "lama":
+        keep = [pygame.mixer.Sound(path) for path in files.values()]
+    else:
+        cache = AudioCache(
+            pygame, Path(cache_dir), max_resident_kb * 1024
+        )
+        cache.add(files)
+    boot = time.perf_counter() - started
+
+    first_play = 0.0
+    if scenario == "hangat+play":
+        for name in files:
+            t = time.perf_counter()
+            cache.get(name)
+            first_play = max(first_play, time.perf_counter() - t)
+
+    print(
+        json.dumps(
+            {
+                "clips": len(files),
+                "boot_ms": boot * 1e3,
+                "rss_kb": rss_kb() - rss_before,
+                "first_play_ms": first_play * 1e3,
+                "resident_kb": (
+                    0
+                    if scenario == "lama"
+                    else cache.resident_bytes() // 1024
+                ),
+            }
+        )
+    )
+    del keep
+
+
+def run(scenario: str, cache_dir: str, max_resident_kb: int) -> dict:
+    out = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--child",
+            scenario,
+            cache_dir,
+            str(max_resident_kb),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=dict(
+            os.environ,
+            SDL_AUDIODRIVER=os.environ.get(
+                "SDL_AUDIODRIVER", "dummy"
+            ),
+        ),
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    max_resident_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = {
+            name: run(name, cache_dir, max_resident_kb)
+            for name in SCENARIOS
+        }
+
+    print(
+        f"clip: {results['lama']['clips']}  batas resident: {max_resident_kb} KB\n"
+    )
+    print(
+        f"{'skenario':<14} {'boot (ms)':>10} {'RSS (KB)':>10} {'resident':>10} {'play pertama':>13}"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:<14} {r['boot_ms']:10.1f} {r['rss_kb']:10d} "
+            f"{r['resident_kb']:10d} {r['first_play_ms']:10.2f} ms"
+        )
+    old, warm = results["lama"], results["cache hangat"]
+    print(
+        f"\nboot hangat {old['boot_ms'] / max(warm['boot_ms'], 1e-3):.0f}x lebih cepat, "
+        f"RSS -{old['rss_kb'] - results['hangat+play']['rss_kb']} KB setelah semua clip diputar"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        main()
@@ -0,0 +1,141 @@
+"""
+Benchmark EAN-13 (kode/detik): implementasi lama TicketGenerator vs
+modul ean13 (tabel, satu kode) vs API bulk NumPy.
+
+Jalankan:
+    python benchmarks/bench_ean13.py [jumlah_kode]
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from dispenser_carwash.utils import ean13
+
+
+def legacy_checksum(number: str) -> int:
+    """Salinan TicketGenerator._checksum_ean_13 sebelum modul ean13."""
+    if len(number) != 12 or not number.isdigit():
+        raise ValueError(
+            "EAN-13 checksum calculation requires exactly 12 digits"
+        )
+    sum_odd = sum(int(number[i]) for i in range(0, 12, 2))
+    sum_even = sum(int(number[i]) for i in range(1, 12, 2))
+    return (10 - ((sum_odd + 3 * sum_even) % 10)) % 10
+
+
+def legacy_make_code(service_id: int, sequence: int) -> str:
+    raw_number = f"899{service_id:02d}{sequence:07d}"
+    return f"{raw_number}{legacy_checksum(raw_number)}"
+
+
+def legacy_is_valid(code: str) -> bool:
+    return legacy_checksum(code[:12]) == int(code[12])
+
+
+def rate(
+    label: str, n: int, elapsed: float, baseline: float = 0.0
+) -> float:
+    per_second = n / elapsed
+    speedup = f" ({per_second / baseline:6.1f}x)" if baseline else ""
+    print(f"{label:<32}: {per_second:>14,.0f} kode/s{speedup}")
+    return per_second
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(1)
+    service_ids = [rng.randint(1, 20) for _ in range(n)]
+    sequences = [rng.randint(0, ean13.MAX_SEQUENCE) for _ in range(n)]
+    pairs = list(zip(service_ids, sequences))
+
+    print(f"kode: {n}\n")
+
+    # --- generate ---
+    start = time.perf_counter()
+    legacy_codes = [legacy_make_code(s, q) for s, q in pairs]
+    base = rate("generate lama", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    codes = [ean13.make_code(s, q) for s, q in pairs]
+    rate(
+        "generate ean13.make_code",
+        n,
+        time.perf_counter() - start,
+        base,
+    )
+
+    sid_array = np.array(service_ids, dtype=np.int64)
+    seq_array = np.array(sequences, dtype=np.int64)
+    start = time.perf_counter()
+    bulk_codes = ean13.generate_bulk(sid_array, seq_array)
+    rate(
+        "generate ean13.generate_bulk",
+        n,
+        time.perf_counter() - start,
+        base,
+    )
+
+    assert codes == legacy_codes == ean13.to_strings(bulk_codes)
+
+    # --- validate ---
+    print()
+    start = time.perf_counter()
+    assert all(legacy_is_valid(c) for c in legacy_codes)
+    base = rate("validate lama", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    assert all(ean13.is_valid(c) for c in codes)
+    rate(
+        "validate ean13.is_valid",
+        n,
+        time.perf_counter() - start,
+        base,
+    )
+
+    start = time.perf_counter()
+    assert ean13.validate_bulk(bulk_codes).all()
+    rate(
+        "validate ean13.validate_bulk",
+        n,
+        time.perf_counter() - start,
+        base,
+    )
+
+    # --- decode (service_id, sequence) ---
+    print()
+    start = time.perf_counter()
+    decoded = [
+        (int(c[3:5]), int(c[5:12]))
+        for c in legacy_codes
+        if legacy_is_valid(c)
+    ]
+    base = rate(
+        "decode lama (validate + slice)",
+        n,
+        time.perf_counter() - start,
+    )
+
+    start = time.perf_counter()
+    assert [ean13.decode(c) for c in codes] == decoded
+    rate("decode ean13.decode", n, time.perf_counter() - start, base)
+
+    start = time.perf_counter()
+    bulk_sids, bulk_seqs, valid = ean13.decode_bulk(bulk_codes)
+    rate(
+        "decode ean13.decode_bulk",
+        n,
+        time.perf_counter() - start,
+        base,
+    )
+    assert (
+        valid.all()
+        and (bulk_sids == sid_array).all()
+        and (bulk_seqs == seq_array).all()
+    )
+
+
+if __name__ == "__main__":
+    main()
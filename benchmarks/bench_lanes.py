@@ -0,0 +1,319 @@
+"""
+Benchmark end-to-end MainProcess di atas hardware simulasi: N lane,
+traffic generator per lane, upload ke StubServer lewat async network worker.
+
+Laporan per lane:
+- kendaraan/jam (waktu simulasi) dan tiket
+- latency tombol -> gate terbuka dan lama tiap state (p50/p95/p99)
+- CPU thread lane (ms CPU per kendaraan dan % dari waktu dinding)
+
+Jalankan:
+    python benchmarks/bench_lanes.py [jumlah_lane] [kendaraan_per_lane] [profil] [time_scale] [event_dir]
+    profil: normal | rush | saturate (default saturate)
+    event_dir: kalau diisi, event log ditulis ke sini (lihat tools/event_report.py)
+    DISPENSER_PROFILE=1: tambah tabel wall/CPU per state handler & call hardware
+"""
+
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from stub_server import StubServer
+from traffic import PROFILES, TrafficGenerator
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.hardware.output_scheduler import (
+    OutputScheduler,
+)
+from dispenser_carwash.hardware.simulation import (
+    SilentSound,
+    SimPrinter,
+    SimulatedLane,
+)
+from dispenser_carwash.processes.async_network_process import (
+    async_network_process,
+)
+from dispenser_carwash.processes.lane import AckRouter, LaneScheduler
+from dispenser_carwash.processes.main_process import (
+    Event,
+    InitData,
+    MainFSM,
+    MainProcess,
+    NetworkManager,
+    State,
+)
+from dispenser_carwash.utils.event_log import EventRecorder
+from dispenser_carwash.utils.init_cache import InitDataCache
+from dispenser_carwash.utils.outbox import TicketOutbox
+from dispenser_carwash.utils.profiling import HotPathStats
+from dispenser_carwash.utils.ticket_sequence import TicketSequence
+
+# Durasi clip (detik dunia nyata), dikali time_scale
+SOUND_SECONDS = {
+    "welcome": 3.0,
+    "service_basic": 1.5,
+    "service_complete": 1.5,
+    "service_perfect": 1.5,
+    "service_cuci_motor": 1.5,
+    "taking_ticket": 2.0,
+}
+
+
+class LaneProbe:
+    """Listener MainFSM: catat lama tiap state dan beri tahu traffic generator."""
+
+    def __init__(self, fsm: MainFSM):
+        self._fsm = fsm
+        self._cond = threading.Condition()
+        self._entered: Dict[str, float] = {
+            fsm.state.name: time.monotonic()
+        }
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        fsm.add_listener(self._on_transition)
+
+    def _on_transition(
+        self, previous: State, event: Event, new: State
+    ) -> None:
+        now = time.monotonic()
+        with self._cond:
+            entered = self._entered.get(previous.name)
+            if entered is not None:
+                self.durations[previous.name].append(now - entered)
+            self._entered[new.name] = now
+            self._cond.notify_all()
+
+    def wait_state(self, name: str, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._fsm.state.name == name, timeout
+            )
+
+    def last_entered(self, name: str) -> float:
+        with self._cond:
+            return self._entered[name]
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "        -"
+    ordered = sorted(values)
+
+    def pick(p: float) -> float:
+        return (
+            ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+            * 1e3
+        )
+
+    return f"{pick(0.50):7.2f} {pick(0.95):7.2f} {pick(0.99):7.2f}"
+
+
+def thread_cpu_seconds(thread: threading.Thread) -> float:
+    return time.clock_gettime(
+        time.pthread_getcpuclockid(thread.ident)
+    )
+
+
+def main() -> None:
+    n_lanes = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    vehicles = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    profile = PROFILES[
+        sys.argv[3] if len(sys.argv) > 3 else "saturate"
+    ]
+    time_scale = float(sys.argv[4]) if len(sys.argv) > 4 else 0.01
+    events = EventRecorder(sys.argv[5]) if len(sys.argv) > 5 else None
+    if not 1 <= n_lanes <= 4:
+        sys.exit(
+            "jumlah_lane harus 1..4 (7 pin mock per lane, GPIO0..27)"
+        )
+
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        StubServer(latency=0.02) as server,
+    ):
+        Settings.System.INIT_CACHE_FILE = os.path.join(
+            tmp, "init_data.json"
+        )
+        Settings.System.SEQUENCE_FILE = os.path.join(
+            tmp, "ticket_sequence"
+        )
+        outbox_path = os.path.join(tmp, "outbox.sqlite3")
+        Settings.Server.INIT_DATA_URL = f"{server.url}/api/init-data"
+        Settings.Server.SEND_URL = f"{server.url}/api/tickets"
+
+        to_net: "queue.Queue" = queue.Queue()
+        from_net: "queue.Queue" = queue.Queue()
+        names = [f"lane{i + 1}" for i in range(n_lanes)]
+        router = AckRouter(from_net, names)
+        init_data = InitData(
+            Settings.Server.INIT_DATA_URL,
+            cache=InitDataCache(),
+            fetch_on_init=False,
+        )
+        sequence = TicketSequence()
+        outbox = TicketOutbox(outbox_path)
+        output_scheduler = OutputScheduler()
+        sounds = {k: v * time_scale for k, v in SOUND_SECONDS.items()}
+
+        sim_lanes: List[SimulatedLane] = []
+        processes: List[MainProcess] = []
+        probes: List[LaneProbe] = []
+        hot_paths: List[HotPathStats] = []
+        for i, name in enumerate(names):
+            base = (
+                i * 7
+            )  # MockFactory hanya kenal GPIO0..27 -> maksimal 4 lane
+            sim = SimulatedLane(
+                name,
+                loop_pin=base,
+                button_pins={
+                    f"service_{k + 1}": base + 1 + k for k in range(4)
+                },
+                gate_pin=base + 5,
+                led_pin=base + 6,
+                output_scheduler=output_scheduler,
+                printer=SimPrinter(),
+                sound=SilentSound(sounds),
+            )
+            fsm = MainFSM(name)
+            probes.append(LaneProbe(fsm))
+            sim_lanes.append(sim)
+            hot_path = (
+                HotPathStats(name)
+                if Settings.Profiling.ENABLED
+                else None
+            )
+            if hot_path is not None:
+                hot_paths.append(hot_path)
+            processes.append(
+                MainProcess(
+                    to_net,
+                    router.queue_for(name),
+                    threading.Lock(),
+                    sim.periph,
+                    fsm,
+                    outbox=outbox,
+                    lane=name,
+                    init_data=init_data,
+                    sequence=sequence,
+                    events=events,
+                    profile=hot_path,
+                )
+            )
+
+        network = NetworkManager(
+            Settings.Server.SEND_URL, retries=1, delay=0
+        )
+        net_thread = threading.Thread(
+            target=async_network_process,
+            args=(network, to_net, from_net, outbox_path),
+            name="network",
+            daemon=True,
+        )
+        net_thread.start()
+
+        LaneScheduler(processes, init_data, router).start()
+        lane_threads = {
+            t.name: t
+            for t in threading.enumerate()
+            if t.name.startswith("lane-")
+        }
+        for probe in probes:
+            probe.wait_state("IDLE", 5.0)
+        cpu_before = {
+            name: thread_cpu_seconds(lane_threads[f"lane-{name}"])
+            for name in names
+        }
+
+        generators = [
+            TrafficGenerator(
+                sim, profile, vehicles, probe, time_scale, seed=i
+            )
+            for i, (sim, probe) in enumerate(zip(sim_lanes, probes))
+        ]
+        started = time.monotonic()
+        for generator in generators:
+            generator.start()
+        for generator in generators:
+            generator.join()
+        elapsed = time.monotonic() - started
+
+        # Tunggu upload selesai supaya angka server lengkap
+        deadline = time.monotonic() + 10
+        while outbox.count() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        print(
+            f"lane: {n_lanes}  kendaraan/lane: {vehicles}  profil: {profile.name}  "
+            f"time_scale: {time_scale}  waktu: {elapsed:.2f} s "
+            f"(simulasi {elapsed / time_scale / 3600:.2f} jam)"
+        )
+        print(
+            f"tiket di server: {len(server.tickets)}  sisa outbox: {outbox.count()}\n"
+        )
+
+        for name, sim, probe, generator in zip(
+            names, sim_lanes, probes, generators
+        ):
+            served = [
+                r for r in generator.results if r.gate_at is not None
+            ]
+            left = sum(
+                r.left_without_selecting for r in generator.results
+            )
+            cpu = (
+                thread_cpu_seconds(lane_threads[f"lane-{name}"])
+                - cpu_before[name]
+            )
+            per_hour = len(served) / (elapsed / time_scale) * 3600
+
+            print(
+                f"[{name}] dilayani {len(served)}  pergi {left}  macet {generator.stuck}  "
+                f"tiket dicetak {sim.periph.printer.tickets}  "
+                f"kendaraan/jam {per_hour:,.0f}"
+            )
+            print(
+                f"[{name}] CPU lane {cpu * 1e3:.1f} ms "
+                f"({cpu / max(1, len(generator.results)) * 1e3:.3f} ms/kendaraan, "
+                f"{cpu / elapsed * 100:.1f}% dari waktu dinding)"
+            )
+            print(
+                f"[{name}] {'latency (ms)':<22} {'p50':>7} {'p95':>7} {'p99':>7}"
+            )
+            print(
+                f"[{name}] {'tombol -> gate':<22} "
+                f"{percentiles([r.gate_at - r.pressed_at for r in served])}"
+            )
+            for state in State:
+                # State yang lamanya ditentukan pelanggan / suara tidak menarik di sini
+                if state in (
+                    State.IDLE,
+                    State.VEHICLE_STAYING,
+                    State.SELECTING_SERVICE,
+                ):
+                    continue
+                print(
+                    f"[{name}] {state.name:<22} {percentiles(probe.durations[state.name])}"
+                )
+            print()
+
+        for hot_path in hot_paths:
+            print(hot_path.summary() + "\n")
+
+        # Hentikan worker upload sebelum outbox ditutup & tempdir dihapus
+        to_net.put("__STOP__")
+        net_thread.join(timeout=10)
+        outbox.close()
+        if events is not None:
+            events.close()
+            print(
+                f"event log: {events.written} record, hilang {events.dropped}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark PhraseComposer: latency announce() vs play() clip tunggal.
+
+Clip kata dibuat sintetis (nada 0.25-0.45 s, WAV) di folder sementara,
+karena repo belum punya rekaman kata. Yang diukur:
+- compose dingin  : susun frasa pertama kali (baca PCM + gabung + Sound)
+- play()          : clip service tunggal yang sudah resident
+- announce()      : frasa yang sudah disiapkan (prepare_phrases)
+- ketepatan sample: panjang frasa == jumlah panjang clip kata
+
+Jalankan (SDL_AUDIODRIVER=dummy di mesin tanpa sound card):
+    python benchmarks/bench_phrase.py [iterasi]
+"""
+
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from dispenser_carwash.hardware.audio_cache import AudioCache
+from dispenser_carwash.hardware.phrase import (
+    WORD_PREFIX,
+    PhraseComposer,
+    number_words,
+    service_announcement,
+)
+from dispenser_carwash.hardware.sound import PyGameSound
+
+RATE = 44100
+SERVICES = [
+    ("Cuci Motor", 15000),
+    ("Basic", 35000),
+    ("Complete", 55000),
+    ("Perfect", 125000),
+]
+
+
+def write_tone(path: Path, seconds: float, freq: float) -> None:
+    frames = int(RATE * seconds)
+    data = b"".join(
+        struct.pack(
+            "<h", int(8000 * math.sin(2 * math.pi * freq * i / RATE))
+        )
+        for i in range(frames)
+    )
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(data)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1e6
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pygame.mixer.init(frequency=RATE)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        phrases = [
+            service_announcement(name, price)
+            for name, price in SERVICES
+        ]
+        vocabulary = sorted(
+            {word for words in phrases for word in words}
+        )
+        words = {}
+        for i, word in enumerate(vocabulary):
+            words[word] = str(tmp_path / f"{word}.wav")
+            write_tone(
+                Path(words[word]), 0.25 + (i % 5) * 0.05, 300 + 20 * i
+            )
+        write_tone(tmp_path / "service_basic.wav", 1.5, 440)
+
+        cache = AudioCache(pygame, tmp_path / "cache")
+        composer = PhraseComposer(pygame, cache)
+        sound = PyGameSound(pygame, cache=cache, phrases=composer)
+        sound.load_many(
+            {"service_basic": str(tmp_path / "service_basic.wav")}
+        )
+        sound.load_words(words)
+
+        started = time.perf_counter()
+        sound.prepare_phrases(phrases)
+        cold = (time.perf_counter() - started) / len(phrases)
+
+        for words_ in phrases:
+            expected = sum(
+                len(cache.raw(WORD_PREFIX + w)) for w in words_
+            )
+            assert (
+                len(composer.compose(words_).get_raw()) == expected
+            ), words_
+
+        timings = {"play()": [], "announce()": []}
+        for i in range(iterations):
+            t = time.perf_counter()
+            sound.play("service_basic")
+            timings["play()"].append(time.perf_counter() - t)
+            sound.stop()
+
+            t = time.perf_counter()
+            sound.announce(phrases[i % len(phrases)])
+            timings["announce()"].append(time.perf_counter() - t)
+            sound.stop()
+
+    print(
+        f"kosakata: {len(vocabulary)} kata  frasa: {len(phrases)}  iterasi: {iterations}"
+    )
+    print(
+        f"contoh  : {' '.join(phrases[3])}  ({number_words(125000)})"
+    )
+    print(
+        f"compose dingin: {cold * 1e3:.2f} ms/frasa  cache frasa: {composer.cached_bytes() // 1024} KB"
+    )
+    print("panjang frasa == jumlah clip kata: ok\n")
+    print(f"{'(us)':<12} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, values in timings.items():
+        print(
+            f"{name:<12} {percentile(values, 0.5):8.1f} "
+            f"{percentile(values, 0.95):8.1f} {percentile(values, 0.99):8.1f}"
+        )
+    os._exit(
+        0
+    )  # thread end event pygame daemon, tidak perlu ditunggu
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark render tiket: layout lama (panggilan driver satu per satu)
+vs TicketTemplate yang sudah di-compile.
+
+Jalankan:
+    python benchmarks/bench_ticket_template.py [jumlah_tiket]
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+from dispenser_carwash.hardware.printer import EscposBufferDriver
+from dispenser_carwash.processes.ticket_template import TicketTemplate
+
+
+class CountingDriver(EscposBufferDriver):
+    """Buffer driver yang menghitung jumlah panggilan (= round-trip USB di mode lama)."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def text(self, txt):
+        self.calls += 1
+        super().text(txt)
+
+    def barcode(self, *args, **kwargs):
+        self.calls += 1
+        super().barcode(*args, **kwargs)
+
+    def cut(self):
+        self.calls += 1
+        super().cut()
+
+    def set(self, **kwargs):
+        self.calls += 1
+        super().set(**kwargs)
+
+
+def legacy_print(driver, data):
+    """Urutan panggilan PrintTicket.print_ticket sebelum template."""
+    driver.set(font="b", bold=True, width=2, height=2, align="center")
+    driver.text("WELCOME\n")
+    driver.text("BALI DRIVE THRU CARWASH\n")
+    driver.set(
+        font="b", bold=False, width=1, height=1, align="center"
+    )
+    driver.text("Jl. Mahendradata Selatan No.19 Denpasar, Bali\n\n")
+    driver.set(
+        font="b", bold=False, width=1, height=1, align="center"
+    )
+    driver.text(str(data["time_in"]))
+    driver.text("\n")
+    driver.barcode(
+        str(data["ticket_number"]),
+        "EAN13",
+        height=64,
+        width=2,
+        pos="BELOW",
+    )
+    driver.text("\n")
+    driver.set(font="b", bold=True, width=2, height=2, align="center")
+    driver.text(str(data["service_name"]))
+    driver.text("\n")
+    driver.set(
+        font="b", bold=False, width=1, height=1, align="center"
+    )
+    driver.text("Rp.")
+    driver.text(str(data["price"]))
+    driver.text("\n")
+    driver.cut()
+
+
+def sample(i: int) -> dict:
+    base = f"899010{i:06d}"
+    odd = sum(int(base[k]) for k in range(0, 12, 2))
+    even = sum(int(base[k]) for k in range(1, 12, 2))
+    check = (10 - ((odd + 3 * even) % 10)) % 10
+    return {
+        "ticket_number": f"{base}{check}",
+        "time_in": "2025-11-20 15:45:01",
+        "service_name": "Complete",
+        "price": 25000,
+    }
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tickets = [sample(i) for i in range(n)]
+
+    # Mode lama: satu driver call per elemen
+    legacy_bytes = legacy_calls = 0
+    # python-escpos print() setiap render barcode, dibuang supaya output rapi
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for data in tickets:
+            driver = CountingDriver()
+            legacy_print(driver, data)
+            legacy_bytes += len(driver.getvalue())
+            legacy_calls += driver.calls
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        template = TicketTemplate()
+        compile_time = time.perf_counter() - start
+
+    # Template: compile sekali (di atas), render per tiket
+    template_bytes = 0
+    start = time.perf_counter()
+    for data in tickets:
+        template_bytes += len(template.render(data))
+    template_time = time.perf_counter() - start
+
+    print(f"tickets               : {n}")
+    print(f"compile (once)        : {compile_time * 1e3:.2f} ms")
+    print(
+        f"{'':22}  {'bytes/ticket':>12}  {'writes/ticket':>13}  {'us/ticket':>10}"
+    )
+    print(
+        f"{'legacy driver calls':22}  {legacy_bytes / n:12.1f}  "
+        f"{legacy_calls / n:13.1f}  {legacy_time / n * 1e6:10.1f}"
+    )
+    print(
+        f"{'compiled template':22}  {template_bytes / n:12.1f}  "
+        f"{1:13.1f}  {template_time / n * 1e6:10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
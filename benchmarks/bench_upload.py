@@ -0,0 +1,93 @@
+"""
+Throughput drain outbox (tiket/detik): POST per tiket vs batch,
+plus fallback otomatis kalau server tidak punya endpoint batch.
+
+Jalankan:
+    python benchmarks/bench_upload.py [jumlah_tiket] [latency_server_detik]
+"""
+
+import os
+import queue
+import sys
+import tempfile
+import time
+
+from stub_server import StubServer
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.processes.main_process import NetworkManager
+from dispenser_carwash.processes.network_process import drain_outbox
+from dispenser_carwash.utils.outbox import TicketOutbox
+
+
+def fill_outbox(outbox: TicketOutbox, n: int) -> None:
+    for i in range(n):
+        outbox.put(
+            {
+                "ticket_number": f"899010{i:07d}",
+                "time_in": "2025-11-20 15:45:01",
+                "service_name": "Complete",
+                "price": 35000,
+            }
+        )
+
+
+def run(
+    label: str,
+    n: int,
+    latency: float,
+    batch_server: bool,
+    batch_size: int,
+) -> None:
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        StubServer(batch=batch_server, latency=latency) as server,
+    ):
+        outbox = TicketOutbox(os.path.join(tmp, "outbox.sqlite3"))
+        fill_outbox(outbox, n)
+
+        net = NetworkManager(
+            f"{server.url}/api/tickets",
+            retries=1,
+            delay=0,
+            batch_url=f"{server.url}/api/tickets/batch",
+        )
+        started = time.perf_counter()
+        sent = drain_outbox(net, outbox, queue.Queue(), batch_size)
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"{label:28} {sent:6d} tiket  {elapsed:7.2f} s  "
+            f"{sent / elapsed:9.1f} tiket/s  {server.requests:5d} request  "
+            f"sisa outbox {outbox.count()}"
+        )
+        outbox.close()
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    batch_size = Settings.Server.BATCH_SIZE
+
+    print(
+        f"{n} tiket, latency server {latency * 1e3:.0f} ms, batch {batch_size}"
+    )
+    run("single POST", n, latency, batch_server=True, batch_size=1)
+    run(
+        f"batch ({batch_size})",
+        n,
+        latency,
+        batch_server=True,
+        batch_size=batch_size,
+    )
+    run(
+        "batch -> fallback single",
+        n,
+        latency,
+        batch_server=False,
+        batch_size=batch_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Stress test TicketSequence: terbitkan banyak nomor tiket dengan "mati listrik"
+acak, lalu buktikan tidak ada nomor dobel.
+
+Mati listrik disimulasikan dengan membuang objek alokator (semua state di
+memori hilang) lalu membuat ulang dari file. Sebagian mati listrik terjadi
+tepat di tengah penulisan blok baru (file sementara sudah di-fsync tapi belum
+di-rename). Sesekali "server" juga mengirim last_ticket_number untuk sync.
+
+Jalankan:
+    python benchmarks/stress_ticket_sequence.py [jumlah_tiket] [block_size]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from dispenser_carwash.utils.ticket_sequence import TicketSequence
+
+
+class PowerCut(Exception):
+    pass
+
+
+def main() -> int:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    block_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    rng = random.Random(12345)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ticket_sequence")
+        seen = bytearray()
+        issued = duplicates = cuts = torn_writes = blocks = syncs = 0
+        highest = 0
+
+        def fresh_allocator() -> TicketSequence:
+            sequence = TicketSequence(path, block_size=block_size)
+
+            def before_commit() -> None:
+                nonlocal blocks, torn_writes
+                blocks += 1
+                if rng.random() < 0.01:
+                    torn_writes += 1
+                    raise PowerCut()
+
+            sequence.before_commit = before_commit
+            return sequence
+
+        sequence = fresh_allocator()
+        start = time.perf_counter()
+        while issued < n:
+            # Mati listrik kira-kira tiap 5000 tiket
+            if rng.random() < 0.0002:
+                cuts += 1
+                sequence = fresh_allocator()
+                continue
+
+            # Server kadang tertinggal, kadang (tiket lane lain) lebih maju
+            if rng.random() < 0.0001:
+                syncs += 1
+                try:
+                    sequence.sync(
+                        max(0, highest + rng.randint(-500, 50))
+                    )
+                except PowerCut:
+                    cuts += 1
+                    sequence = fresh_allocator()
+                continue
+
+            try:
+                number = sequence.next()
+            except PowerCut:
+                cuts += 1
+                sequence = fresh_allocator()
+                continue
+
+            if number >= len(seen):
+                seen.extend(
+                    bytes(max(number + 1 - len(seen), 1 << 20))
+                )
+            if seen[number]:
+                duplicates += 1
+            seen[number] = 1
+            highest = max(highest, number)
+            issued += 1
+        elapsed = time.perf_counter() - start
+
+    gaps = highest - issued + duplicates
+    print(f"Tiket terbit      : {issued}")
+    print(f"Nomor tertinggi   : {highest}")
+    print(
+        f"Mati listrik      : {cuts} (di tengah tulis blok: {torn_writes})"
+    )
+    print(f"Sync server       : {syncs}")
+    print(
+        f"Blok dipesan      : {blocks} (fsync per tiket: {blocks / issued:.4f})"
+    )
+    print(f"Nomor terlewat    : {gaps}")
+    print(f"Throughput        : {issued / elapsed:,.0f} tiket/s")
+    print(f"Nomor dobel       : {duplicates}")
+    return 1 if duplicates else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
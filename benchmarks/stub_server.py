@@ -0,0 +1,184 @@
+"""
+Server pengganti lokal untuk mencoba upload tanpa server asli.
+
+Endpoint (sama dengan Settings.Server):
+    GET  /api/init-data      -> {"last_ticket_number": ..., "service_data": [...]}
+    POST /api/tickets        -> {"status": "ok", "ticket_number": ...}
+    POST /api/tickets/batch  -> {"results": [{"ticket_number": ..., "status": ...}]}
+                                (404 kalau batch=False)
+
+Jalankan manual:
+    python benchmarks/stub_server.py --port 8000 [--no-batch] [--latency 0.02]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+SERVICE_DATA = [
+    {"id": 1, "name": "Basic", "price": 25000},
+    {"id": 2, "name": "Complete", "price": 35000},
+    {"id": 3, "name": "Perfect", "price": 50000},
+    {"id": 4, "name": "Cuci Motor", "price": 15000},
+]
+
+
+class StubServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        batch: bool = True,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+    ):
+        self.batch = batch
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.tickets: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(
+            (host, port), self._handler_class()
+        )
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ---------- logika endpoint ----------
+    def _store(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        ticket_number = str(payload.get("ticket_number"))
+        if self.fail_rate and random.random() < self.fail_rate:
+            return {
+                "ticket_number": ticket_number,
+                "status": "error",
+                "detail": "ditolak (simulasi)",
+            }
+        with self._lock:
+            if ticket_number in self.tickets:
+                return {
+                    "ticket_number": ticket_number,
+                    "status": "duplicate",
+                }
+            self.tickets[ticket_number] = payload
+        return {"ticket_number": ticket_number, "status": "ok"}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, code: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _read_json(self) -> Any:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"null")
+
+            def do_GET(self):
+                stub.requests += 1
+                if self.path.rstrip("/") == "/api/init-data":
+                    last = max(
+                        (int(t[-8:-1]) for t in stub.tickets),
+                        default=0,
+                    )
+                    return self._reply(
+                        200,
+                        {
+                            "last_ticket_number": last,
+                            "service_data": SERVICE_DATA,
+                        },
+                    )
+                self._reply(404, {"detail": "not found"})
+
+            def do_POST(self):
+                stub.requests += 1
+                body = self._read_json()
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                path = self.path.rstrip("/")
+                if path == "/api/tickets":
+                    result = stub._store(body)
+                    code = 200 if result["status"] != "error" else 422
+                    return self._reply(code, result)
+
+                if path == "/api/tickets/batch" and stub.batch:
+                    tickets: List[Dict[str, Any]] = body.get(
+                        "tickets", []
+                    )
+                    return self._reply(
+                        200,
+                        {
+                            "results": [
+                                stub._store(t) for t in tickets
+                            ]
+                        },
+                    )
+
+                self._reply(404, {"detail": "not found"})
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[1]
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--no-batch", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubServer(
+        args.host,
+        args.port,
+        not args.no_batch,
+        args.latency,
+        args.fail_rate,
+    )
+    print(f"Stub server di {server.url} (Ctrl+C untuk berhenti)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
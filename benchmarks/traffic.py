@@ -0,0 +1,156 @@
+"""
+Traffic generator untuk SimulatedLane: kendaraan datang (Poisson), menunggu
+sebentar, menekan tombol service atau pergi tanpa memilih, lalu masuk
+setelah gate terbuka.
+
+Semua durasi dalam "detik dunia nyata" lalu dikali time_scale, jadi satu jam
+operasional bisa dijalankan dalam hitungan detik.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dispenser_carwash.hardware.simulation import (
+    SERVICE_BUTTONS,
+    SimulatedLane,
+)
+
+
+class TrafficProfile:
+    __slots__ = (
+        "name",
+        "arrivals_per_hour",
+        "button_delay",
+        "leave_rate",
+        "dwell",
+        "button_weights",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        arrivals_per_hour: float,
+        button_delay: Tuple[float, float] = (1.0, 4.0),
+        leave_rate: float = 0.05,
+        dwell: Tuple[float, float] = (2.0, 5.0),
+        button_weights: Tuple[float, ...] = (0.4, 0.3, 0.2, 0.1),
+    ):
+        self.name = name
+        self.arrivals_per_hour = (
+            arrivals_per_hour  # 0 = antre penuh (saturasi)
+        )
+        self.button_delay = (
+            button_delay  # detik dari datang sampai tekan tombol
+        )
+        self.leave_rate = leave_rate  # peluang pergi tanpa memilih
+        self.dwell = dwell  # detik di loop setelah gate terbuka
+        self.button_weights = button_weights
+
+
+PROFILES: Dict[str, TrafficProfile] = {
+    "normal": TrafficProfile("normal", arrivals_per_hour=60),
+    "rush": TrafficProfile(
+        "rush", arrivals_per_hour=240, button_delay=(0.5, 2.0)
+    ),
+    "saturate": TrafficProfile(
+        "saturate",
+        arrivals_per_hour=0,
+        button_delay=(0.2, 0.5),
+        leave_rate=0.02,
+        dwell=(0.5, 1.0),
+    ),
+}
+
+
+class VehicleResult:
+    __slots__ = (
+        "arrived_at",
+        "pressed_at",
+        "gate_at",
+        "left_without_selecting",
+    )
+
+    def __init__(self, arrived_at: float):
+        self.arrived_at = arrived_at
+        self.pressed_at: Optional[float] = None
+        self.gate_at: Optional[float] = None
+        self.left_without_selecting = False
+
+
+class TrafficGenerator(threading.Thread):
+    """
+    Satu thread per lane. probe (dari benchmark, listener MainFSM) harus
+    punya wait_state(nama_state, timeout) -> bool dan last_entered(nama_state)
+    -> float. Kendaraan berikutnya baru datang setelah lane kembali IDLE,
+    seperti antrean asli.
+    """
+
+    def __init__(
+        self,
+        lane: SimulatedLane,
+        profile: TrafficProfile,
+        vehicles: int,
+        probe,
+        time_scale: float = 0.01,
+        seed: int = 0,
+    ):
+        super().__init__(name=f"traffic-{lane.name}", daemon=True)
+        self._lane = lane
+        self._profile = profile
+        self._vehicles = vehicles
+        self._probe = probe
+        self._scale = time_scale
+        self._rng = random.Random(seed)
+        self.results: List[VehicleResult] = []
+        self.stuck = 0
+
+    def _sleep(self, seconds: float) -> None:
+        time.sleep(seconds * self._scale)
+
+    def _uniform(self, bounds: Tuple[float, float]) -> float:
+        return self._rng.uniform(*bounds)
+
+    def run(self) -> None:
+        profile = self._profile
+        timeout = max(5.0, 60 * self._scale)
+        next_arrival = time.monotonic()
+
+        for _ in range(self._vehicles):
+            if profile.arrivals_per_hour > 0:
+                gap = self._rng.expovariate(
+                    profile.arrivals_per_hour / 3600.0
+                )
+                next_arrival += gap * self._scale
+            # Kendaraan tidak bisa masuk loop sebelum lane kosong lagi
+            if not self._probe.wait_state("IDLE", timeout):
+                self.stuck += 1
+                break
+            delay = next_arrival - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            result = VehicleResult(time.monotonic())
+            self.results.append(result)
+            self._lane.arrive()
+            self._sleep(self._uniform(profile.button_delay))
+
+            if self._rng.random() < profile.leave_rate:
+                result.left_without_selecting = True
+                self._lane.leave()
+                continue
+
+            button = self._rng.choices(
+                SERVICE_BUTTONS, weights=profile.button_weights
+            )[0]
+            result.pressed_at = time.monotonic()
+            self._lane.press(button)
+
+            if not self._probe.wait_state("VEHICLE_STAYING", timeout):
+                self.stuck += 1
+                self._lane.leave()
+                break
+            result.gate_at = self._probe.last_entered("GATE_OPEN")
+            self._sleep(self._uniform(profile.dwell))
+            self._lane.leave()
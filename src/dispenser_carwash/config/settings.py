@@ -50,9 +50,28 @@ class FilePath:
 
         logger.info(f"🎵 Loaded {len(sounds)} sound files from {sound_path}")
         return sounds
+
+    @staticmethod
+    def get_words():
+        """Clip per kata untuk PhraseComposer (opsional, boleh tidak ada)."""
+        words_path = FilePath.get_root() / "assets" / "sounds" / "words"
+
+        if not words_path.is_dir():
+            logger.info(f"ℹ Folder clip kata tidak ada: {words_path}")
+            return {}
+
+        words = {
+            f.stem.lower(): str(f.resolve())
+            for f in words_path.iterdir()
+            if f.is_file() and f.suffix.lower() in (".mp3", ".wav")
+        }
+        logger.info(f"🗣 Loaded {len(words)} word clips from {words_path}")
+        return words
 class Settings:
     class Hardware:
         GPIO_MODE = "BCM"
+        # "gpio" = hardware asli, "sim" = pin mock + printer/suara simulasi
+        BACKEND = os.environ.get("DISPENSER_BACKEND", "gpio")
         LOOP_SENSOR_PIN = 5
         BUTTON_PINS = {
             "service_1": 6,
@@ -60,21 +79,142 @@ class Settings:
             "service_3": 19,
             "service_4": 26,
         }
+        # Tombol -> service_id (bisa ditimpa field "button" di service_data)
+        SERVICE_BUTTONS = {
+            "service_1": 1,
+            "service_2": 2,
+            "service_3": 3,
+            "service_4": 4,
+        }
+        # service_id -> nama file suara (bisa ditimpa field "sound" di service_data)
+        SERVICE_SOUNDS = {
+            1: "service_basic",
+            2: "service_complete",
+            3: "service_perfect",
+            4: "service_cuci_motor",
+        }
         GATE_CONTROLLER_PIN = 23 
         LED_PINS = 24
+        PRINTER_VID = 0x28E9
+        PRINTER_PID = 0x0289
+        # Printer tidak siap (kertas habis, cover terbuka, terputus) saat pelanggan memilih:
+        #   "delay"  = tiket ditahan sampai printer siap lagi (atau kendaraan pergi)
+        #   "refuse" = pilihan ditolak, putar PRINTER_NOT_READY_CLIP
+        #   "ignore" = tetap terbitkan tiket
+        PRINTER_NOT_READY = "delay"
+        PRINTER_NOT_READY_CLIP = "helper_button"
+        # "delay" lewat Interval.PRINTER_HOLD_TIMEOUT:
+        #   "refuse" = pilihan dibatalkan, putar PRINTER_NOT_READY_CLIP
+        #   "issue"  = tiket tetap diterbitkan
+        PRINTER_HOLD_EXPIRED = "refuse"
+        # Multi-lane: satu dict per lane, contoh:
+        #   {"name": "lane2", "loop_pin": 12, "gate_pin": 20, "led_pin": 21,
+        #    "button_pins": {"service_1": 16, ...}, "printer_vid": 0x28E9,
+        #    "printer_pid": 0x0289, "sound_channel": 1}
+        # Kosong = satu lane dari pin di atas.
+        LANES = []
 
     class Server:
         SEND_URL = "http://192.168.100.29:8000/api/tickets"
         INIT_DATA_URL = "http://192.168.100.29:8000/api/init-data"
+        BATCH_URL = "http://192.168.100.29:8000/api/tickets/batch"
 
         TIMEOUT = 5
         RETRY_INTERVAL = 3
 
+        # HTTP keep-alive pool (satu session per proses)
+        POOL_CONNECTIONS = 2   # jumlah host yang pool-nya disimpan
+        POOL_MAXSIZE = 4       # maksimal koneksi per host
+        POOL_BLOCK = False     # True = tunggu kalau limit per host tercapai
+
+        # Upload batch: kirim kalau sudah BATCH_SIZE tiket atau BATCH_WINDOW detik
+        BATCH_ENABLED = True
+        BATCH_SIZE = 50
+        BATCH_WINDOW = 0.5
+
+        # Retry: exponential backoff + full jitter, circuit breaker, retry budget
+        BACKOFF_MAX_DELAY = 30
+        CIRCUIT_FAILURE_THRESHOLD = 5
+        CIRCUIT_RESET_TIMEOUT = 15
+        RETRY_BUDGET_RATIO = 0.2           # retry per request
+        RETRY_BUDGET_MIN_PER_SECOND = 0.5  # isi ulang minimum
+        RETRY_BUDGET_MAX_TOKENS = 10
+
+        # "async": upload paralel (async_network_process), "sync": satu per satu
+        NETWORK_MODE = "async"
+        MAX_IN_FLIGHT = 4   # jangan lebih dari POOL_MAXSIZE
+
+    class Sound:
+        # Channel mixer per keperluan (offset di dalam slot lane), di-reserve
+        CHANNELS = {"greeting": 0, "confirmation": 1, "alert": 2}
+        # Lebih besar = boleh memotong suara yang sedang diputar
+        PRIORITY = {"greeting": 1, "confirmation": 2, "alert": 3}
+        # Keperluan yang dicampur di atas suara lain (tidak memotong / antre)
+        MIXED = ("alert",)
+        # Clip -> keperluan; clip yang tidak terdaftar = DEFAULT_PURPOSE
+        CLIP_PURPOSE = {"welcome": "greeting"}
+        DEFAULT_PURPOSE = "confirmation"
+        # Clip yang antre lebih lama dari ini dibuang (sudah tidak relevan)
+        QUEUE_MAX_AGE = 5.0
+        # Batas PCM clip yang resident di memori (LRU, lihat AudioCache)
+        MAX_RESIDENT_BYTES = 4 * 1024 * 1024
+        # Umumkan "layanan X, harga Y" dari clip kata (fallback: clip service)
+        ANNOUNCE_SERVICE = True
+        # Batas PCM frasa hasil susunan yang disimpan (LRU, lihat PhraseComposer)
+        MAX_PHRASE_BYTES = 4 * 1024 * 1024
+
     class System:
         LOGGER_NAME = "dispenser_parkir"
         LOG_LEVEL = "INFO"
         LOG_FILE = Path(__file__).resolve().parent.parent / "log.txt"
+        # Queue log antar proses dibatasi; penuh = record dibuang & dihitung
+        LOG_QUEUE_SIZE = 10000
+        # Rotasi file log per ukuran atau per waktu, mana yang duluan
+        LOG_MAX_BYTES = 5 * 1024 * 1024
+        LOG_BACKUP_COUNT = 5
+        LOG_ROTATE_INTERVAL = 24 * 3600
+        # Maksimal record per tulis (satu flush per batch)
+        LOG_BATCH = 256
+        LOG_CONSOLE = True
+        # Outbox SQLite: tiket yang belum di-ack server
+        OUTBOX_FILE = Path(__file__).resolve().parent.parent / "outbox.sqlite3"
+        # Snapshot init data untuk boot cepat tanpa server
+        INIT_CACHE_FILE = Path(__file__).resolve().parent.parent / "init_data.json"
+        # Sequence nomor tiket lokal, dipesan per blok (satu fsync per blok)
+        SEQUENCE_FILE = Path(__file__).resolve().parent.parent / "ticket_sequence"
+        # PCM hasil decode MP3 (sekali), key = hash isi file sumber
+        SOUND_CACHE_DIR = Path(__file__).resolve().parent.parent / "sound_cache"
+        # Event log terstruktur (JSON lines per hari) + ukuran ring buffer-nya
+        EVENT_LOG_DIR = Path(__file__).resolve().parent.parent / "events"
+        EVENT_BUFFER = 4096
+        SEQUENCE_BLOCK = 100
+        # Batas tabel tiket yang menunggu ack server di MainProcess
+        MAX_PENDING_ACKS = 500
+
+    class Metrics:
+        # Endpoint Prometheus: GET http://HOST:PORT/metrics
+        ENABLED = True
+        HOST = "127.0.0.1"
+        PORT = 9108
+
+    class Profiling:
+        # Timer wall/CPU per state handler & call hardware + budget per iterasi loop.
+        # Default mati: handler & hardware dipakai tanpa wrapper.
+        ENABLED = os.environ.get("DISPENSER_PROFILE", "") == "1"
+        LOOP_BUDGET = 0.05          # detik per iterasi (None = tanpa peringatan)
+        BUDGET_WARN_INTERVAL = 10.0  # maksimal satu peringatan per interval
+        # kill -USR1 <pid>: sampling profiler SAMPLE_SECONDS detik -> PROFILE_DIR
+        SAMPLE_SIGNAL = "SIGUSR1"
+        SAMPLE_SECONDS = 10.0
+        SAMPLE_INTERVAL = 0.005
+        PROFILE_DIR = Path(__file__).resolve().parent.parent / "profiles"
 
     class Interval:
         SENSOR_POLL = 0.1
         UPLOAD = 5
+        ACK_DRAIN = 1.0   # interval drain from_net saat ada tiket pending
+        EVENT_FLUSH = 1.0   # interval tulis event log ke disk
+        PRINTER_HEALTH = 2.0   # polling status printer (PrinterHealthMonitor)
+        PRINTER_HOLD_TIMEOUT = 20  # batas tiket ditahan karena printer tidak siap
+        INIT_REFRESH = 300  # refresh init data (harga/service) dari server
+        SELECT_SERVICE_TIMEOUT = 60  # tidak memilih service -> kembali IDLE
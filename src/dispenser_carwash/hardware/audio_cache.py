@@ -0,0 +1,165 @@
+"""
+Cache aset suara: MP3/WAV di-decode sekali ke PCM format mixer, disimpan
+di disk, lalu dimuat ke Sound saat pertama kali diputar.
+
+- key file cache = sha256 isi file sumber + format mixer, jadi file sumber
+  yang berubah (atau mixer dengan frekuensi lain) otomatis decode ulang
+- boot dengan cache hangat tidak men-decode apa pun, hanya hashing
+- clip resident dibatasi Settings.Sound.MAX_RESIDENT_BYTES (LRU); Sound
+  yang sedang diputar tetap aman karena Channel memegang referensinya
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AudioCache:
+    _default: Optional["AudioCache"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        hw_driver: pygame,
+        cache_dir: Path = Settings.System.SOUND_CACHE_DIR,
+        max_resident_bytes: int = Settings.Sound.MAX_RESIDENT_BYTES,
+    ):
+        self._hw_driver = hw_driver
+        self._dir = Path(cache_dir)
+        self._max_resident = max_resident_bytes
+        self._lock = threading.Lock()
+        # nama clip -> file PCM di cache
+        self._index: Dict[str, Path] = {}
+        # nama clip -> (Sound, ukuran byte), urutan = LRU
+        self._resident: (
+            "OrderedDict[str, Tuple[pygame.mixer.Sound, int]]"
+        ) = OrderedDict()
+        self._resident_bytes = 0
+        self.decoded = 0
+
+    @classmethod
+    def default(cls, hw_driver: pygame) -> "AudioCache":
+        """Cache bersama semua lane (clip yang sama cukup resident sekali)."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(hw_driver)
+            return cls._default
+
+    def _mixer_tag(self) -> str:
+        freq, fmt, channels = self._hw_driver.mixer.get_init()
+        return f"{freq}-{fmt}-{channels}"
+
+    def _cache_path(self, source: str) -> Path:
+        with open(source, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:32]
+        return self._dir / f"{digest}-{self._mixer_tag()}.pcm"
+
+    def _decode(self, source: str, target: Path) -> None:
+        raw = self._hw_driver.mixer.Sound(source).get_raw()
+        tmp = target.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+        self.decoded += 1
+
+    def add(self, files: Dict[str, str]) -> None:
+        """
+        files: dict {nama_clip: path_file}. Decode hanya clip yang belum
+        ada di cache; tidak ada yang dimuat ke memori di sini.
+        """
+        self._dir.mkdir(parents=True, exist_ok=True)
+        decoded_before = self.decoded
+        for name, source in files.items():
+            target = self._cache_path(source)
+            if not target.exists():
+                self._decode(source, target)
+            with self._lock:
+                if self._index.get(name) != target:
+                    # Sumber berubah: versi lama yang resident tidak berlaku lagi
+                    self._evict(name)
+                self._index[name] = target
+
+        logger.info(
+            f"🎵 {len(files)} clip siap "
+            f"({self.decoded - decoded_before} di-decode, sisanya dari cache {self._dir})"
+        )
+        self.prune()
+
+    def prune(self) -> None:
+        """Hapus file PCM yang tidak dipakai clip mana pun (sumber lama)."""
+        with self._lock:
+            used = set(self._index.values())
+        for path in self._dir.glob("*.pcm"):
+            if path not in used:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(
+                        f"⚠ Gagal hapus cache suara {path}: {e}"
+                    )
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def get(self, name: str) -> Optional[pygame.mixer.Sound]:
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is not None:
+                self._resident.move_to_end(name)
+                return entry[0]
+
+            path = self._index.get(name)
+            if path is None:
+                return None
+
+            # SDL_mixer selalu menyalin PCM ke buffer Sound miliknya sendiri
+            # (buffer=, array= maupun sndarray), jadi mmap tidak bisa jadi
+            # backing store. mmap hanya menghindari bytes perantara: satu
+            # salinan dari page cache langsung ke Sound.
+            with (
+                open(path, "rb") as f,
+                mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ
+                ) as buf,
+            ):
+                sound = self._hw_driver.mixer.Sound(buffer=buf)
+                size = len(buf)
+
+            self._resident[name] = (sound, size)
+            self._resident_bytes += size
+            # Clip terbaru selalu boleh resident walau sendirian melebihi batas
+            while (
+                self._resident_bytes > self._max_resident
+                and len(self._resident) > 1
+            ):
+                self._evict(next(iter(self._resident)))
+            return sound
+
+    def raw(self, name: str) -> Optional[bytes]:
+        """PCM mentah clip (format mixer), tanpa membuat Sound."""
+        path = self._index.get(name)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _evict(self, name: str) -> None:
+        entry = self._resident.pop(name, None)
+        if entry is not None:
+            self._resident_bytes -= entry[1]
+
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
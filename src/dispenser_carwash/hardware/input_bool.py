@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Callable, Optional, Protocol
 
 
 class InputBool(Protocol):
@@ -8,6 +8,21 @@ class InputBool(Protocol):
 class InputGpio(InputBool):
     def __init__(self, hw_driver):
         self._hw_driver = hw_driver
-        
+
     def read_input(self) -> bool:
         return self._hw_driver.is_pressed
+
+    def set_edge_callback(self, callback: Optional[Callable[[bool], None]]) -> None:
+        """
+        Pasang callback untuk setiap perubahan level (edge) dari gpiozero.
+        callback(True) dipanggil saat pressed, callback(False) saat released.
+        Callback jalan di thread milik gpiozero, jadi harus ringan
+        (cukup taruh event ke queue). None = lepas callback.
+        """
+        if callback is None:
+            self._hw_driver.when_pressed = None
+            self._hw_driver.when_released = None
+            return
+
+        self._hw_driver.when_pressed = lambda: callback(True)
+        self._hw_driver.when_released = lambda: callback(False)
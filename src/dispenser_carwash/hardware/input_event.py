@@ -0,0 +1,82 @@
+import queue
+import time
+from typing import List, Optional
+
+from dispenser_carwash.hardware.input_bool import InputGpio
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class InputEvent:
+    """
+    Satu edge dari input digital.
+    source   : nama input (misal 'input_loop', 'service_1')
+    active   : True = pressed/aktif, False = released
+    timestamp: time.monotonic() saat callback gpiozero dipanggil
+    """
+
+    __slots__ = ("source", "active", "timestamp")
+
+    def __init__(self, source: str, active: bool, timestamp: float):
+        self.source = source
+        self.active = active
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        return (
+            f"InputEvent(source={self.source!r}, active={self.active}, "
+            f"timestamp={self.timestamp:.6f})"
+        )
+
+
+class InputEventQueue:
+    """
+    Satu queue untuk semua edge input. FSM cukup block di get()
+    sampai ada edge, jadi lane yang kosong tidak makan CPU.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[InputEvent]" = queue.Queue()
+        self._sources: List[str] = []
+
+    def attach(self, source: str, device: InputGpio) -> None:
+        """Daftarkan input: setiap edge masuk ke queue dengan nama source."""
+        put = self._queue.put_nowait
+
+        def _on_edge(active: bool) -> None:
+            put(InputEvent(source, active, time.monotonic()))
+
+        device.set_edge_callback(_on_edge)
+        self._sources.append(source)
+        logger.info(f"🔌 Input '{source}' terpasang ke event queue")
+
+    def post(self, source: str, active: bool) -> None:
+        """Masukkan event manual (misal dari test / simulasi)."""
+        self._queue.put_nowait(
+            InputEvent(source, active, time.monotonic())
+        )
+
+    def get(
+        self, timeout: Optional[float] = None
+    ) -> Optional[InputEvent]:
+        """
+        Block sampai ada event.
+        timeout None = tunggu selamanya, return None kalau timeout habis.
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self) -> List[InputEvent]:
+        """Ambil semua event yang sudah antri tanpa block."""
+        events: List[InputEvent] = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def sources(self) -> List[str]:
+        return list(self._sources)
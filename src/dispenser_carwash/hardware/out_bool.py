@@ -1,8 +1,10 @@
-import time
-from typing import Protocol
+import threading
+from typing import Callable, Optional, Protocol
 
 from gpiozero import LED
 
+from dispenser_carwash.hardware.output_scheduler import OutputScheduler
+
 
 class OutputBool(Protocol):
     def turn_on(self) -> None:
@@ -11,24 +13,102 @@ class OutputBool(Protocol):
         ...
     def firePulse(self, periode: float) -> None:
         ...
+    def blink(self, on_time: float, off_time: float, n: Optional[int] = None) -> None:
+        ...
+    def turn_off_after(self, delay: float) -> None:
+        ...
+    def cancel(self) -> None:
+        ...
     def readState(self) -> bool:
         ...
+    def is_scheduled(self) -> bool:
+        ...
 
 class OutputGpio(OutputBool):
-    def __init__(self, hw_driver: LED):
+    """
+    Semua aksi bertahap (pulse, blink, turn-off tertunda) dijadwalkan
+    lewat OutputScheduler, jadi method di sini tidak pernah sleep.
+    turn_on()/turn_off() manual meng-cancel jadwal yang masih pending.
+    """
+
+    def __init__(self, hw_driver: LED, scheduler: Optional[OutputScheduler] = None):
         self._hw_driver = hw_driver
+        self._scheduler = scheduler or OutputScheduler.default()
+        # Naik setiap cancel(): job yang sudah keluar dari heap scheduler
+        # (tidak bisa di-cancel lagi) cek ini sebelum jalan / menjadwal ulang
+        self._generation = 0
+        # Cek generasi + aksi pin atomik terhadap cancel()/turn_on()/turn_off()
+        self._lock = threading.RLock()
+
+    def _schedule(
+        self, delay: float, action: Callable[[], None], generation: int
+    ) -> None:
+        def _guarded() -> None:
+            with self._lock:
+                if generation == self._generation:
+                    action()
+
+        self._scheduler.schedule(delay, _guarded, owner=self)
 
     def turn_on(self) -> None:
-        self._hw_driver.on() 
+        with self._lock:
+            self.cancel()
+            self._hw_driver.on()
 
     def turn_off(self) -> None:
-        self._hw_driver.off() 
+        with self._lock:
+            self.cancel()
+            self._hw_driver.off()
 
     def firePulse(self, periode: float) -> None:
-        
-        self.turn_on()
-        time.sleep(periode)
-        self.turn_off()
+        with self._lock:
+            self.turn_on()
+            self._schedule(periode, self._hw_driver.off, self._generation)
+
+    def blink(self, on_time: float, off_time: float, n: Optional[int] = None) -> None:
+        """Blink n kali (None = terus sampai di-cancel / turn_off)."""
+        with self._lock:
+            self.cancel()
+            self._blink_step(on_time, off_time, n, self._generation)
+
+    def _blink_step(
+        self, on_time: float, off_time: float, n: Optional[int], generation: int
+    ) -> None:
+        if n is not None and n <= 0:
+            self._hw_driver.off()
+            return
+
+        self._hw_driver.on()
+        remaining = None if n is None else n - 1
+
+        def _off_then_next() -> None:
+            self._hw_driver.off()
+            self._schedule(
+                off_time,
+                lambda: self._blink_step(on_time, off_time, remaining, generation),
+                generation,
+            )
+
+        self._schedule(on_time, _off_then_next, generation)
+
+    def turn_off_after(self, delay: float) -> None:
+        with self._lock:
+            self.cancel()
+            self._schedule(delay, self._hw_driver.off, self._generation)
+
+    def cancel(self) -> None:
+        """Batalkan semua jadwal output ini, state pin dibiarkan apa adanya."""
+        with self._lock:
+            self._generation += 1
+            self._scheduler.cancel_owner(self)
 
     def readState(self) -> bool:
         return self._hw_driver.is_lit
+
+    def is_scheduled(self) -> bool:
+        """True kalau masih ada pulse/blink/turn-off yang belum selesai."""
+        return self._scheduler.pending(self) > 0
+
+    def close(self) -> None:
+        self.cancel()
+        self._hw_driver.close()
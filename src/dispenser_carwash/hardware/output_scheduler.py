@@ -0,0 +1,133 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ScheduledJob:
+    """Handle untuk satu aksi terjadwal. Bisa di-cancel sebelum jalan."""
+
+    __slots__ = ("due", "action", "owner", "cancelled")
+
+    def __init__(
+        self, due: float, action: Callable[[], None], owner: object
+    ):
+        self.due = due
+        self.action = action
+        self.owner = owner
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class OutputScheduler:
+    """
+    Satu thread untuk semua aksi output yang tertunda
+    (pulse gate, pola blink LED, turn-off tertunda).
+
+    Job disimpan di heap berdasarkan waktu jatuh tempo (time.monotonic),
+    thread tidur di Condition sampai job paling dekat. Cancel bersifat
+    lazy: job ditandai, lalu dibuang saat keluar dari heap.
+    """
+
+    _default: Optional["OutputScheduler"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, name: str = "output-scheduler"):
+        self._heap: List[Tuple[float, int, ScheduledJob]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name=name, daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def default(cls) -> "OutputScheduler":
+        """Scheduler bersama untuk output yang tidak diberi scheduler sendiri."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def schedule(
+        self,
+        delay: float,
+        action: Callable[[], None],
+        owner: object = None,
+    ) -> ScheduledJob:
+        """Jalankan action setelah delay detik. Tidak pernah block."""
+        job = ScheduledJob(
+            time.monotonic() + max(0.0, delay), action, owner
+        )
+        with self._cond:
+            heapq.heappush(
+                self._heap, (job.due, next(self._counter), job)
+            )
+            # Bangunkan thread kalau job ini jadi yang paling dekat
+            if self._heap[0][2] is job:
+                self._cond.notify()
+        return job
+
+    def cancel_owner(self, owner: object) -> int:
+        """Cancel semua job milik owner. Return jumlah job yang di-cancel."""
+        count = 0
+        with self._cond:
+            for _, _, job in self._heap:
+                if job.owner is owner and not job.cancelled:
+                    job.cancel()
+                    count += 1
+        return count
+
+    def pending(self, owner: object = None) -> int:
+        """Jumlah job yang belum jalan (semua, atau milik owner tertentu)."""
+        with self._cond:
+            return sum(
+                1
+                for _, _, job in self._heap
+                if not job.cancelled
+                and (owner is None or job.owner is owner)
+            )
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._cond.notify()
+        self._thread.join(timeout=1)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+
+                    due, _, job = self._heap[0]
+                    if job.cancelled:
+                        heapq.heappop(self._heap)
+                        continue
+
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        heapq.heappop(self._heap)
+                        break
+                    self._cond.wait(timeout=remaining)
+                else:
+                    return
+
+            # Aksi dijalankan di luar lock supaya schedule() dari action tidak deadlock
+            if job.cancelled:
+                continue
+            try:
+                job.action()
+            except Exception as e:
+                logger.error(f"❌ Output job gagal: {e}")
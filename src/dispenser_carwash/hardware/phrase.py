@@ -0,0 +1,167 @@
+"""
+Pengumuman dari potongan kata: "layanan cuci motor, harga dua puluh lima
+ribu rupiah" disusun dari clip per kata (assets/sounds/words/<kata>.mp3),
+jadi service / harga baru tidak perlu rekaman baru.
+
+Semua clip kata sudah di-decode AudioCache ke format mixer yang sama,
+jadi penyambungan cukup menggabung byte PCM (sample-accurate, tanpa
+resampling). Hasilnya disimpan per frasa (LRU per byte); frasa untuk
+semua service disiapkan saat katalog dimuat, play tidak pernah menyusun.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import pygame
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.hardware.audio_cache import AudioCache
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Nama clip kata di AudioCache, supaya tidak bentrok dengan clip biasa
+WORD_PREFIX = "word:"
+
+_ONES = (
+    "nol",
+    "satu",
+    "dua",
+    "tiga",
+    "empat",
+    "lima",
+    "enam",
+    "tujuh",
+    "delapan",
+    "sembilan",
+)
+
+
+def number_words(n: int) -> List[str]:
+    """Angka bulat >= 0 ke kata bahasa Indonesia: 25000 -> dua puluh lima ribu."""
+    if n < 0:
+        raise ValueError(f"angka negatif: {n}")
+    if n < 10:
+        return [_ONES[n]]
+    if n == 10:
+        return ["sepuluh"]
+    if n == 11:
+        return ["sebelas"]
+    if n < 20:
+        return [_ONES[n - 10], "belas"]
+
+    for unit, word, single in (
+        (1_000_000_000, "miliar", None),
+        (1_000_000, "juta", None),
+        (1000, "ribu", "seribu"),
+        (100, "ratus", "seratus"),
+        (10, "puluh", None),
+    ):
+        if n >= unit:
+            head, rest = divmod(n, unit)
+            words = (
+                [single]
+                if head == 1 and single
+                else number_words(head) + [word]
+            )
+            return words + (number_words(rest) if rest else [])
+    return []  # tidak tercapai
+
+
+def service_announcement(name: str, price: float) -> List[str]:
+    """Kata-kata pengumuman "layanan <nama>, harga <harga> rupiah"."""
+    name_words = re.findall(r"[a-z0-9]+", name.lower())
+    return [
+        "layanan",
+        *name_words,
+        "harga",
+        *number_words(int(round(price))),
+        "rupiah",
+    ]
+
+
+class PhraseComposer:
+    _default: Optional["PhraseComposer"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        hw_driver: pygame,
+        cache: AudioCache,
+        max_bytes: int = Settings.Sound.MAX_PHRASE_BYTES,
+    ):
+        self._hw_driver = hw_driver
+        self._cache = cache
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._words: Set[str] = set()
+        # frasa -> (Sound, ukuran byte), urutan = LRU
+        self._phrases: "OrderedDict[Tuple[str, ...], Tuple[pygame.mixer.Sound, int]]" = (OrderedDict())
+        self._bytes = 0
+
+    @classmethod
+    def default(
+        cls, hw_driver: pygame, cache: AudioCache
+    ) -> "PhraseComposer":
+        """Composer bersama semua lane (frasa yang sama cukup disusun sekali)."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(hw_driver, cache)
+            return cls._default
+
+    def load_words(self, files: Dict[str, str]) -> None:
+        """files: dict {kata: path_file}, biasanya FilePath.get_words()."""
+        self._cache.add(
+            {WORD_PREFIX + word: path for word, path in files.items()}
+        )
+        with self._lock:
+            self._words.update(files)
+
+    def missing(self, words: Sequence[str]) -> List[str]:
+        return [word for word in words if word not in self._words]
+
+    def compose(
+        self, words: Sequence[str]
+    ) -> Optional[pygame.mixer.Sound]:
+        """Return None kalau ada kata yang belum punya clip (pakai clip biasa)."""
+        key = tuple(words)
+        # Jalur cepat tanpa lock: get / move_to_end OrderedDict atomik di bawah GIL
+        entry = self._phrases.get(key)
+        if entry is not None:
+            try:
+                self._phrases.move_to_end(key)
+            except KeyError:
+                pass  # baru saja di-evict thread lain, Sound-nya tetap valid
+            return entry[0]
+
+        with self._lock:
+            entry = self._phrases.get(key)
+            if entry is not None:
+                return entry[0]
+
+            missing = self.missing(key)
+            if missing or not key:
+                logger.debug(
+                    f"frasa {' '.join(key)!r} tidak lengkap, kata hilang: {missing}"
+                )
+                return None
+
+            pcm = b"".join(
+                self._cache.raw(WORD_PREFIX + word) for word in key
+            )
+            sound = self._hw_driver.mixer.Sound(buffer=pcm)
+
+            self._phrases[key] = (sound, len(pcm))
+            self._bytes += len(pcm)
+            while (
+                self._bytes > self._max_bytes
+                and len(self._phrases) > 1
+            ):
+                _, (_, size) = self._phrases.popitem(last=False)
+                self._bytes -= size
+            return sound
+
+    def cached_bytes(self) -> int:
+        return self._bytes
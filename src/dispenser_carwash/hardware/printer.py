@@ -1,7 +1,9 @@
-from typing import Protocol
+import threading
+import time
+from typing import Optional, Protocol
 
 import usb.core
-from escpos.printer import Usb
+from escpos.printer import Dummy, Usb
 
 from dispenser_carwash.utils.logger import setup_logger
 
@@ -12,6 +14,86 @@ class PrinterUnavailable(Exception):
     pass
 
 
+# ESC/POS real-time status (DLE EOT n), dijawab printer 1 byte lewat in_ep
+RT_PRINTER = b"\x10\x04\x01"        # bit3: offline
+RT_OFFLINE_CAUSE = b"\x10\x04\x02"  # bit2: cover terbuka, bit5: berhenti karena kertas habis
+RT_PAPER = b"\x10\x04\x04"          # bit2-3: kertas hampir habis, bit5-6: kertas habis
+_MASK_OFFLINE = 0x08
+_MASK_COVER_OPEN = 0x04
+_MASK_PAPER_STOP = 0x20
+_MASK_NEAR_END = 0x0C
+_MASK_PAPER_OUT = 0x60
+
+
+class PrinterStatus:
+    """Snapshot status printer. None = tidak diketahui (printer tidak menjawab)."""
+
+    __slots__ = ("connected", "online", "paper_near_end", "paper_out", "cover_open", "checked_at")
+
+    def __init__(
+        self,
+        connected: bool,
+        online: Optional[bool] = None,
+        paper_near_end: Optional[bool] = None,
+        paper_out: Optional[bool] = None,
+        cover_open: Optional[bool] = None,
+    ):
+        self.connected = connected
+        self.online = online
+        self.paper_near_end = paper_near_end
+        self.paper_out = paper_out
+        self.cover_open = cover_open
+        self.checked_at = time.monotonic()
+
+    @classmethod
+    def from_bytes(cls, printer: int, offline_cause: int, paper: int) -> "PrinterStatus":
+        return cls(
+            connected=True,
+            online=not printer & _MASK_OFFLINE,
+            paper_near_end=paper & _MASK_NEAR_END == _MASK_NEAR_END,
+            paper_out=(paper & _MASK_PAPER_OUT == _MASK_PAPER_OUT)
+            or bool(offline_cause & _MASK_PAPER_STOP),
+            cover_open=bool(offline_cause & _MASK_COVER_OPEN),
+        )
+
+    @property
+    def ready(self) -> bool:
+        """Bisa mencetak: terhubung, tidak offline, ada kertas, cover tertutup."""
+        return (
+            self.connected
+            and self.online is not False
+            and not self.paper_out
+            and not self.cover_open
+        )
+
+    def _key(self):
+        return (self.connected, self.online, self.paper_near_end, self.paper_out, self.cover_open)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PrinterStatus) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def describe(self) -> str:
+        if not self.connected:
+            return "terputus"
+        problems = [
+            label
+            for label, flag in (
+                ("offline", self.online is False),
+                ("kertas habis", self.paper_out),
+                ("kertas hampir habis", self.paper_near_end and not self.paper_out),
+                ("cover terbuka", self.cover_open),
+            )
+            if flag
+        ]
+        return ", ".join(problems) or "siap"
+
+    def __repr__(self) -> str:
+        return f"PrinterStatus({self.describe()})"
+
+
 class PrinterDriver(Protocol):
     def text(self, txt: str) -> None: ...
     def barcode(
@@ -26,14 +108,20 @@ class PrinterDriver(Protocol):
     def cut(self) -> None: ...
     def close(self) -> None: ...
     def set(self, **kwargs): ...
+    def write_raw(self, data: bytes) -> None: ...
 
 
 class UsbEscposDriver(PrinterDriver):
-    def __init__(self, vid: int, pid: int, timeout: int = 1):
+    def __init__(self, vid: int, pid: int, timeout: int = 1, reconnect_on_print: bool = True):
         self._vid = vid
         self._pid = pid
         self._timeout = timeout
         self._p: Usb | None = None
+        # Handle USB dipakai bergantian oleh print path & PrinterHealthMonitor
+        self._io_lock = threading.RLock()
+        # False = reconnect diurus PrinterHealthMonitor, print path langsung
+        # gagal (tanpa menunggu reconnect) kalau printer terputus
+        self.reconnect_on_print = reconnect_on_print
         self._connect()
 
     def _connect(self):
@@ -63,17 +151,89 @@ class UsbEscposDriver(PrinterDriver):
         if printer is connected (stored in self._p), it will return the object otherwise it will return None.
         Here we try to connect if it is not connected and rasie Exception it if still not connected
         """
-        if self._p is None:
+        if self._p is None and self.reconnect_on_print:
             self._connect()
         if self._p is None:
             raise PrinterUnavailable("Printer is not connected")
 
+    @property
+    def connected(self) -> bool:
+        return self._p is not None
+
+    def is_present(self) -> bool:
+        """Device vid:pid ada di bus USB (enumerasi saja, device tidak dibuka)."""
+        try:
+            return usb.core.find(idVendor=self._vid, idProduct=self._pid) is not None
+        except Exception:
+            return False
+
+    def reconnect(self) -> bool:
+        """Buka ulang handle USB (dipanggil health monitor, bukan print path)."""
+        with self._io_lock:
+            self.close()
+            self._connect()
+            return self._p is not None
+
+    def _flush_input(self, max_reads: int = 4) -> None:
+        """Buang balasan yang telat datang (misal dari poll sebelumnya yang timeout)."""
+        for _ in range(max_reads):
+            try:
+                data = self._p.device.read(self._p.in_ep, 16, 1)
+            except usb.core.USBTimeoutError:
+                return
+            if not len(data):
+                return
+
+    def _query(self, command: bytes, timeout_ms: int) -> Optional[int]:
+        """Byte status dari printer, None kalau tidak ada balasan (tidak diketahui)."""
+        self._p._raw(command)
+        data = self._p.device.read(self._p.in_ep, 16, timeout_ms)
+        return data[-1] if len(data) else None
+
+    def query_status(self, timeout_ms: int = 200) -> PrinterStatus:
+        """
+        Polling status real-time (DLE EOT 1/2/4). Sekaligus menjaga handle USB
+        tetap terpakai; device yang hilang (errno 19) ditandai terputus.
+        """
+        with self._io_lock:
+            if self._p is None:
+                return PrinterStatus(connected=False)
+            try:
+                self._flush_input()
+                replies = []
+                for command in (RT_PRINTER, RT_OFFLINE_CAUSE, RT_PAPER):
+                    reply = self._query(command, timeout_ms)
+                    if reply is None:
+                        # Balasan kosong: seluruh poll tidak diketahui, jangan ditebak
+                        return PrinterStatus(connected=True)
+                    replies.append(reply)
+                return PrinterStatus.from_bytes(*replies)
+            except usb.core.USBTimeoutError:
+                # Printer tidak mendukung / tidak menjawab status: anggap siap.
+                # Balasan yang telat dibuang _flush_input() di poll berikutnya.
+                return PrinterStatus(connected=True)
+            except (usb.core.USBError, OSError) as e:
+                if getattr(e, "errno", None) == 19:
+                    logger.warning("⚠ Printer terputus (errno 19) saat cek status")
+                    self._p = None
+                    return PrinterStatus(connected=False)
+                logger.error(f"USB error saat cek status printer: {e}")
+                return PrinterStatus(connected=True, online=False)
+            except Exception as e:
+                logger.error(f"❌ Gagal cek status printer: {e}")
+                self._p = None
+                return PrinterStatus(connected=False)
+
     def _safe_call(self, method_name: str, *args, **kwargs):
         """
         wrapper for low-function printer. It make sure to check printer's connection \
         whenever we call the printer function. So that, it prevents crash. It also provide reconnect mechanism
  
         """
+        with self._io_lock:
+            return self._safe_call_locked(method_name, *args, **kwargs)
+
+    def _safe_call_locked(self, method_name: str, *args, **kwargs):
         for attempt in (1, 2):
             self._ensure_connected()
 
@@ -95,7 +255,7 @@ class UsbEscposDriver(PrinterDriver):
                     # so we assign it as None for make it sure
                     self._p = None
 
-                    if attempt == 2:
+                    if attempt == 2 or not self.reconnect_on_print:
                         logger.error("Failed to reconnect, Printer still disconnect")
                         raise PrinterUnavailable("Printer disconnect (USBError 19)")
 
@@ -115,7 +275,7 @@ class UsbEscposDriver(PrinterDriver):
                     )
                     self._p = None
 
-                    if attempt == 2:
+                    if attempt == 2 or not self.reconnect_on_print:
                         raise PrinterUnavailable("Printer disconect (OSError 19)")
 
                     continue
@@ -152,10 +312,57 @@ class UsbEscposDriver(PrinterDriver):
     def set(self, **kwargs):
         self._safe_call("set", **kwargs)
 
+    def write_raw(self, data: bytes) -> None:
+        """Kirim buffer ESC/POS yang sudah jadi dalam satu bulk transfer ke out_ep."""
+        self._safe_call("_raw", data)
+
     def close(self) -> None:
-        if self._p is not None:
-            try:
-                self._p.close()
-            except Exception as e:
-                logger.error(f"❌ Error closing printer: {e}")
-            self._p = None
+        with self._io_lock:
+            if self._p is not None:
+                try:
+                    self._p.close()
+                except Exception as e:
+                    logger.error(f"❌ Error closing printer: {e}")
+                self._p = None
+
+
+class EscposBufferDriver(PrinterDriver):
+    """
+    Driver yang tidak bicara ke USB sama sekali: semua command ESC/POS
+    dikumpulkan di memory (escpos Dummy). Dipakai untuk render satu tiket
+    utuh jadi bytes, lalu dikirim sekali lewat UsbEscposDriver.write_raw().
+    """
+
+    def __init__(self):
+        self._p = Dummy()
+
+    def text(self, txt: str) -> None:
+        self._p.text(txt)
+
+    def barcode(
+        self,
+        code: str,
+        bc_type: str,
+        height: int = 64,
+        width: int = 3,
+        pos: str = "BELOW",
+    ) -> None:
+        self._p.barcode(code, bc_type, height, width, pos)
+
+    def cut(self) -> None:
+        self._p.cut()
+
+    def set(self, **kwargs):
+        self._p.set(**kwargs)
+
+    def write_raw(self, data: bytes) -> None:
+        self._p._raw(data)
+
+    def getvalue(self) -> bytes:
+        return self._p.output
+
+    def clear(self) -> None:
+        self._p.clear()
+
+    def close(self) -> None:
+        self._p.close()
@@ -0,0 +1,97 @@
+import threading
+from typing import Callable, Optional
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.hardware.printer import (
+    PrinterStatus,
+    UsbEscposDriver,
+)
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PrinterHealthMonitor:
+    """
+    Thread yang mem-polling status printer di belakang layar:
+
+    - status real-time (online, kertas hampir habis / habis, cover terbuka)
+      tiap `interval` detik, sekaligus menjaga handle USB tetap hangat
+    - printer terputus: cek enumerasi USB, reconnect begitu device muncul
+      lagi, jadi print path tidak pernah menunggu reconnect
+    - setiap status berubah -> on_change(status)
+
+    Dipakai di proses yang memiliki handle USB (print_process).
+    """
+
+    def __init__(
+        self,
+        driver: UsbEscposDriver,
+        on_change: Optional[Callable[[PrinterStatus], None]] = None,
+        interval: float = Settings.Interval.PRINTER_HEALTH,
+    ):
+        self._driver = driver
+        # Mulai sekarang reconnect hanya di thread ini
+        driver.reconnect_on_print = False
+        self._on_change = on_change
+        self._interval = interval
+        self._status: Optional[PrinterStatus] = None
+        self._wake = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def status(self) -> Optional[PrinterStatus]:
+        """Status terakhir (None = belum pernah dicek)."""
+        return self._status
+
+    def start(self) -> None:
+        # Status awal langsung, sebelum job pertama diproses
+        self.poll()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="printer-health", daemon=True
+        )
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Cek sekarang (misal: baru saja gagal cetak)."""
+        self._wake.set()
+
+    def poll(self) -> PrinterStatus:
+        driver = self._driver
+        if not driver.connected and driver.is_present():
+            logger.info(
+                "🔌 Printer terdeteksi lagi di USB, reconnect..."
+            )
+            driver.reconnect()
+
+        status = driver.query_status()
+        if status != self._status:
+            self._status = status
+            if status.ready:
+                logger.info(f"🖨️ Status printer: {status.describe()}")
+            else:
+                logger.warning(
+                    f"⚠ Status printer: {status.describe()}"
+                )
+            if self._on_change is not None:
+                self._on_change(status)
+        return status
+
+    def _run(self) -> None:
+        while self._running:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            if not self._running:
+                break
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"❌ Gagal cek kesehatan printer: {e}")
+
+    def stop(self) -> None:
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
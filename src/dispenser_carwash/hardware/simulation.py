@@ -0,0 +1,241 @@
+"""
+Backend hardware simulasi: jalan di laptop / CI tanpa Pi, printer dan loop sensor.
+
+- input/output: gpiozero Button/LED di atas MockFactory, dibungkus InputGpio /
+  OutputGpio yang sama dengan hardware asli (edge callback tetap jalan)
+- printer    : SimPrinter, sink ESC/POS yang hanya menghitung (opsional delay USB)
+- suara      : SilentSound, mixer tanpa audio dengan durasi per clip
+
+Aktifkan di main.py dengan Settings.Hardware.BACKEND = "sim"
+(atau env DISPENSER_BACKEND=sim).
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from gpiozero import LED, Button, Device
+from gpiozero.pins.mock import MockFactory
+
+from dispenser_carwash.hardware.input_bool import InputGpio
+from dispenser_carwash.hardware.input_event import InputEventQueue
+from dispenser_carwash.hardware.out_bool import OutputGpio
+from dispenser_carwash.hardware.output_scheduler import (
+    OutputScheduler,
+)
+from dispenser_carwash.hardware.printer import PrinterDriver
+from dispenser_carwash.hardware.sound import Sound
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SERVICE_BUTTONS = ("service_1", "service_2", "service_3", "service_4")
+
+
+def use_mock_pins() -> MockFactory:
+    """Pasang MockFactory sebagai pin factory gpiozero (sekali per proses)."""
+    if not isinstance(Device.pin_factory, MockFactory):
+        Device.pin_factory = MockFactory()
+        logger.info(
+            "🧪 gpiozero memakai MockFactory (hardware simulasi)"
+        )
+    return Device.pin_factory
+
+
+class SimPrinter(PrinterDriver):
+    """
+    Pengganti printer USB. Tidak render apa pun, hanya hitung panggilan,
+    byte dan tiket (satu cut = satu tiket). write_delay mensimulasikan
+    round-trip USB per panggilan.
+    """
+
+    def __init__(self, write_delay: float = 0.0):
+        self._write_delay = write_delay
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.bytes_written = 0
+        self.tickets = 0
+
+    def _write(self, size: int) -> None:
+        if self._write_delay:
+            time.sleep(self._write_delay)
+        with self._lock:
+            self.calls += 1
+            self.bytes_written += size
+
+    def text(self, txt: str) -> None:
+        self._write(len(txt))
+
+    def barcode(
+        self,
+        code: str,
+        bc_type: str,
+        height: int = 64,
+        width: int = 3,
+        pos: str = "BELOW",
+        font: str = "A",
+    ) -> None:
+        self._write(len(code))
+
+    def cut(self) -> None:
+        self._write(0)
+        with self._lock:
+            self.tickets += 1
+
+    def set(self, **kwargs):
+        self._write(0)
+
+    def write_raw(self, data: bytes) -> None:
+        self._write(len(data))
+        with self._lock:
+            # Satu buffer tiket dari TicketTemplate selalu diakhiri cut
+            self.tickets += 1
+
+    def close(self) -> None:
+        pass
+
+
+class SilentSound(Sound):
+    """
+    Mixer tanpa audio. is_busy() True selama durasi clip yang sedang
+    "diputar", jadi alur FSM (menunggu suara konfirmasi) sama seperti asli.
+    """
+
+    def __init__(
+        self,
+        durations: Optional[Dict[str, float]] = None,
+        default: float = 0.0,
+    ):
+        self._durations: Dict[str, float] = dict(durations or {})
+        self._default = default
+        self._busy_until = 0.0
+        self._on_end: Optional[Callable[[], None]] = None
+        self._timer: Optional[threading.Timer] = None
+        self.played: Dict[str, int] = {}
+
+    def load(self, file_path: str) -> None:
+        self._durations.setdefault("default", self._default)
+
+    def load_many(self, files: Dict[str, str]) -> None:
+        for name in files:
+            self._durations.setdefault(name, self._default)
+
+    def set_end_callback(
+        self, callback: Optional[Callable[[], None]]
+    ) -> None:
+        self._on_end = callback
+
+    def play(self, title: str) -> None:
+        self.played[title] = self.played.get(title, 0) + 1
+        duration = self._durations.get(title, self._default)
+        self._busy_until = time.monotonic() + duration
+        self._cancel_timer()
+        if self._on_end is not None:
+            # Pengganti end event pygame
+            self._schedule_end(duration)
+
+    def _schedule_end(self, delay: float) -> None:
+        self._timer = threading.Timer(delay, self._fire_end)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _fire_end(self) -> None:
+        remaining = self._busy_until - time.monotonic()
+        if remaining > 0:
+            # Timer bangun sedikit lebih awal: is_busy() masih True
+            self._schedule_end(remaining)
+            return
+        on_end = self._on_end
+        if on_end is not None:
+            on_end()
+
+    def announce(self, words: Sequence[str]) -> bool:
+        # Tidak ada pustaka clip kata: pemanggil memakai clip service biasa
+        return False
+
+    def prepare_phrases(self, phrases: List[Sequence[str]]) -> None:
+        pass
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stop(self) -> None:
+        self._busy_until = 0.0
+        self._cancel_timer()
+
+    def is_busy(self) -> bool:
+        return time.monotonic() < self._busy_until
+
+
+class SimulatedLane:
+    """
+    Satu lane di atas pin mock, plus aksi "fisik" untuk traffic generator:
+    arrive() / press() / leave() menggerakkan level pin, persis seperti
+    loop detector dan tombol asli (Button pull-up: aktif = drive_low).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loop_pin: int,
+        button_pins: Dict[str, int],
+        gate_pin: int,
+        led_pin: int,
+        output_scheduler: Optional[OutputScheduler] = None,
+        printer: Optional[SimPrinter] = None,
+        sound: Optional[SilentSound] = None,
+    ):
+        # Import di sini: main_process mengimpor modul hardware
+        from dispenser_carwash.processes.main_process import (
+            Peripheral,
+        )
+
+        factory = use_mock_pins()
+        self.name = name
+        self._factory = factory
+        self._loop_pin = loop_pin
+        self._button_pins = dict(button_pins)
+
+        periph = Peripheral()
+        periph.input_loop = InputGpio(Button(pin=loop_pin))
+        for button in SERVICE_BUTTONS:
+            setattr(
+                periph,
+                button,
+                InputGpio(Button(pin=button_pins[button])),
+            )
+
+        periph.input_events = InputEventQueue()
+        for source in ("input_loop", *SERVICE_BUTTONS):
+            periph.input_events.attach(
+                source, getattr(periph, source)
+            )
+
+        scheduler = output_scheduler or OutputScheduler.default()
+        periph.gate_controller = OutputGpio(
+            LED(pin=gate_pin), scheduler
+        )
+        periph.indicator_status = OutputGpio(
+            LED(pin=led_pin), scheduler
+        )
+        periph.printer = printer or SimPrinter()
+        periph.sound = sound or SilentSound()
+        self.periph = periph
+
+    def arrive(self) -> None:
+        self._factory.pin(self._loop_pin).drive_low()
+
+    def leave(self) -> None:
+        self._factory.pin(self._loop_pin).drive_high()
+
+    def press(self, button: str, hold: float = 0.0) -> None:
+        pin = self._factory.pin(self._button_pins[button])
+        pin.drive_low()
+        if hold:
+            time.sleep(hold)
+        pin.drive_high()
+
+    def gate_is_open(self) -> bool:
+        return self.periph.gate_controller.readState()
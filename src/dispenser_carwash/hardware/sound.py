@@ -1,7 +1,24 @@
-from typing import Dict, Optional, Protocol
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 import pygame
 
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.hardware.audio_cache import AudioCache
+from dispenser_carwash.hardware.phrase import PhraseComposer
 from dispenser_carwash.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -13,48 +30,346 @@ class Sound(Protocol):
     def play(self, title: str) -> None: ...
     def stop(self) -> None: ...
     def is_busy(self) -> bool: ...
+    def set_end_callback(
+        self, callback: Optional[Callable[[], None]]
+    ) -> None: ...
+    def announce(self, words: Sequence[str]) -> bool: ...
+    def prepare_phrases(
+        self, phrases: List[Sequence[str]]
+    ) -> None: ...
 
 
-class PyGameSound(Sound):
+# Jumlah channel yang sudah di-reserve (set_reserved tidak punya getter)
+_reserved_channels = 0
+
+
+class _EndEventPump:
+    """
+    Satu thread per proses yang menerima end event channel mixer
+    (Channel.set_endevent) dan memanggil handler channel tersebut.
+
+    Butuh subsystem video/event SDL; di Pi tanpa layar dipakai driver
+    "dummy". Kalau init gagal, fallback cek get_busy() tiap POLL_INTERVAL
+    (tetap di thread ini, bukan di loop FSM).
+    """
+
+    POLL_INTERVAL = 0.02
+
     def __init__(self, hw_driver: pygame):
         self._hw_driver = hw_driver
+        self._lock = threading.Lock()
+        self._handlers: Dict[int, Callable[[], None]] = {}
+        self._polled: List[Callable[[], None]] = []
+        self._use_events = False
+        self._ready = threading.Event()
+        threading.Thread(
+            target=self._run, name="sound-end-event", daemon=True
+        ).start()
+        self._ready.wait(2.0)
+
+    def watch(
+        self,
+        channel: pygame.mixer.Channel,
+        handler: Callable[[], None],
+    ) -> None:
+        with self._lock:
+            if self._use_events:
+                event_type = self._hw_driver.event.custom_type()
+                channel.set_endevent(event_type)
+                self._handlers[event_type] = handler
+            else:
+                self._polled.append(handler)
+
+    def _init_events(self) -> bool:
+        if not os.environ.get("DISPLAY"):
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        try:
+            self._hw_driver.display.init()
+            return True
+        except Exception as e:
+            logger.warning(
+                f"⚠ End event pygame tidak tersedia, fallback polling: {e}"
+            )
+            return False
+
+    def _run(self) -> None:
+        self._use_events = self._init_events()
+        self._ready.set()
+
+        if not self._use_events:
+            while True:
+                time.sleep(self.POLL_INTERVAL)
+                with self._lock:
+                    handlers = list(self._polled)
+                for handler in handlers:
+                    handler()
+
+        event = self._hw_driver.event
+        while True:
+            # wait() melepas GIL, thread lane tidak terganggu
+            ev = event.wait(1000)
+            handler = self._handlers.get(ev.type)
+            if handler is not None:
+                try:
+                    handler()
+                except Exception:
+                    logger.exception(
+                        "❌ Handler end event suara gagal"
+                    )
+
+
+_pump: Optional[_EndEventPump] = None
+_pump_lock = threading.Lock()
+
+
+def _end_event_pump(hw_driver: pygame) -> _EndEventPump:
+    global _pump
+    with _pump_lock:
+        if _pump is None:
+            _pump = _EndEventPump(hw_driver)
+        return _pump
+
+
+class _Playing:
+    __slots__ = ("purpose", "title", "priority")
+
+    def __init__(self, purpose: str, title: str, priority: int):
+        self.purpose = purpose
+        self.title = title
+        self.priority = priority
+
+
+class PyGameSound(Sound):
+    """
+    Audio engine satu lane.
+
+    - Satu channel mixer per keperluan (Settings.Sound.CHANNELS), semuanya
+      di-reserve supaya lane lain tidak pernah merebutnya.
+    - Suara "bicara" (greeting, confirmation) tidak pernah tumpang tindih:
+      prioritas sama / lebih tinggi memotong yang sedang diputar, yang lebih
+      rendah masuk antrean. Keperluan di Settings.Sound.MIXED (alert)
+      dicampur di atas suara lain.
+    - Selesai diputar diketahui dari end event pygame, bukan polling:
+      is_busy() hanya membaca flag, stop()/play() yang redundant gratis.
+    """
+
+    def __init__(
+        self,
+        hw_driver: pygame,
+        channel: Optional[int] = None,
+        cache: Optional[AudioCache] = None,
+        phrases: Optional[PhraseComposer] = None,
+    ):
+        """
+        channel: slot lane (multi-lane). Slot n memakai channel mixer
+        n * len(CHANNELS) .. n * len(CHANNELS) + len(CHANNELS) - 1. None = slot 0.
+        cache / phrases: None = cache & composer bersama semua lane.
+        """
+        global _reserved_channels
+        self._hw_driver = hw_driver
 
         # pastikan mixer sudah di-init
         if not self._hw_driver.mixer.get_init():
             self._hw_driver.mixer.init()
 
-        # tidak perlu _sound kalau semua lewat load_many
-        self._sounds: Dict[str, pygame.mixer.Sound] = {}
-        self._channel: Optional[pygame.mixer.Channel] = None
+        # PCM di-decode sekali & dimuat saat pertama diputar (AudioCache)
+        self._cache = (
+            cache
+            if cache is not None
+            else AudioCache.default(hw_driver)
+        )
+        self._titles: Set[str] = set()
+        self._phrases = (
+            phrases
+            if phrases is not None
+            else PhraseComposer.default(hw_driver, self._cache)
+        )
+
+        mixer = self._hw_driver.mixer
+        purposes = Settings.Sound.CHANNELS
+        base = (channel or 0) * len(purposes)
+        needed = base + len(purposes)
+        if mixer.get_num_channels() < needed:
+            mixer.set_num_channels(needed)
+        _reserved_channels = max(_reserved_channels, needed)
+        mixer.set_reserved(_reserved_channels)
+        self._channels: Dict[str, pygame.mixer.Channel] = {
+            purpose: mixer.Channel(base + offset)
+            for purpose, offset in purposes.items()
+        }
+
+        self._lock = threading.Lock()
+        self._current: Optional[_Playing] = None
+        # (-prioritas, urutan, waktu masuk, title, purpose, Sound)
+        self._queue: List[
+            Tuple[int, int, float, str, str, pygame.mixer.Sound]
+        ] = []
+        self._order = itertools.count()
+        self._mixed: Set[str] = set()
+        self._on_end: Optional[Callable[[], None]] = None
+
+        pump = _end_event_pump(hw_driver)
+        for purpose, ch in self._channels.items():
+            pump.watch(
+                ch,
+                lambda purpose=purpose: self._on_channel_end(purpose),
+            )
 
     def load(self, file_path: str) -> None:
         """
         Implementasi minimal supaya tetap memenuhi interface.
         Misalnya: treat sebagai lagu bernama 'default'.
         """
-        sound = self._hw_driver.mixer.Sound(file_path)
-        self._sounds["default"] = sound
+        self._cache.add({"default": file_path})
+        self._titles.add("default")
 
     def load_many(self, files: Dict[str, str]) -> None:
         """
-        files: dict {nama_lagu: path_file}
+        files: dict {nama_lagu: path_file}. Hanya clip yang belum ada di
+        cache yang di-decode; clip dimuat ke memori saat pertama diputar.
+        """
+        self._cache.add(files)
+        self._titles.update(files)
+
+    def load_words(self, files: Dict[str, str]) -> None:
+        """files: dict {kata: path_file} untuk announce()."""
+        self._phrases.load_words(files)
+
+    def prepare_phrases(self, phrases: List[Sequence[str]]) -> None:
+        """Susun frasa di depan (misal saat katalog dimuat), announce() tinggal play."""
+        for words in phrases:
+            self._phrases.compose(words)
+
+    def announce(self, words: Sequence[str]) -> bool:
         """
-        self._sounds = {}  # reset dulu kalau perlu
+        Putar frasa dari clip kata sebagai suara konfirmasi.
+        Return False kalau ada kata yang belum punya clip.
+        """
+        sound = self._phrases.compose(words)
+        if sound is None:
+            return False
+        self._play("phrase:" + " ".join(words), sound)
+        return True
+
+    def set_end_callback(
+        self, callback: Optional[Callable[[], None]]
+    ) -> None:
+        """callback() dipanggil (dari thread end event) saat semua suara bicara selesai."""
+        self._on_end = callback
 
-        for name, path in files.items():
-            self._sounds[name] = self._hw_driver.mixer.Sound(path)
+    @staticmethod
+    def _purpose_of(title: str) -> str:
+        return Settings.Sound.CLIP_PURPOSE.get(
+            title, Settings.Sound.DEFAULT_PURPOSE
+        )
 
     def play(self, title: str) -> None:
-        if title not in self._sounds:
+        if title not in self._titles:
             logger.warning("%s is not in playlist", title)
             return
+        self._play(title, self._cache.get(title))
+
+    def _play(self, title: str, sound: pygame.mixer.Sound) -> None:
+        purpose = self._purpose_of(title)
+        with self._lock:
+            if purpose in Settings.Sound.MIXED:
+                self._channels[purpose].play(sound)
+                self._mixed.add(purpose)
+                return
+
+            current = self._current
+            if current is not None and current.title == title:
+                # Clip yang sama sedang diputar: tidak diulang dari awal
+                return
+
+            priority = Settings.Sound.PRIORITY.get(purpose, 0)
+            if current is not None and priority < current.priority:
+                heapq.heappush(
+                    self._queue,
+                    (
+                        -priority,
+                        next(self._order),
+                        time.monotonic(),
+                        title,
+                        purpose,
+                        sound,
+                    ),
+                )
+                return
+
+            if current is not None and current.purpose != purpose:
+                self._channels[current.purpose].stop()
+            self._start(purpose, title, priority, sound)
+
+    def _start(
+        self,
+        purpose: str,
+        title: str,
+        priority: int,
+        sound: pygame.mixer.Sound,
+    ) -> None:
+        self._current = _Playing(purpose, title, priority)
+        self._channels[purpose].play(sound)
+
+    def _on_channel_end(self, purpose: str) -> None:
+        """Dari thread end event. Event dari stop()/play() ulang diabaikan."""
+        if purpose in self._mixed:
+            if not self._channels[purpose].get_busy():
+                self._mixed.discard(purpose)
+            return
 
-        sound = self._sounds[title]
-        self._channel = sound.play()
+        current = self._current
+        if current is None or current.purpose != purpose:
+            return
+
+        with self._lock:
+            if (
+                self._current is not current
+                or self._channels[purpose].get_busy()
+            ):
+                return
+            self._current = None
+
+            deadline = time.monotonic() - Settings.Sound.QUEUE_MAX_AGE
+            while self._queue:
+                (
+                    neg_priority,
+                    _,
+                    queued_at,
+                    title,
+                    next_purpose,
+                    sound,
+                ) = heapq.heappop(self._queue)
+                if queued_at >= deadline:
+                    self._start(
+                        next_purpose, title, -neg_priority, sound
+                    )
+                    return
+                logger.debug(
+                    f"clip {title} kadaluarsa di antrean, dibuang"
+                )
+
+        on_end = self._on_end
+        if on_end is not None:
+            on_end()
 
     def stop(self) -> None:
-        if self._channel:
-            self._channel.stop()
+        # Tidak ada yang diputar: tidak perlu menyentuh mixer sama sekali
+        if (
+            self._current is None
+            and not self._queue
+            and not self._mixed
+        ):
+            return
+
+        with self._lock:
+            self._queue.clear()
+            current, self._current = self._current, None
+            mixed, self._mixed = self._mixed, set()
+        if current is not None:
+            self._channels[current.purpose].stop()
+        for purpose in mixed:
+            self._channels[purpose].stop()
 
     def is_busy(self) -> bool:
-        return self._channel.get_busy() if self._channel else False
+        return self._current is not None or bool(self._queue)
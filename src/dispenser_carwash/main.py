@@ -3,23 +3,47 @@ import os
 import signal
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Tuple
 
 import pygame
 from gpiozero import LED, Button, Device
 
 from dispenser_carwash.config.settings import FilePath, Settings
 from dispenser_carwash.hardware.input_bool import InputGpio
+from dispenser_carwash.hardware.input_event import InputEventQueue
 from dispenser_carwash.hardware.out_bool import OutputGpio
+from dispenser_carwash.hardware.output_scheduler import OutputScheduler
 from dispenser_carwash.hardware.printer import UsbEscposDriver
+from dispenser_carwash.hardware.simulation import SimulatedLane
 from dispenser_carwash.hardware.sound import PyGameSound
+from dispenser_carwash.processes.async_network_process import async_network_process
+from dispenser_carwash.processes.lane import (
+    AckRouter,
+    LaneConfig,
+    LaneScheduler,
+    load_lane_configs,
+)
 from dispenser_carwash.processes.main_process import (
+    InitData,
     MainFSM,
     MainProcess,
     NetworkManager,
     Peripheral,
 )
-from dispenser_carwash.utils.logger import setup_logger
+from dispenser_carwash.processes.network_process import network_process
+from dispenser_carwash.processes.print_process import print_process
+from dispenser_carwash.utils.event_log import EventRecorder
+from dispenser_carwash.utils.init_cache import InitDataCache
+from dispenser_carwash.utils.logger import (
+    set_drop_hook,
+    setup_logger,
+    start_listener,
+    stop_listener,
+)
+from dispenser_carwash.utils.metrics import CarwashMetrics, MetricsServer, init_metrics
+from dispenser_carwash.utils.outbox import TicketOutbox
+from dispenser_carwash.utils.profiling import HotPathStats, install_dump_signal
+from dispenser_carwash.utils.ticket_sequence import TicketSequence
 
 logger = setup_logger(__name__)
 
@@ -32,6 +56,7 @@ PID_FILE = "/tmp/dispenser_carwash.pid"
 def ensure_single_instance():
     if os.path.exists(PID_FILE):
         logger.error("⚠ Program sudah berjalan (pidfile ada). Keluar.")
+        stop_listener()
         sys.exit(1)
     with open(PID_FILE, "w") as f:
         f.write(str(os.getpid()))
@@ -75,48 +100,54 @@ def get_sound() -> Dict[str, str]:
 # =====================================================
 #  Setup peripheral
 # =====================================================
-def setup_peripheral() -> Peripheral:
+def setup_peripheral(lane: LaneConfig, output_scheduler: OutputScheduler) -> Peripheral:
     """
-    Inisialisasi semua perangkat keras.
-    Sesuaikan pin / device dengan hardware aslinya.
+    Inisialisasi semua perangkat keras satu lane.
+    Sesuaikan pin / device dengan hardware aslinya (Settings.Hardware).
     """
+    if Settings.Hardware.BACKEND == "sim":
+        # Tanpa Pi: pin mock, printer & suara simulasi
+        return SimulatedLane(
+            lane.name,
+            lane.loop_pin,
+            lane.button_pins,
+            lane.gate_pin,
+            lane.led_pin,
+            output_scheduler,
+        ).periph
+
     periph = Peripheral()
 
     # ==== INPUT ====
-    loop_pin = Settings.Hardware.LOOP_SENSOR_PIN
-    loop_button = Button(pin=loop_pin)
+    loop_button = Button(pin=lane.loop_pin)
+    periph.input_loop = InputGpio(loop_button)
 
-    button_pins = Settings.Hardware.BUTTON_PINS  # diasumsikan dict
-    service_1_btn = Button(pin=button_pins.get("service_1"))
-    service_2_btn = Button(pin=button_pins.get("service_2"))
-    service_3_btn = Button(pin=button_pins.get("service_3"))
-    service_4_btn = Button(pin=button_pins.get("service_4"))
+    for name in ("service_1", "service_2", "service_3", "service_4"):
+        setattr(periph, name, InputGpio(Button(pin=lane.button_pins.get(name))))
 
-    periph.input_loop = InputGpio(loop_button)
-    periph.service_1 = InputGpio(service_1_btn)
-    periph.service_2 = InputGpio(service_2_btn)
-    periph.service_3 = InputGpio(service_3_btn)
-    periph.service_4 = InputGpio(service_4_btn)
+    # Edge dari semua input lane ini masuk ke satu queue, thread lane block di sini
+    periph.input_events = InputEventQueue()
+    for name in ("input_loop", "service_1", "service_2", "service_3", "service_4"):
+        periph.input_events.attach(name, getattr(periph, name))
 
     # ==== OUTPUT ====
-    gate_pin = Settings.Hardware.GATE_CONTROLLER_PIN
-    gate_led = LED(pin=gate_pin)
-
-    led_pin = Settings.Hardware.LED_PINS  # kalau dict, ganti sesuai
-    status_led = LED(pin=led_pin)
+    gate_led = LED(pin=lane.gate_pin)
+    status_led = LED(pin=lane.led_pin)
 
-    periph.gate_controller = OutputGpio(gate_led)
-    periph.indicator_status = OutputGpio(status_led)
-    logger.info("GPIO init ")
+    # Pulse gate & blink LED dijadwalkan di thread scheduler (dipakai semua lane)
+    periph.gate_controller = OutputGpio(gate_led, output_scheduler)
+    periph.indicator_status = OutputGpio(status_led, output_scheduler)
+    logger.info(f"GPIO init {lane.name}")
 
     # # ==== PRINTER & SOUND ====
     # pygame.mixer.init()
 
-    # periph.printer = UsbEscposDriver(vid=0x28E9, pid=0x0289)
-    # periph.sound = PyGameSound(pygame)
+    # periph.printer = UsbEscposDriver(vid=lane.printer_vid, pid=lane.printer_pid)
+    # periph.sound = PyGameSound(pygame, channel=lane.sound_channel)
 
     # sound_files = FilePath.get_sounds()
     # periph.sound.load_many(sound_files)
+    # periph.sound.load_words(FilePath.get_words())
     
     # try:
     #     sound_files = get_sound()
@@ -133,7 +164,8 @@ def setup_peripheral() -> Peripheral:
 #  Cleanup peripheral & resource
 # =====================================================
 def cleanup_peripheral(periph: Peripheral | None):
-    logger.info("🔻 Cleanup peripheral & GPIO...")
+    """Tutup device satu lane (GPIO global dilepas di release_hardware)."""
+    logger.info("🔻 Cleanup peripheral...")
     if periph is None:
         return
 
@@ -174,6 +206,10 @@ def cleanup_peripheral(periph: Peripheral | None):
     except Exception as e:
         logger.error(f"❌ Gagal stop sound: {e}")
 
+
+
+def release_hardware():
+    """Lepas resource global (mixer & GPIO) setelah semua lane ditutup."""
     try:
         if pygame.mixer.get_init():
             pygame.mixer.quit()
@@ -190,43 +226,21 @@ def cleanup_peripheral(periph: Peripheral | None):
 
 
 # =====================================================
-#  Network process
+#  Main
 # =====================================================
-def network_process(net: NetworkManager, to_net: mp.Queue, from_net: mp.Queue):
-    REQUIRED_KEYS = {"ticket_number", "time_in", "service_name", "price"}
-
-    while True:
-        payload = to_net.get()
-
-        if payload == "__STOP__":
-            logger.info("🛑 Network process stopping...")
-            break
-
-        if not isinstance(payload, dict):
-            logger.error(f"❌ Payload bukan dict: {payload}")
-            continue
-
-        missing_keys = REQUIRED_KEYS - payload.keys()
-        if missing_keys:
-            logger.error(f"⚠ Payload kurang key: {missing_keys} -> {payload}")
-            continue
-
-        if any(v in (None, "") for v in payload.values()):
-            logger.warning(f"⚠ Ada data None/kosong: {payload}")
+def main():
+    # Config lane invalid = berhenti sebelum ada proses apa pun
+    lane_configs = load_lane_configs()
 
-        try:
-            logger.info(f"📡 Mengirim ke server: {payload}")
-            net.send_data(payload)
-            logger.info(net.get_last_response())
-        except Exception as e:
-            logger.error(f"🚨 Gagal kirim data ke server: {e}")
-            from_net.put({"status": "error", "detail": str(e)})
+    # Metrik di shared memory sebelum fork pertama: listener log & network ikut menulis
+    metrics: CarwashMetrics | None = None
+    if Settings.Metrics.ENABLED:
+        metrics = init_metrics([lane.name for lane in lane_configs])
+        set_drop_hook(metrics.log_dropped.labels("main").inc)
 
+    # Listener log dulu: proses lain (fork) mewarisi queue-nya
+    start_listener(on_written=metrics.log_records.labels().inc if metrics else None)
 
-# =====================================================
-#  Main
-# =====================================================
-def main():
     # Biar gak jalan dobel
     ensure_single_instance()
 
@@ -234,8 +248,12 @@ def main():
     from_net: mp.Queue = mp.Queue()
     lock = mp.Lock()
 
-    periph: Peripheral | None = None
+    periphs: List[Peripheral] = []
     net_proc: mp.Process | None = None
+    events: EventRecorder | None = None
+    metrics_server: MetricsServer | None = None
+    # lane -> (process spooler, to_print)
+    print_procs: Dict[str, Tuple[mp.Process, mp.Queue]] = {}
 
     # Handler SIGTERM (kalau nanti kamu pakai systemd)
     def handle_sigterm(signum, frame):
@@ -244,32 +262,91 @@ def main():
         raise KeyboardInterrupt
 
     signal.signal(signal.SIGTERM, handle_sigterm)
+    # kill -USR1 <pid>: sampling profiler + tabel hot path ke log
+    install_dump_signal()
     
     logger.info("Ini mau ini MainFSM")
 
     try:
-        periph = setup_peripheral()
-        fsm = MainFSM()
-
-        main_process = MainProcess(
-            to_net=to_net,
-            from_net=from_net,
-            lock=lock,
-            periph=periph,
-            fsm=fsm,
+        outbox = TicketOutbox(Settings.System.OUTBOX_FILE)
+        output_scheduler = OutputScheduler()
+
+        # Dipakai bersama semua lane: init data, sequence tiket, ack dari network
+        init_data = InitData(
+            Settings.Server.INIT_DATA_URL,
+            cache=InitDataCache(),
+            fetch_on_init=False,
+        )
+        sequence = TicketSequence()
+        router = AckRouter(from_net, [lane.name for lane in lane_configs])
+        # Transisi, input, cetak & upload semua lane -> events/events-YYYYMMDD.jsonl
+        events = EventRecorder()
+
+        lanes: List[MainProcess] = []
+        for lane in lane_configs:
+            periph = setup_peripheral(lane, output_scheduler)
+            periphs.append(periph)
+
+            # Satu spooler per printer USB (simulasi: cetak langsung ke SimPrinter)
+            to_print: mp.Queue | None = None
+            from_print: mp.Queue | None = None
+            if Settings.Hardware.BACKEND != "sim":
+                to_print = mp.Queue()
+                from_print = mp.Queue()
+                print_proc = mp.Process(
+                    target=print_process,
+                    args=(lane.printer_vid, lane.printer_pid, to_print, from_print, lane.name),
+                    daemon=False,
+                )
+                print_proc.start()
+                print_procs[lane.name] = (print_proc, to_print)
+
+            lanes.append(
+                MainProcess(
+                    to_net=to_net,
+                    from_net=router.queue_for(lane.name),
+                    lock=lock,
+                    periph=periph,
+                    fsm=MainFSM(lane.name),
+                    to_print=to_print,
+                    from_print=from_print,
+                    outbox=outbox,
+                    lane=lane.name,
+                    init_data=init_data,
+                    sequence=sequence,
+                    events=events,
+                    metrics=metrics,
+                    profile=HotPathStats(lane.name) if Settings.Profiling.ENABLED else None,
+                )
+            )
+
+        network = NetworkManager(
+            Settings.Server.SEND_URL,
+            batch_url=Settings.Server.BATCH_URL,
         )
 
-        network = NetworkManager(Settings.Server.SEND_URL)
-
+        # Mode sync tetap ada sebagai fallback
+        net_target = (
+            async_network_process
+            if Settings.Server.NETWORK_MODE == "async"
+            else network_process
+        )
         net_proc = mp.Process(
-            target=network_process,
-            args=(network, to_net, from_net),
+            target=net_target,
+            args=(network, to_net, from_net, str(Settings.System.OUTBOX_FILE)),
             daemon=False,  # biar bisa kita join di finally
         )
         net_proc.start()
 
-        logger.info("🚗 Dispenser carwash starting...")
-        main_process.run()
+        if metrics is not None:
+            try:
+                metrics_server = MetricsServer(metrics.registry)
+                metrics_server.start()
+            except OSError as e:
+                logger.error(f"❌ Endpoint metrics tidak bisa dibuka: {e}")
+
+        logger.info(f"🚗 Dispenser carwash starting ({len(lanes)} lane)...")
+        LaneScheduler(lanes, init_data, router).run()
 
     except KeyboardInterrupt:
         logger.info("🛑 Stopped by user (KeyboardInterrupt)")
@@ -291,13 +368,35 @@ def main():
         except Exception as e:
             logger.error(f"❌ Error saat stop network process: {e}")
 
+        # Hentikan print spooler semua lane
+        for lane_name, (print_proc, to_print) in print_procs.items():
+            try:
+                if print_proc.is_alive():
+                    to_print.put("__STOP__")
+                    print_proc.join(timeout=2)
+                    if print_proc.is_alive():
+                        logger.warning(f"⚠ Print process {lane_name} masih hidup, terminate paksa")
+                        print_proc.terminate()
+            except Exception as e:
+                logger.error(f"❌ Error saat stop print process {lane_name}: {e}")
+
         # Bersihkan peripheral & GPIO
-        cleanup_peripheral(periph)
+        for periph in periphs:
+            cleanup_peripheral(periph)
+        release_hardware()
+
+        if metrics_server is not None:
+            metrics_server.stop()
+
+        # Tulis sisa event log
+        if events is not None:
+            events.close()
 
         # Hapus pidfile
         remove_pidfile()
 
         logger.info("✅ Cleanup selesai, exit.")
+        stop_listener()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+import queue
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PendingTicket:
+    __slots__ = (
+        "correlation_id",
+        "ticket_number",
+        "sent_at",
+        "errors",
+        "last_error",
+    )
+
+    def __init__(
+        self, correlation_id: str, ticket_number: str, sent_at: float
+    ):
+        self.correlation_id = correlation_id
+        self.ticket_number = ticket_number
+        self.sent_at = sent_at
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+
+class AckTracker:
+    """
+    Tabel tiket yang sudah diserahkan ke network process tapi belum di-ack server.
+
+    - track()  : catat tiket baru, return correlation_id untuk pesan to_net
+    - drain()  : ambil semua ack/error dari from_net tanpa block
+    - ukuran tabel dibatasi max_pending; kalau penuh, entri paling lama
+      dibuang (tiketnya tetap aman di outbox, hanya tidak dilacak lagi)
+    """
+
+    def __init__(
+        self,
+        from_net,
+        max_pending: int = Settings.System.MAX_PENDING_ACKS,
+        prefix: str = "",
+        on_result: Optional[
+            Callable[[str, str, Optional[float]], None]
+        ] = None,
+    ):
+        """on_result(ticket_number, status, latency) dipanggil untuk tiap ack/error."""
+        self._from_net = from_net
+        self._on_result = on_result
+        # Multi-lane: correlation_id diawali "<lane>:" supaya ack bisa dirutekan
+        self._prefix = prefix
+        self._max_pending = max_pending
+        self._pending: "OrderedDict[str, PendingTicket]" = (
+            OrderedDict()
+        )
+        self.acked = 0
+        self.errors = 0
+        self.evicted = 0
+
+    def track(self, ticket_number: str) -> str:
+        correlation_id = f"{self._prefix}{uuid.uuid4().hex}"
+        self._pending[correlation_id] = PendingTicket(
+            correlation_id, ticket_number, time.monotonic()
+        )
+        while len(self._pending) > self._max_pending:
+            _, dropped = self._pending.popitem(last=False)
+            self.evicted += 1
+            logger.warning(
+                f"⚠ Tabel pending penuh, tiket {dropped.ticket_number} tidak dilacak lagi"
+            )
+        return correlation_id
+
+    def drain(self, max_items: int = 100) -> int:
+        """Proses ack/error yang sudah ada di from_net. Tidak pernah block."""
+        handled = 0
+        while handled < max_items:
+            try:
+                message = self._from_net.get_nowait()
+            except queue.Empty:
+                break
+            handled += 1
+            self._handle(message)
+        return handled
+
+    def _handle(self, message: Any) -> None:
+        if not isinstance(message, dict):
+            return
+
+        correlation_id = message.get("correlation_id")
+        entry = (
+            self._pending.get(correlation_id)
+            if correlation_id
+            else None
+        )
+        status = message.get("status")
+
+        if self._on_result is not None:
+            latency = (
+                time.monotonic() - entry.sent_at
+                if entry is not None
+                else None
+            )
+            self._on_result(
+                message.get("ticket_number"), status, latency
+            )
+
+        if status == "ok":
+            self.acked += 1
+            if entry is not None:
+                del self._pending[correlation_id]
+            return
+
+        self.errors += 1
+        detail = message.get("detail")
+        if entry is not None:
+            entry.errors += 1
+            entry.last_error = detail
+        logger.warning(
+            f"⚠ Upload tiket {message.get('ticket_number')} gagal: {detail} "
+            f"(pending {len(self._pending)})"
+        )
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def oldest_pending_age(self) -> float:
+        """Detik sejak tiket pending paling lama dikirim, 0 kalau kosong."""
+        if not self._pending:
+            return 0.0
+        oldest = next(iter(self._pending.values()))
+        return time.monotonic() - oldest.sent_at
+
+    def get(self, correlation_id: str) -> Optional[PendingTicket]:
+        return self._pending.get(correlation_id)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "pending": self.pending_count(),
+            "oldest_pending_age": self.oldest_pending_age(),
+            "acked": self.acked,
+            "errors": self.errors,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,349 @@
+import asyncio
+import multiprocessing as mp
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.processes.main_process import NetworkManager
+from dispenser_carwash.processes.network_process import (
+    _send_chunk,
+    install_metrics,
+    is_valid_payload,
+    observe_upload,
+    report,
+    split_message,
+    watch_outbox,
+)
+from dispenser_carwash.utils.http_session import (
+    close_shared_session,
+    connection_stats,
+)
+from dispenser_carwash.utils.logger import setup_logger
+from dispenser_carwash.utils.outbox import TicketOutbox
+
+logger = setup_logger(__name__)
+
+
+class AsyncNetworkWorker:
+    """
+    Worker upload berbasis asyncio: beberapa tiket bisa in-flight sekaligus
+    (dibatasi `concurrency`), jadi satu response lambat tidak menahan tiket
+    lain di belakangnya.
+
+    - to_net dibaca lewat thread executor (blocking get, tanpa busy-wait)
+    - HTTP tetap lewat NetworkManager (session keep-alive, retry, breaker),
+      dijalankan di thread pool sebesar `concurrency`
+    - Upload untuk ticket_number yang sama selalu berurutan (lock per tiket),
+      dan satu baris outbox tidak pernah dikirim dobel secara bersamaan
+    - Mode batch (Settings.Server.BATCH_ENABLED, server mendukung batch):
+      notifikasi tiket dikumpulkan sampai batch_size atau batch_window
+      detik, lalu outbox dikirim per chunk lewat send_batch (beberapa
+      chunk bisa in-flight sekaligus)
+    """
+
+    def __init__(
+        self,
+        net: NetworkManager,
+        to_net: mp.Queue,
+        from_net: mp.Queue,
+        outbox: TicketOutbox,
+        concurrency: int = Settings.Server.MAX_IN_FLIGHT,
+        batch_size: int = (
+            Settings.Server.BATCH_SIZE
+            if Settings.Server.BATCH_ENABLED
+            else 1
+        ),
+        batch_window: float = Settings.Server.BATCH_WINDOW,
+    ):
+        self._net = net
+        self._to_net = to_net
+        self._from_net = from_net
+        self._outbox = outbox
+        self._concurrency = max(1, concurrency)
+
+        self._reader = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="to-net-reader"
+        )
+        self._http = ThreadPoolExecutor(
+            max_workers=self._concurrency, thread_name_prefix="upload"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_flight: Set[int] = set()
+        # ticket_number -> (lock, jumlah task yang memakai)
+        self._ticket_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+        self._batch_size = max(1, batch_size)
+        self._batch_window = batch_window
+        # Window batch yang sedang berjalan + jumlah notifikasi di dalamnya
+        self._batch_timer: Optional[asyncio.Task] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._notified = 0
+
+    def _get_message(self, timeout: Optional[float]) -> Any:
+        return self._to_net.get(timeout=timeout)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self._concurrency)
+        self._batch_full = asyncio.Event()
+
+        backlog = watch_outbox(self._outbox)
+        if backlog:
+            logger.info(f"📦 Replay {backlog} tiket dari outbox")
+        self._schedule_pending()
+
+        while True:
+            wait = (
+                Settings.Server.RETRY_INTERVAL
+                if watch_outbox(self._outbox)
+                else None
+            )
+            try:
+                message = await loop.run_in_executor(
+                    self._reader, self._get_message, wait
+                )
+            except queue.Empty:
+                self._schedule_pending()
+                continue
+
+            if message == "__STOP__":
+                break
+
+            if isinstance(message, dict) and "outbox_id" in message:
+                if self._batching():
+                    self._notify_batch()
+                else:
+                    self._schedule_pending()
+            elif isinstance(message, dict):
+                # Payload tanpa outbox: kirim langsung
+                payload, correlation_id = split_message(message)
+                if is_valid_payload(payload):
+                    self._spawn(None, payload, correlation_id)
+                else:
+                    report(
+                        self._from_net,
+                        "error",
+                        payload,
+                        correlation_id,
+                        "payload tidak valid",
+                    )
+            else:
+                logger.error(f"❌ Payload bukan dict: {message}")
+
+        if self._batch_timer is not None:
+            # Jangan tunggu window habis: kirim yang sudah terkumpul sekarang
+            self._batch_timer.cancel()
+            self._batch_timer = None
+            self._schedule_pending()
+
+        logger.info(
+            f"⏳ Menunggu {len(self._tasks)} upload yang masih jalan..."
+        )
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._reader.shutdown(wait=False)
+        self._http.shutdown(wait=True)
+
+    def _batching(self) -> bool:
+        return self._batch_size > 1 and self._net.supports_batch()
+
+    def _notify_batch(self) -> None:
+        """Satu tiket baru di outbox: buka window batch, atau kirim kalau sudah penuh."""
+        self._notified += 1
+        if self._batch_timer is None:
+            self._batch_timer = asyncio.create_task(
+                self._batch_window_elapsed()
+            )
+        if self._notified >= self._batch_size:
+            self._batch_full.set()
+
+    async def _batch_window_elapsed(self) -> None:
+        try:
+            await asyncio.wait_for(
+                self._batch_full.wait(), self._batch_window
+            )
+        except asyncio.TimeoutError:
+            pass
+        self._batch_timer = None
+        self._notified = 0
+        self._batch_full.clear()
+        self._schedule_pending()
+
+    def _schedule_pending(self) -> None:
+        """Buat task untuk tiket outbox yang belum in-flight (paling lama dulu)."""
+        if self._batching():
+            self._schedule_batches()
+            return
+
+        pending = self._outbox.pending(limit=self._concurrency * 4)
+        for outbox_id, payload, correlation_id in pending:
+            if outbox_id in self._in_flight:
+                continue
+            if not is_valid_payload(payload):
+                self._outbox.ack(outbox_id)
+                report(
+                    self._from_net,
+                    "error",
+                    payload,
+                    correlation_id,
+                    "payload tidak valid",
+                )
+                continue
+            self._spawn(outbox_id, payload, correlation_id)
+
+    def _schedule_batches(self) -> None:
+        pending = self._outbox.pending(
+            limit=self._concurrency * self._batch_size
+        )
+        rows = [
+            row for row in pending if row[0] not in self._in_flight
+        ]
+        for start in range(0, len(rows), self._batch_size):
+            chunk = rows[start : start + self._batch_size]
+            self._in_flight.update(
+                outbox_id for outbox_id, _, _ in chunk
+            )
+            task = asyncio.create_task(self._upload_chunk(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _upload_chunk(
+        self, chunk: List[Tuple[int, Dict[str, Any], Optional[str]]]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._semaphore:
+                # _send_chunk: payload invalid, ack & report per tiket sudah di sana
+                acked = await loop.run_in_executor(
+                    self._http,
+                    _send_chunk,
+                    self._net,
+                    self._outbox,
+                    chunk,
+                    self._from_net,
+                )
+        except Exception as e:
+            logger.error(f"🚨 Gagal kirim batch ke server: {e}")
+            acked = None
+        finally:
+            for outbox_id, _, _ in chunk:
+                self._in_flight.discard(outbox_id)
+
+        if acked is None and not self._net.supports_batch():
+            # Endpoint batch tidak ada: lanjut per tiket
+            logger.warning(
+                "⚠ Server tidak mendukung batch, upload per tiket"
+            )
+            self._schedule_pending()
+
+    def _spawn(
+        self,
+        outbox_id: Optional[int],
+        payload: Dict[str, Any],
+        correlation_id: Optional[str] = None,
+    ) -> None:
+        if outbox_id is not None:
+            self._in_flight.add(outbox_id)
+        task = asyncio.create_task(
+            self._upload(outbox_id, payload, correlation_id)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _acquire_ticket_lock(
+        self, ticket_number: str
+    ) -> asyncio.Lock:
+        lock, users = self._ticket_locks.get(
+            ticket_number, (asyncio.Lock(), 0)
+        )
+        self._ticket_locks[ticket_number] = (lock, users + 1)
+        return lock
+
+    def _release_ticket_lock(self, ticket_number: str) -> None:
+        lock, users = self._ticket_locks[ticket_number]
+        if users <= 1:
+            del self._ticket_locks[ticket_number]
+        else:
+            self._ticket_locks[ticket_number] = (lock, users - 1)
+
+    async def _upload(
+        self,
+        outbox_id: Optional[int],
+        payload: Dict[str, Any],
+        correlation_id: Optional[str],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        ticket_number = str(payload["ticket_number"])
+        lock = self._acquire_ticket_lock(ticket_number)
+        sent = False
+        try:
+            async with lock, self._semaphore:
+                # Bisa saja sudah di-ack oleh upload sebelumnya
+                if outbox_id is not None:
+                    if not self._outbox.contains(outbox_id):
+                        return
+                    self._outbox.mark_attempt(outbox_id)
+
+                logger.info(f"📡 Mengirim ke server: {payload}")
+                started = time.monotonic()
+                try:
+                    response = await loop.run_in_executor(
+                        self._http, self._net.send_data, payload
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"🚨 Gagal kirim data ke server: {e}"
+                    )
+                    response = None
+                observe_upload(started)
+
+                if response is None:
+                    report(
+                        self._from_net,
+                        "error",
+                        payload,
+                        correlation_id,
+                        "server tidak merespon",
+                    )
+                    return
+
+                if outbox_id is not None:
+                    self._outbox.ack(outbox_id)
+                report(self._from_net, "ok", payload, correlation_id)
+                logger.info(connection_stats.summary())
+                sent = True
+        finally:
+            self._release_ticket_lock(ticket_number)
+            if outbox_id is not None:
+                self._in_flight.discard(outbox_id)
+
+        # Notifikasi bisa lebih cepat dari upload: isi lagi slot yang kosong
+        if sent and outbox_id is not None and not self._batching():
+            self._schedule_pending()
+
+
+# =====================================================
+#  Async network process
+# =====================================================
+def async_network_process(
+    net: NetworkManager,
+    to_net: mp.Queue,
+    from_net: mp.Queue,
+    outbox_path: Optional[str] = None,
+    concurrency: int = Settings.Server.MAX_IN_FLIGHT,
+):
+    """Pengganti network_process dengan upload paralel (Settings.Server.NETWORK_MODE = 'async')."""
+    install_metrics()
+    outbox = TicketOutbox(outbox_path)
+    try:
+        asyncio.run(
+            AsyncNetworkWorker(
+                net, to_net, from_net, outbox, concurrency
+            ).run()
+        )
+    finally:
+        logger.info("🛑 Network process stopping...")
+        outbox.close()
+        close_shared_session()
@@ -0,0 +1,205 @@
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.processes.main_process import (
+    InitData,
+    MainProcess,
+)
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class LaneConfig:
+    """Hardware satu lane (pin BCM, printer USB, channel suara)."""
+
+    __slots__ = (
+        "name",
+        "loop_pin",
+        "button_pins",
+        "gate_pin",
+        "led_pin",
+        "printer_vid",
+        "printer_pid",
+        "sound_channel",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        loop_pin: int,
+        button_pins: Dict[str, int],
+        gate_pin: int,
+        led_pin: int,
+        printer_vid: int = Settings.Hardware.PRINTER_VID,
+        printer_pid: int = Settings.Hardware.PRINTER_PID,
+        sound_channel: Optional[int] = None,
+    ):
+        if ":" in name:
+            raise ValueError(
+                f"Nama lane tidak boleh mengandung ':': {name!r}"
+            )
+        self.name = name
+        self.loop_pin = loop_pin
+        self.button_pins = dict(button_pins)
+        self.gate_pin = gate_pin
+        self.led_pin = led_pin
+        self.printer_vid = printer_vid
+        self.printer_pid = printer_pid
+        self.sound_channel = sound_channel
+
+    def pins(self) -> List[int]:
+        return [
+            self.loop_pin,
+            self.gate_pin,
+            self.led_pin,
+            *self.button_pins.values(),
+        ]
+
+
+def load_lane_configs() -> List[LaneConfig]:
+    """
+    Lane dari Settings.Hardware.LANES. Kalau kosong, satu lane dari
+    konfigurasi pin lama (LOOP_SENSOR_PIN, BUTTON_PINS, ...).
+    """
+    hw = Settings.Hardware
+    if not hw.LANES:
+        return [
+            LaneConfig(
+                name="lane1",
+                loop_pin=hw.LOOP_SENSOR_PIN,
+                button_pins=hw.BUTTON_PINS,
+                gate_pin=hw.GATE_CONTROLLER_PIN,
+                led_pin=hw.LED_PINS,
+                printer_vid=hw.PRINTER_VID,
+                printer_pid=hw.PRINTER_PID,
+            )
+        ]
+
+    lanes = [LaneConfig(**lane) for lane in hw.LANES]
+
+    # Pin / nama yang dipakai dua lane hampir pasti salah ketik di settings
+    names = [lane.name for lane in lanes]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Nama lane dobel: {names}")
+    used: Dict[int, str] = {}
+    for lane in lanes:
+        for pin in lane.pins():
+            if pin in used:
+                raise ValueError(
+                    f"Pin {pin} dipakai {used[pin]} dan {lane.name}"
+                )
+            used[pin] = lane.name
+    return lanes
+
+
+class AckRouter:
+    """
+    Satu-satunya pembaca from_net di mode multi-lane. Ack/error diteruskan
+    ke queue lane pemiliknya berdasarkan prefix correlation_id ("<lane>:...").
+    AckTracker tiap lane cukup get_nowait() dari queue-nya sendiri.
+    """
+
+    def __init__(self, from_net, lanes: List[str]):
+        self._from_net = from_net
+        self._queues: Dict[str, "queue.Queue[Any]"] = {
+            name: queue.Queue() for name in lanes
+        }
+        self._thread: Optional[threading.Thread] = None
+
+    def queue_for(self, lane: str) -> "queue.Queue[Any]":
+        return self._queues[lane]
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="ack-router", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            message = self._from_net.get()
+            if message == "__STOP__":
+                break
+            if not isinstance(message, dict):
+                continue
+
+            lane = str(message.get("correlation_id") or "").partition(
+                ":"
+            )[0]
+            target = self._queues.get(lane)
+            if target is None:
+                # Tiket replay dari outbox lama (tanpa lane): cukup dicatat
+                logger.info(
+                    f"📨 Ack tanpa lane untuk tiket {message.get('ticket_number')}: "
+                    f"{message.get('status')}"
+                )
+                continue
+            target.put_nowait(message)
+
+
+class LaneScheduler:
+    """
+    Menjalankan N MainProcess (satu per lane) dalam satu proses.
+
+    - tiap lane punya thread sendiri yang block di InputEventQueue lane itu,
+      jadi tiket / fsync / suara di satu lane tidak menunda lane lain
+    - init data dimuat sekali lalu di-refresh di background untuk semua lane
+    - network/outbox worker, sequence tiket dan pipeline log dipakai bersama
+    - lane yang crash dicatat, lane lain tetap jalan
+    """
+
+    def __init__(
+        self,
+        lanes: List[MainProcess],
+        init_data: InitData,
+        router: AckRouter,
+    ):
+        self._lanes = lanes
+        self._init_data = init_data
+        self._router = router
+        self._threads: List[threading.Thread] = []
+
+    def _run_lane(self, lane: MainProcess) -> None:
+        try:
+            lane.run()
+        except Exception:
+            logger.exception(
+                f"❗ Lane {lane.lane} berhenti karena error"
+            )
+
+    def _on_init_data_refreshed(self) -> None:
+        for lane in self._lanes:
+            lane.on_init_data_refreshed()
+
+    def start(self) -> None:
+        # Boot dari snapshot lokal; kalau belum pernah ada, terpaksa tunggu server
+        from_cache = self._init_data.load_cached()
+        if not from_cache:
+            self._init_data.refresh()
+
+        self._router.start()
+        for lane in self._lanes:
+            thread = threading.Thread(
+                target=self._run_lane,
+                args=(lane,),
+                name=f"lane-{lane.lane}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        self._init_data.start_background_refresh(
+            self._on_init_data_refreshed,
+            immediate=from_cache,
+        )
+        logger.info(f"🛣 {len(self._lanes)} lane berjalan")
+
+    def run(self) -> None:
+        """start() lalu block sampai semua lane berhenti (KeyboardInterrupt tetap bisa masuk)."""
+        self.start()
+        for thread in self._threads:
+            while thread.is_alive():
+                thread.join(timeout=1.0)
@@ -1,17 +1,40 @@
 import multiprocessing as mp
+import threading
 import time
 from datetime import datetime
 from enum import Enum, auto
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import requests
 
 from dispenser_carwash.config.settings import Settings
 from dispenser_carwash.hardware.input_bool import InputBool
+from dispenser_carwash.hardware.input_event import InputEvent, InputEventQueue
 from dispenser_carwash.hardware.out_bool import OutputBool
-from dispenser_carwash.hardware.printer import PrinterDriver, PrinterUnavailable
+from dispenser_carwash.hardware.phrase import service_announcement
+from dispenser_carwash.hardware.printer import (
+    PrinterDriver,
+    PrinterStatus,
+    PrinterUnavailable,
+)
 from dispenser_carwash.hardware.sound import Sound
+from dispenser_carwash.processes.ack_tracker import AckTracker
+from dispenser_carwash.processes.service_catalog import ServiceCatalog, ServiceRecord
+from dispenser_carwash.processes.ticket_template import get_ticket_template
+from dispenser_carwash.utils import ean13
+from dispenser_carwash.utils.event_log import EventRecorder
+from dispenser_carwash.utils.http_session import get_shared_session
+from dispenser_carwash.utils.init_cache import InitDataCache
 from dispenser_carwash.utils.logger import setup_logger
+from dispenser_carwash.utils.metrics import CarwashMetrics, LaneMetrics
+from dispenser_carwash.utils.outbox import TicketOutbox
+from dispenser_carwash.utils.profiling import HotPathStats, instrument_peripheral
+from dispenser_carwash.utils.retry_policy import (
+    RetryPolicy,
+    get_breaker,
+    get_retry_budget,
+)
+from dispenser_carwash.utils.ticket_sequence import TicketSequence
 
 logger = setup_logger(__name__)
 
@@ -25,6 +48,8 @@ class Peripheral:
     indicator_status: OutputBool
     printer: PrinterDriver
     sound: Sound
+    # Opsional: kalau None, main loop kembali ke mode polling read_input()
+    input_events: Optional[InputEventQueue] = None
 
 class State(Enum):
     IDLE = auto()
@@ -48,9 +73,41 @@ class Event(Enum):
     GATE_OPENED = auto()
     VEHICLE_ENTER = auto()
 
+StateHandler = Callable[[], None]
+
+
+class StateSpec:
+    __slots__ = ("handler", "on_enter", "on_exit", "timeout")
+
+    def __init__(
+        self,
+        handler: Optional[StateHandler] = None,
+        on_enter: Optional[StateHandler] = None,
+        on_exit: Optional[StateHandler] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.handler = handler
+        self.on_enter = on_enter
+        self.on_exit = on_exit
+        self.timeout = timeout
+
+
 class MainFSM:
-    def __init__(self):
+    """
+    FSM + dispatcher berbasis tabel.
+
+    - register(): satu handler per state, plus hook on_enter/on_exit dan
+      timeout (detik) yang otomatis memicu Event.TIMEOUT
+    - dispatch(): satu tick, hanya handler state sekarang yang dipanggil (O(1))
+    - trigger(): lookup tabel per state; pesan log transisi sudah
+      disiapkan saat __init__, tidak dirangkai tiap transisi
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
         self.state = State.IDLE
+        # Event yang membawa FSM ke state sekarang (None = state awal)
+        self.last_event: Optional[Event] = None
         self.transitions = {
             (State.IDLE, Event.ARRIVED): State.GREETING,
             (State.GREETING, Event.GREETING_DONE): State.SELECTING_SERVICE,
@@ -64,54 +121,147 @@ class MainFSM:
             (State.VEHICLE_STAYING, Event.VEHICLE_ENTER): State.IDLE,
             
         }
-        
-    def trigger(self, event: Event)-> None:
-        key = (self.state, event)
-        if  key not in self.transitions:
+        # state -> {event: (next_state, pesan log)}
+        self._table: Dict[State, Dict[Event, Tuple[State, str]]] = {
+            state: {} for state in State
+        }
+        tag = f"[{name}] " if name else ""
+        for (state, event), next_state in self.transitions.items():
+            self._table[state][event] = (
+                next_state,
+                f"{tag}{state.name} --({event.name})--> {next_state.name}",
+            )
+        self._specs: Dict[State, StateSpec] = {state: StateSpec() for state in State}
+        self._deadline: Optional[float] = None
+        # Dipanggil setelah tiap transisi: listener(state_lama, event, state_baru)
+        self._listeners: List[Callable[[State, Event, State], None]] = []
+
+    def add_listener(self, listener: Callable[[State, Event, State], None]) -> None:
+        """Pasang pengamat transisi (metrik, benchmark). Harus ringan."""
+        self._listeners.append(listener)
+
+    def register(
+        self,
+        state: State,
+        handler: Optional[StateHandler] = None,
+        on_enter: Optional[StateHandler] = None,
+        on_exit: Optional[StateHandler] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self._specs[state] = StateSpec(handler, on_enter, on_exit, timeout)
+
+    def instrument(self, wrap: Callable[[str, StateHandler], StateHandler]) -> None:
+        """Bungkus handler, on_enter & on_exit semua state (profiling)."""
+        for state, spec in self._specs.items():
+            for kind in ("handler", "on_enter", "on_exit"):
+                fn = getattr(spec, kind)
+                if fn is not None:
+                    setattr(spec, kind, wrap(f"{state.name}.{kind}", fn))
+
+    def start(self) -> None:
+        """Jalankan entry action state awal (panggil sekali sebelum dispatch)."""
+        self._enter(self.state)
+
+    def _enter(self, state: State) -> None:
+        spec = self._specs[state]
+        self._enter_deadline(spec)
+        if spec.on_enter is not None:
+            spec.on_enter()
+
+    def _enter_deadline(self, spec: StateSpec) -> None:
+        self._deadline = (
+            time.monotonic() + spec.timeout if spec.timeout is not None else None
+        )
+
+    def trigger(self, event: Event)-> bool:
+        entry = self._table[self.state].get(event)
+        if entry is None:
             logger.warning(f"⚠ Transisi tidak valid: {self.state.name} + {event.name}")
-            return
-            
-        next_state = self.transitions[key]
-        logger.info(f"{self.state.name} --({event.name})--> {next_state.name}")
+            return False
+
+        next_state, message = entry
+        logger.info(message)
+
+        previous = self.state
+        on_exit = self._specs[previous].on_exit
+        if on_exit is not None:
+            on_exit()
         self.state = next_state
+        self.last_event = event
+        for listener in self._listeners:
+            listener(previous, event, next_state)
+        self._enter(next_state)
+        return True
+
+    def dispatch(self) -> None:
+        """Satu tick: cek timeout state sekarang, lalu panggil handler-nya."""
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self._deadline = None
+            if Event.TIMEOUT in self._table[self.state]:
+                self.trigger(Event.TIMEOUT)
+                return
+
+        handler = self._specs[self.state].handler
+        if handler is not None:
+            handler()
+
+    def cancel_timeout(self) -> None:
+        """Matikan timeout state sekarang (misal: pilihan sudah masuk)."""
+        self._deadline = None
+
+    def restart_timeout(self) -> None:
+        """Hitung ulang timeout state sekarang dari nol (misal: pilihan dibatalkan)."""
+        self._enter_deadline(self._specs[self.state])
+
+    def time_until_timeout(self) -> Optional[float]:
+        """Detik sampai timeout state sekarang, None kalau tidak ada."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
 
 """ Utils """
 class TicketGenerator:
-    def __init__(self, last_barcode_number: int):
+    def __init__(self, last_barcode_number: int, sequence: Optional[TicketSequence] = None):
+        """
+        sequence: alokator persisten; kalau None, nomor hanya disimpan di memori
+        """
+        self._sequence = sequence
         self._last_ticket_number = last_barcode_number
+        self._lock = threading.Lock()
+        if sequence is not None:
+            sequence.sync(last_barcode_number)
+
+    def sync_last_number(self, last_ticket_number: int) -> None:
+        """Samakan dengan nomor terakhir di server, hanya boleh maju (hindari duplikat)."""
+        if self._sequence is not None:
+            self._sequence.sync(last_ticket_number)
+            return
+        with self._lock:
+            if last_ticket_number > self._last_ticket_number:
+                logger.info(
+                    f"🔢 Nomor tiket disinkronkan: {self._last_ticket_number} -> {last_ticket_number}"
+                )
+                self._last_ticket_number = last_ticket_number
+
+    def _next_number(self) -> int:
+        if self._sequence is not None:
+            return self._sequence.next()
+        with self._lock:
+            self._last_ticket_number += 1
+            return self._last_ticket_number
 
     def _checksum_ean_13(self, number: str) -> int:
         """
         Hitung checksum EAN-13 untuk 12 digit input.
         """
-        if len(number) != 12 or not number.isdigit():
-            raise ValueError("EAN-13 checksum calculation requires exactly 12 digits")
-
-        sum_odd = sum(int(number[i]) for i in range(0, 12, 2))      # Posisi 1,3,5,...
-        sum_even = sum(int(number[i]) for i in range(1, 12, 2))     # Posisi 2,4,6,...
-
-        checksum = (10 - ((sum_odd + 3 * sum_even) % 10)) % 10
-        return checksum
+        return ean13.checksum(number)
 
     def create_ean_ticket(self, service_id: int) -> str:
         """
         Generate full 13-digit EAN code (string).
+        899 (GS1 Indonesia) + service_id 2 digit + 7 digit incremental + checksum
         """
-        self._last_ticket_number += 1
-        
-        prefix = "899"  # GS1 Indonesia
-        service_id_str = f"{service_id:02d}"  # Selalu 2 digit
-        sequential = f"{self._last_ticket_number:07d}"  # 7 digit incremental
-
-        raw_number = f"{prefix}{service_id_str}{sequential}"
-
-        # Pastikan tetap 12 digit sebelum checksum
-        if len(raw_number) != 12:
-            raise ValueError(f"EAN base must be 12 digits, got {len(raw_number)} → {raw_number}")
-
-        checksum = self._checksum_ean_13(raw_number)
-        full_ean = f"{raw_number}{checksum}"
-        return full_ean
+        return ean13.make_code(service_id, self._next_number())
 
 
 class PrintTicket:
@@ -122,6 +272,16 @@ class PrintTicket:
         if missing:
             raise ValueError(f"Missing keys: {missing}")
 
+    @staticmethod
+    def render_ticket(data: Dict[str, Any]) -> bytes:
+        """
+        Render satu tiket utuh jadi satu buffer ESC/POS dari template
+        yang sudah di-compile (hanya field variabel yang diisi per tiket).
+        Raise ValueError kalau data tidak lengkap.
+        """
+        PrintTicket._validate_data(data)
+        return get_ticket_template().render(data)
+
     @staticmethod
     def print_ticket(driver: PrinterDriver, data: Dict[str, Any]) -> bool:
         """
@@ -138,58 +298,7 @@ class PrintTicket:
 
             # 🔍 Validasi data
             PrintTicket._validate_data(data)
-
-            # ============================
-            # Header: WELCOME + nama usaha
-            # ============================
-            driver.set(font="b", bold=True, width=2, height=2, align="center")
-            driver.text("WELCOME\n")
-            driver.text("BALI DRIVE THRU CARWASH\n")
-
-            # ============================
-            # Alamat (font normal)
-            # ============================
-            driver.set(font="b", bold=False, width=1, height=1, align="center")
-            driver.text("Jl. Mahendradata Selatan No.19 Denpasar, Bali\n\n")
-
-            # ============================
-            # Info waktu
-            # ============================
-            driver.set(font="b", bold=False, width=1, height=1, align="center")
-            driver.text(str(data["time_in"]))
-            driver.text("\n")
-
-            # ============================
-            # Barcode
-            # ============================
-            driver.barcode(
-                str(data["ticket_number"]),
-                "EAN13",
-                height=64,
-                width=2,
-                pos="BELOW"
-            )
-            driver.text("\n")
-
-            # ============================
-            # Nama paket
-            # ============================
-            driver.set(font="b", bold=True, width=2, height=2, align="center")
-            driver.text(str(data["service_name"]))
-            driver.text("\n")
-
-            # ============================
-            # Harga
-            # ============================
-            driver.set(font="b", bold=False, width=1, height=1, align="center")
-            driver.text("Rp.")
-            driver.text(str(data["price"]))
-            driver.text("\n")
-
-            # ============================
-            # Cut kertas
-            # ============================
-            driver.cut()
+            get_ticket_template().apply(driver, data)
             return True
         
         except PrinterUnavailable as e:
@@ -205,15 +314,32 @@ class PrintTicket:
 class BaseRequester:
     """
     Kelas dasar untuk handle:
-    - retry
-    - delay
+    - retry (exponential backoff + full jitter, dibatasi retry budget)
+    - circuit breaker per endpoint (fail fast saat server mati)
     - logging
     - parsing JSON -> dict
+    - koneksi keep-alive (session pool bersama per proses)
     """
 
-    def __init__(self, retries: int = 3, delay: int = 2):
-        self._retries = retries
-        self._delay = delay
+    UNSUPPORTED_STATUS = (404, 405, 501)
+
+    def __init__(
+        self,
+        retries: int = 3,
+        delay: int = 2,
+        session: Optional[requests.Session] = None,
+        policy: Optional[RetryPolicy] = None,
+    ):
+        # delay = base delay backoff (attempt ke-n: random 0..delay*2^(n-1))
+        self._policy = policy or RetryPolicy(max_attempts=retries, base_delay=delay)
+        self._retries = self._policy.max_attempts
+        # None = pakai session keep-alive bersama milik proses ini
+        self._session = session
+        # HTTP status terakhir (None kalau tidak ada response sama sekali)
+        self._last_status: Optional[int] = None
+
+    def _get_session(self) -> requests.Session:
+        return self._session if self._session is not None else get_shared_session()
 
     def _request_json(
         self,
@@ -227,45 +353,81 @@ class BaseRequester:
         method: "GET" / "POST" / dst
         label : nama operasi untuk log (misal: 'init data', 'send data')
         url   : endpoint
-        kwargs: diteruskan ke requests.request (json=..., data=..., params=..., dll)
+        kwargs: diteruskan ke Session.request (json=..., data=..., params=..., dll)
         """
+        self._last_status = None
+        breaker = get_breaker(url)
+        budget = get_retry_budget()
+
+        if not breaker.allow_request():
+            logger.warning(f"⛔ {label} - circuit OPEN, request dilewati")
+            return None
+
+        budget.record_request()
         for attempt in range(1, self._retries + 1):
+            server_failed = False
             try:
                 logger.info(
                     f"🔄 {label} (attempt {attempt}/{self._retries})..."
                 )
 
-                response = requests.request(
+                response = self._get_session().request(
                     method=method.upper(),
                     url=url,
                     timeout=timeout,
                     **kwargs,
                 )
+                self._last_status = response.status_code
                 response.raise_for_status()
 
                 data = response.json()
                 if not isinstance(data, dict):
                     raise ValueError("Response JSON harus berupa dict")
 
+                breaker.record_success()
                 logger.info(f"✔ {label} berhasil")
                 return data
 
             except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
                 logger.warning(f"⚠ {label} - Koneksi gagal: {e}")
+                server_failed = True
             except requests.exceptions.HTTPError as e:
                 logger.warning(f"🚨 {label} - HTTP Error: {e}")
+                server_failed = (self._last_status or 500) >= 500
+                if self._last_status in self.UNSUPPORTED_STATUS:
+                    # Endpoint tidak ada / method tidak didukung, retry percuma
+                    breaker.record_success()
+                    break
             except (requests.exceptions.JSONDecodeError, ValueError) as e:
                 logger.warning(f"⚠ {label} - Response tidak valid: {e}")
             except Exception as e:
                 logger.warning(f"❗ {label} - Error tak terduga: {e}")
 
-            if attempt < self._retries:
-                logger.info(f"⏳ {label} - Retry dalam {self._delay} detik...")
-                time.sleep(self._delay)
+            # Hanya error koneksi / 5xx yang dihitung breaker, 4xx berarti server hidup
+            if server_failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            if attempt >= self._retries:
+                break
+            if not breaker.allow_request():
+                logger.warning(f"⛔ {label} - circuit OPEN, berhenti retry")
+                break
+            if not budget.try_spend():
+                logger.warning(f"⛔ {label} - retry budget habis, berhenti retry")
+                break
+
+            delay = self._policy.backoff(attempt)
+            logger.info(f"⏳ {label} - Retry dalam {delay:.2f} detik...")
+            time.sleep(delay)
 
         logger.error(f"❌ {label} - Gagal setelah semua percobaan")
         return None
 
+    def get_last_status(self) -> Optional[int]:
+        return self._last_status
+
 
 class InitData(BaseRequester):
     def __init__(
@@ -273,27 +435,92 @@ class InitData(BaseRequester):
         url: str,
         retries: int = 3,
         delay: int = 2,
+        session: Optional[requests.Session] = None,
+        cache: Optional[InitDataCache] = None,
+        fetch_on_init: bool = True,
     ):
         """
         Init data dari endpoint:
         - last_ticket_number
         - service_data
+
+        cache        : snapshot lokal, disimpan setiap fetch sukses
+        fetch_on_init: False = jangan fetch di constructor (pakai load_cached()
+                       + start_background_refresh() untuk boot cepat)
         """
-        super().__init__(retries=retries, delay=delay)
+        super().__init__(retries=retries, delay=delay, session=session)
 
         self._url = url
         self._data: Optional[Dict[str, Any]] = None
+        self._cache = cache
+        self._source: Optional[str] = None  # "server" / "cache"
 
-        # langsung fetch saat inisialisasi
-        self._fetch_init_data()
+        if fetch_on_init:
+            self._fetch_init_data()
 
-    def _fetch_init_data(self) -> None:
+    def _fetch_init_data(self) -> bool:
         data = self._request_json(
             label="Fetch init data",
             method="GET",
             url=self._url,
         )
-        self._data = data  # bisa None kalau gagal
+        if data is None:
+            # Data lama (misal dari cache) tetap dipakai
+            return False
+
+        self._data = data
+        self._source = "server"
+        if self._cache is not None:
+            self._cache.save(data)
+        return True
+
+    def refresh(self) -> bool:
+        """Fetch ulang dari server (blocking). True kalau sukses."""
+        return self._fetch_init_data()
+
+    def load_cached(self) -> bool:
+        """Muat snapshot lokal. True kalau ada snapshot yang valid."""
+        if self._cache is None:
+            return False
+        data = self._cache.load()
+        if data is None:
+            return False
+        self._data = data
+        self._source = "cache"
+        return True
+
+    def get_source(self) -> Optional[str]:
+        return self._source
+
+    def start_background_refresh(
+        self,
+        on_update: Callable[[], None],
+        immediate: bool = True,
+        interval: float = Settings.Interval.INIT_REFRESH,
+    ) -> threading.Thread:
+        """
+        Thread yang menyinkronkan init data dengan server.
+        Setelah fetch sukses, on_update() dipanggil (dari thread ini) lalu
+        refresh lagi setiap `interval` detik. Kalau gagal, coba lagi setelah
+        Settings.Server.RETRY_INTERVAL.
+        """
+
+        def _loop() -> None:
+            wait = 0.0 if immediate else interval
+            while True:
+                time.sleep(wait)
+                if self._fetch_init_data():
+                    try:
+                        on_update()
+                    except Exception as e:
+                        logger.error(f"❌ Gagal menerapkan init data baru: {e}")
+                    wait = interval
+                else:
+                    wait = Settings.Server.RETRY_INTERVAL
+
+        thread = threading.Thread(target=_loop, name="init-data-refresh", daemon=True)
+        thread.start()
+        return thread
 
     def get_last_ticket_number(self) -> Optional[int]:
         if self._data and "last_ticket_number" in self._data:
@@ -325,13 +552,19 @@ class NetworkManager(BaseRequester):
         url: str,
         retries: int = 3,
         delay: int = 2,
+        session: Optional[requests.Session] = None,
+        batch_url: Optional[str] = None,
     ):
         """
         Kirim data ke server dengan POST + retry.
+        batch_url: endpoint upload banyak tiket sekaligus (None = tidak dipakai)
         """
-        super().__init__(retries=retries, delay=delay)
+        super().__init__(retries=retries, delay=delay, session=session)
 
         self._url = url
+        self._batch_url = batch_url
+        # Jadi False kalau server ternyata tidak punya endpoint batch
+        self._batch_supported = batch_url is not None
         self._last_response: Optional[Dict[str, Any]] = None
 
     def send_data(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -350,144 +583,571 @@ class NetworkManager(BaseRequester):
         self._last_response = data
         return data
 
+    def supports_batch(self) -> bool:
+        return self._batch_supported
+
+    def send_batch(self, payloads: List[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Kirim banyak tiket dalam satu POST ke batch_url.
+
+        Request : {"tickets": [payload, ...]}
+        Response: {"results": [{"ticket_number": ..., "status": "ok"/"duplicate"/"error", "detail": ...}]}
+
+        Return:
+            dict ticket_number -> hasil per tiket (partial success dimungkinkan)
+            None -> request gagal; kalau endpoint tidak ada, supports_batch() jadi False
+        """
+        if not self._batch_supported:
+            return None
+
+        data = self._request_json(
+            label=f"Kirim batch {len(payloads)} tiket",
+            method="POST",
+            url=self._batch_url,
+            json={"tickets": payloads},
+        )
+        self._last_response = data
+
+        if data is None:
+            if self._last_status in self.UNSUPPORTED_STATUS:
+                logger.warning("⚠ Server tidak mendukung batch, kembali ke POST per tiket")
+                self._batch_supported = False
+            return None
+
+        results = data.get("results")
+        if not isinstance(results, list):
+            logger.warning(f"⚠ Response batch tidak valid: {data}")
+            return None
+
+        return {
+            str(item.get("ticket_number")): item
+            for item in results
+            if isinstance(item, dict)
+        }
+
     def get_last_response(self) -> Optional[Dict[str, Any]]:
         if self._last_response is None:
             logger.warning("⚠ Belum ada response yang tersimpan")
         return self._last_response
 
-class Utils:
-    @staticmethod    
-    def get_service(data, service_id):
-        return next((item for item in data if item["id"] == service_id), None)
-
-
 """ Process """        
 class MainProcess:
     def __init__(self, to_net: mp.Queue, from_net: mp.Queue, lock: mp.Lock,
-                 periph: Peripheral, fsm: "MainFSM"):
+                 periph: Peripheral, fsm: "MainFSM",
+                 to_print: Optional[mp.Queue] = None,
+                 from_print: Optional[mp.Queue] = None,
+                 outbox: Optional[TicketOutbox] = None,
+                 lane: str = "",
+                 init_data: Optional["InitData"] = None,
+                 sequence: Optional[TicketSequence] = None,
+                 events: Optional[EventRecorder] = None,
+                 metrics: Optional[CarwashMetrics] = None,
+                 profile: Optional[HotPathStats] = None):
+        """
+        Multi-lane (LaneScheduler): lane = nama lane, init_data & sequence
+        dibagi antar lane, from_net = queue ack milik lane ini (AckRouter).
+        Kalau init_data None, MainProcess memuat & me-refresh sendiri.
+        events: event log terstruktur (transisi, input, cetak, upload), opsional.
+        metrics: registry metrik (endpoint /metrics), opsional.
+        profile: timer hot path & budget loop (Settings.Profiling), opsional.
+        """
+        self.lane = lane
+        self._tag = f"[{lane}] " if lane else ""
         self._to_net = to_net
         self._from_net = from_net
-        self._service_data = None
+        # Kalau to_print ada, tiket dicetak oleh print_process (async)
+        self._to_print = to_print
+        self._from_print = from_print
+        # Tiket ditulis durable ke outbox sebelum FSM lanjut
+        self._outbox = outbox
+        # Event log terstruktur, dicatat tanpa I/O di thread lane
+        self._events = events
+        self._event_lane = lane or "main"
+        # Ack/error dari network process, dilacak per correlation_id
+        self._acks = AckTracker(
+            from_net,
+            prefix=f"{lane}:" if lane else "",
+            on_result=self._record_upload if events is not None else None,
+        )
+        self._catalog: Optional[ServiceCatalog] = None
         self._last_ticket_number = None
-        self._selected_service = None
+        self._selected_service: Optional[ServiceRecord] = None
         self._payload: Dict[str, Any] = {}
         self._lock = lock
-        self._periph = periph
+        # Profiling: hardware dibungkus timer; None = objek asli tanpa overhead
+        self._profile = profile
+        self._periph = instrument_peripheral(periph, profile) if profile is not None else periph
+        if profile is not None:
+            self._enqueue_upload = profile.wrap("to_net.put", self._enqueue_upload)
         self._fsm = fsm
         self._ticket_gen = None 
-        self._init_data = InitData(Settings.Server.INIT_DATA_URL)
+        # Nomor urut tiket persisten, tiket bisa terbit tanpa menunggu server
+        self._sequence = sequence if sequence is not None else TicketSequence()
+        # Metrik startup: waktu sampai lane siap melayani
+        self._started_at = time.monotonic()
+        self.time_to_ready: Optional[float] = None
+        # Tidak fetch di sini: run() boot dari snapshot lalu sinkron di background
+        self._owns_init_data = init_data is None
+        self._init_data = init_data if init_data is not None else InitData(
+            Settings.Server.INIT_DATA_URL,
+            cache=InitDataCache(),
+            fetch_on_init=False,
+        )
         self._network = NetworkManager(Settings.Server.SEND_URL)
+        # Event yang sudah diambil dari queue saat menunggu, diproses di iterasi berikutnya
+        self._pending_events: List[InputEvent] = []
+        # Tombol yang sempat pressed sejak IDLE (diisi run(), dipakai SELECTING_SERVICE)
+        self._pressed: Set[str] = set()
+        # Status terakhir dari PrinterHealthMonitor (None = belum ada / simulasi)
+        self._printer_status: Optional[PrinterStatus] = None
+        # PRINTER_NOT_READY = "delay": batas waktu tiket ditahan; setelah lewat
+        # (PRINTER_HOLD_EXPIRED = "refuse") pilihan berikutnya ditolak
+        self._hold_deadline: Optional[float] = None
+        self._printer_refused = False
+        # IDLE setelah TIMEOUT / LEAVE: tunggu loop kosong dulu sebelum ARRIVED
+        self._await_loop_clear = False
+        if events is not None:
+            fsm.add_listener(self._record_transition)
+        # Counter & histogram lane ini di shared memory, di-update tanpa lock
+        self._metrics = LaneMetrics(metrics, self._event_lane) if metrics is not None else None
+        if self._metrics is not None:
+            fsm.add_listener(self._metrics.on_transition)
+
+    def _record_transition(self, previous: State, event: Event, new: State) -> None:
+        self._events.transition(self._event_lane, previous.name, event.name, new.name)
+
+    def _record_upload(self, ticket_number: str, status: str, latency: Optional[float]) -> None:
+        self._events.record(
+            "upload",
+            self._event_lane,
+            ticket_number,
+            status,
+            round(latency, 6) if latency is not None else None,
+        )
+
+    def _print_result_listener(self) -> None:
+        """Thread: baca hasil dari print_process, nyalakan indikator kalau gagal."""
+        while True:
+            result = self._from_print.get()
+            if result == "__STOP__":
+                break
+            if "printer" in result:
+                self._on_printer_status(result["printer"])
+                continue
+            if self._events is not None:
+                self._events.record(
+                    "print", self._event_lane, result.get("job_id"), result.get("status") == "ok"
+                )
+            if self._metrics is not None:
+                self._metrics.print_result(result.get("status") == "ok", result.get("duration"))
+            if result.get("status") == "ok":
+                logger.info(
+                    f"🖨️ Tiket {result.get('job_id')} tercetak "
+                    f"({result.get('duration', 0):.3f} s)"
+                )
+                continue
+            logger.warning(
+                f"⚠ Tiket {result.get('job_id')} tidak tercetak: {result.get('detail')}"
+            )
+            self._signal_print_failed()
+
+    def _on_printer_status(self, status: PrinterStatus) -> None:
+        """Dipanggil thread print-result-listener setiap status printer berubah."""
+        was_ready = self._printer_ready()
+        self._printer_status = status
+        if status.ready:
+            if not was_ready:
+                logger.info(f"🖨️ {self._tag}Printer siap lagi")
+                self._periph.indicator_status.turn_off()
+        else:
+            logger.warning(f"⚠ {self._tag}Printer tidak siap: {status.describe()}")
+            # Indikator berkedip terus sampai printer siap
+            self._periph.indicator_status.blink(0.5, 0.5)
+        # Bangunkan loop lane: tiket yang ditahan (PRINTER_NOT_READY = "delay") bisa lanjut
+        events_queue = self._periph.input_events
+        if events_queue is not None:
+            events_queue.post("printer", False)
+
+    def _signal_print_failed(self) -> None:
+        # Printer tidak siap: kedip terus dari _on_printer_status jangan ditimpa
+        if self._printer_ready():
+            self._periph.indicator_status.blink(0.2, 0.2, n=5)
+
+    def _printer_ready(self) -> bool:
+        status = self._printer_status
+        return status is None or status.ready
+
+    def _printer_blocks_ticket(self) -> bool:
+        return Settings.Hardware.PRINTER_NOT_READY != "ignore" and not self._printer_ready()
+
+    def pending_count(self) -> int:
+        """Jumlah tiket yang belum di-ack server."""
+        return self._acks.pending_count()
+
+    def oldest_pending_age(self) -> float:
+        """Umur (detik) tiket paling lama yang belum di-ack server."""
+        return self._acks.oldest_pending_age()
+
+    def _collect_pressed(self) -> Set[str]:
+        """
+        Ambil semua edge sejak iterasi sebelumnya.
+        Return nama input yang sempat pressed, supaya tekanan singkat
+        (pressed lalu released sebelum dibaca) tidak hilang.
+        """
+        events_queue = self._periph.input_events
+        if events_queue is None:
+            return set()
+
+        events = self._pending_events + events_queue.drain()
+        self._pending_events = []
+        if self._events is not None:
+            for event in events:
+                if event.source not in ("sound", "printer"):
+                    self._events.record("input", self._event_lane, event.source, event.active)
+        return {event.source for event in events if event.active}
+
+    def _is_pressed(self, name: str, pressed: Set[str]) -> bool:
+        device: Optional[InputBool] = getattr(self._periph, name, None)
+        return name in pressed or (device is not None and device.read_input())
+
+    def _wait_next_iteration(self, state_changed: bool) -> None:
+        events_queue = self._periph.input_events
+        if events_queue is None:
+            # Mode polling: biar CPU ga 100% (state baru langsung diproses)
+            if not state_changed:
+                time.sleep(0.01)
+            return
+
+        # State baru saja berubah -> langsung proses state berikutnya
+        if state_changed:
+            return
+
+        if self._fsm.state in (State.IDLE, State.SELECTING_SERVICE, State.VEHICLE_STAYING):
+            # Menunggu kendaraan / tombol / suara konfirmasi selesai (end callback
+            # sound memasukkan event "sound"): block sampai ada event, CPU idle
+            timeout: Optional[float] = None
+        else:
+            return
+
+        if timeout is None and self._acks.pending_count():
+            # Masih ada tiket belum di-ack: bangun berkala untuk drain from_net
+            timeout = Settings.Interval.ACK_DRAIN
+
+        # Bangun tepat waktu untuk timeout state (Event.TIMEOUT)
+        remaining = self._fsm.time_until_timeout()
+        if remaining is not None and (timeout is None or remaining < timeout):
+            timeout = remaining
+        if self._hold_deadline is not None:
+            remaining = max(0.0, self._hold_deadline - time.monotonic())
+            if timeout is None or remaining < timeout:
+                timeout = remaining
+
+        event = events_queue.get(timeout=timeout)
+        if event is not None:
+            self._pending_events.append(event)
+
+    def _on_init_data_refreshed(self) -> None:
+        """Dipanggil thread refresh setelah init data baru dari server masuk."""
+        catalog = ServiceCatalog.from_service_data(self._init_data.get_service_data())
+        if catalog is not None:
+            changes = catalog.changes_from(self._catalog)
+            # Ganti referensi sekaligus, main loop langsung memakai katalog baru
+            self._catalog = catalog
+            if changes:
+                logger.info(f"🏷 Katalog service diperbarui: {', '.join(changes)}")
+                self._prepare_announcements()
+
+        last_ticket_number = self._init_data.get_last_ticket_number()
+        if last_ticket_number is not None and self._ticket_gen is not None:
+            self._ticket_gen.sync_last_number(last_ticket_number)
+
+    def _prepare_announcements(self) -> None:
+        """Susun frasa semua service sekarang, supaya announce saat tombol ditekan tinggal play."""
+        if Settings.Sound.ANNOUNCE_SERVICE and self._catalog is not None:
+            self._periph.sound.prepare_phrases(
+                [service_announcement(s.name, s.amount) for s in self._catalog]
+            )
+
+    def _announce_service(self, service: ServiceRecord) -> bool:
+        if not Settings.Sound.ANNOUNCE_SERVICE:
+            return False
+        return self._periph.sound.announce(service_announcement(service.name, service.amount))
+
+    def on_init_data_refreshed(self) -> None:
+        """Dipanggil LaneScheduler saat init data bersama diperbarui."""
+        self._on_init_data_refreshed()
 
     def run(self):
-        # Ambil data awal dari server
+        from_cache = False
+        if self._owns_init_data:
+            # Boot dari snapshot lokal; kalau belum pernah ada, terpaksa tunggu server
+            from_cache = self._init_data.load_cached()
+            if not from_cache:
+                self._init_data.refresh()
+
         self._last_ticket_number = self._init_data.get_last_ticket_number()
-        self._service_data = self._init_data.get_service_data()
+        # Validasi service sekali di sini, bukan per tiket
+        self._catalog = ServiceCatalog.from_service_data(self._init_data.get_service_data())
 
-        if self._last_ticket_number is None or self._service_data is None:
+        if self._catalog is None or (
+            self._last_ticket_number is None and self._sequence.last() == 0
+        ):
             logger.error("Init data gagal, tidak bisa menjalankan main loop")
             return
 
-        # Sinkronkan generator dengan nomor terakhir dari server
-        self._ticket_gen = TicketGenerator(self._last_ticket_number)
+        self._prepare_announcements()
+
+        # Sequence lokal disinkronkan dengan nomor terakhir dari server / snapshot
+        self._ticket_gen = TicketGenerator(self._last_ticket_number or 0, self._sequence)
+
+        self.time_to_ready = time.monotonic() - self._started_at
+        logger.info(
+            f"🚀 {self._tag}Lane siap dalam {self.time_to_ready * 1e3:.1f} ms "
+            f"(init data dari {self._init_data.get_source()})"
+        )
+
+        # Rekonsiliasi dengan server tanpa menahan lane
+        # (multi-lane: refresh dijalankan LaneScheduler untuk semua lane)
+        if self._owns_init_data:
+            self._init_data.start_background_refresh(
+                self._on_init_data_refreshed,
+                immediate=from_cache,
+            )
+
+        if self._from_print is not None:
+            threading.Thread(
+                target=self._print_result_listener,
+                name=f"print-result-listener-{self.lane or 'main'}",
+                daemon=True,
+            ).start()
+
+        events_queue = self._periph.input_events
+        if events_queue is not None:
+            # Suara selesai -> bangunkan loop, is_busy() tidak perlu dipoll
+            self._periph.sound.set_end_callback(lambda: events_queue.post("sound", False))
+
+        self._register_states()
+        profile = self._profile
+        if profile is not None:
+            self._fsm.instrument(profile.wrap)
+        self._fsm.start()
 
         while True:
-            # Baca loop detector sekali per iterasi
-            loop_active = self._periph.input_loop.read_input()
-
-            # RESET kontekstual saat IDLE
-            if self._fsm.state == State.IDLE:
-                self._periph.sound.stop()
-                self._periph.gate_controller.turn_off()
-                self._selected_service = None
-                self._payload = {}
-
-            # Deteksi kedatangan hanya dari IDLE
-            if self._fsm.state == State.IDLE and loop_active:
-                self._fsm.trigger(Event.ARRIVED)
-
-            # GREETING
-            if self._fsm.state == State.GREETING:
-                self._periph.sound.play("welcome")
-                self._fsm.trigger(Event.GREETING_DONE)
-
-            # PEMILIHAN SERVICE
-            if self._fsm.state == State.SELECTING_SERVICE and self._selected_service is None:
-                # Jika mobil keluar dan tidak jadi pilih servis
-                if not loop_active:
-                    self._fsm.trigger(Event.LEAVE_WITHOUT_SELECTING)
-                else:
-                    if self._periph.service_1.read_input():
-                        self._selected_service = Utils.get_service(self._service_data, 1)
-                        self._periph.sound.stop()
-                        self._periph.sound.play("service_basic")
-                    elif self._periph.service_2.read_input():
-                        self._selected_service = Utils.get_service(self._service_data, 2)
-                        self._periph.sound.stop()
-                        self._periph.sound.play("service_complete")
-                    elif self._periph.service_3.read_input():
-                        self._selected_service = Utils.get_service(self._service_data, 3)
-                        self._periph.sound.stop()
-                        self._periph.sound.play("service_perfect")
-                    elif self._periph.service_4.read_input():
-                        self._selected_service = Utils.get_service(self._service_data, 4)
-                        self._periph.sound.stop()
-                        self._periph.sound.play("service_cuci_motor")
-
-            # Hanya sekali trigger SERVICE_SELECTED (saat masih di SELECTING_SERVICE)
-            if self._selected_service is not None and self._fsm.state == State.SELECTING_SERVICE:
-                if not self._periph.sound.is_busy():
+            if profile is not None:
+                profile.begin_iteration()
+            state_at_start = self._fsm.state
+            # Akumulasi: tombol yang ditekan saat GREETING tetap terpakai di SELECTING_SERVICE
+            self._pressed |= self._collect_pressed()
+            self._acks.drain()
+
+            # Hanya handler state sekarang yang jalan
+            self._fsm.dispatch()
+            if profile is not None:
+                profile.end_iteration()
+
+            # Tunggu edge berikutnya (atau sleep 10 ms kalau mode polling)
+            self._wait_next_iteration(self._fsm.state != state_at_start)
+
+    # =====================================================
+    #  State handler (dipanggil MainFSM.dispatch)
+    # =====================================================
+    def _register_states(self) -> None:
+        fsm = self._fsm
+        fsm.register(State.IDLE, self._handle_idle, on_enter=self._enter_idle)
+        fsm.register(
+            State.GREETING, self._handle_greeting, on_enter=self._enter_greeting
+        )
+        fsm.register(
+            State.SELECTING_SERVICE,
+            self._handle_selecting_service,
+            timeout=Settings.Interval.SELECT_SERVICE_TIMEOUT,
+        )
+        fsm.register(State.GENERATING_TICKET, self._handle_generating_ticket)
+        fsm.register(State.SENDING_DATA, self._handle_sending_data)
+        fsm.register(State.PRINTING_TICKET, self._handle_printing_ticket)
+        fsm.register(State.GATE_OPEN, self._handle_gate_open)
+        fsm.register(State.VEHICLE_STAYING, self._handle_vehicle_staying)
+
+    def _enter_idle(self) -> None:
+        # RESET kontekstual saat masuk IDLE
+        self._periph.sound.stop()
+        # Pulse gate yang masih berjalan dibiarkan selesai (dulu firePulse block)
+        if not self._periph.gate_controller.is_scheduled():
+            self._periph.gate_controller.turn_off()
+        self._selected_service = None
+        self._payload = {}
+        self._pressed.clear()
+        self._hold_deadline = None
+        self._printer_refused = False
+        # Kendaraan yang timeout / batal masih di atas loop: jangan disapa ulang
+        self._await_loop_clear = self._fsm.last_event in (
+            Event.TIMEOUT,
+            Event.LEAVE_WITHOUT_SELECTING,
+        )
+
+    def _handle_idle(self) -> None:
+        if self._await_loop_clear:
+            if self._periph.input_loop.read_input():
+                self._pressed.clear()
+                return
+            self._await_loop_clear = False
+
+        # Deteksi kedatangan hanya dari IDLE
+        if self._periph.input_loop.read_input():
+            self._fsm.trigger(Event.ARRIVED)
+        else:
+            # Tombol ditekan tanpa kendaraan di loop: abaikan
+            self._pressed.clear()
+
+    def _enter_greeting(self) -> None:
+        self._periph.sound.play("welcome")
+
+    def _handle_greeting(self) -> None:
+        self._fsm.trigger(Event.GREETING_DONE)
+
+    def _handle_selecting_service(self) -> None:
+        if self._selected_service is None:
+            # Jika mobil keluar dan tidak jadi pilih servis
+            if not self._periph.input_loop.read_input():
+                self._fsm.trigger(Event.LEAVE_WITHOUT_SELECTING)
+                return
+
+            catalog = self._catalog
+            for button in catalog.buttons():
+                if self._is_pressed(button, self._pressed):
+                    if (
+                        Settings.Hardware.PRINTER_NOT_READY == "refuse" or self._printer_refused
+                    ) and self._printer_blocks_ticket():
+                        # Tiket tidak bisa dicetak: tolak, arahkan ke tombol bantuan
+                        # (clip sekali per tekan, bukan selama tombol ditahan)
+                        if button in self._pressed:
+                            self._periph.sound.play(Settings.Hardware.PRINTER_NOT_READY_CLIP)
+                        self._pressed.clear()
+                        return
+                    self._selected_service = catalog.for_button(button)
+                    self._pressed.clear()
+                    # Sudah memilih: jangan sampai kena TIMEOUT saat suara konfirmasi
+                    self._fsm.cancel_timeout()
                     self._periph.sound.stop()
-                    self._fsm.trigger(Event.SERVICE_SELECTED)
-                else:
-                    logger.info(f"suara sedang: {self._periph.sound.is_busy()}")
-                
-                
-            # GENERATE TICKET
-            if self._fsm.state == State.GENERATING_TICKET:
-                service_id = self._selected_service.get("id")
-                ticket_number = self._ticket_gen.create_ean_ticket(service_id)
-
-                time_in = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-                self._payload.update(
-                    {
-                        "ticket_number": ticket_number,
-                        "time_in": time_in,
-                        "service_name": self._selected_service.get("name"),
-                        "price": self._selected_service.get("price"),
-                    }
-                )
+                    # "layanan X, harga Y" kalau clip katanya lengkap, kalau tidak clip service
+                    announced = self._announce_service(self._selected_service)
+                    if not announced and self._selected_service.sound:
+                        self._periph.sound.play(self._selected_service.sound)
+                    break
+            if self._selected_service is None:
+                return
+
+        if self._printer_blocks_ticket() and not self._hold_expired():
+            # Tiket ditahan sampai printer siap; loop dibangunkan _on_printer_status
+            if not self._periph.input_loop.read_input():
+                self._fsm.trigger(Event.LEAVE_WITHOUT_SELECTING)
+            return
 
-                self._fsm.trigger(Event.TICKET_GENERATED)
-
-            # KIRIM DATA KE SERVER
-            if self._fsm.state == State.SENDING_DATA:
-                """ Bisa pakai multiprocessing tapi sekarang single thread dulu"""
-                with self._lock:
-                    self._to_net.put(self._payload, timeout=5)
-                self._fsm.trigger(Event.DATA_SENT)
-
-
-            # PRINT TICKET
-            if self._fsm.state == State.PRINTING_TICKET:
-                ok = PrintTicket.print_ticket(self._periph.printer, self._payload)
-                if not ok:
-                    # misal: set indikator error, atau kirim info ke server
-                    # tapi JANGAN raise Exception lagi
-                    logger.warning("⚠ Tiket tidak tercetak karena printer tidak tersedia")
-                self._fsm.trigger(Event.PRINT_DONE)
-                
-            # BUKA GATE
-            if self._fsm.state == State.GATE_OPEN:
-                self._periph.gate_controller.firePulse(0.5)
-                self._periph.sound.stop()
-                self._periph.sound.play("taking_ticket")
-                self._fsm.trigger(Event.GATE_OPENED)
-            
-            if self._fsm.state == State.VEHICLE_STAYING:
-                if not self._periph.input_loop.read_input():
-                    self._fsm.trigger(Event.VEHICLE_ENTER)
-                
+        # Trigger SERVICE_SELECTED setelah suara konfirmasi selesai
+        if not self._periph.sound.is_busy():
+            self._periph.sound.stop()
+            self._fsm.trigger(Event.SERVICE_SELECTED)
+        else:
+            logger.debug("suara konfirmasi masih diputar")
+
+    def _hold_expired(self) -> bool:
+        """
+        PRINTER_NOT_READY = "delay": mulai / cek hold tiket. Return True kalau
+        hold sudah lewat PRINTER_HOLD_TIMEOUT dan tiket tetap diterbitkan.
+        """
+        if self._hold_deadline is None:
+            # Tunggu konfirmasi pilihan selesai, baru beri tahu pelanggan
+            if self._periph.sound.is_busy():
+                return False
+            self._hold_deadline = time.monotonic() + Settings.Interval.PRINTER_HOLD_TIMEOUT
+            logger.warning(f"⏸ {self._tag}Printer tidak siap, tiket ditahan")
+            self._periph.sound.play(Settings.Hardware.PRINTER_NOT_READY_CLIP)
+            return False
+
+        if time.monotonic() < self._hold_deadline:
+            return False
+
+        if Settings.Hardware.PRINTER_HOLD_EXPIRED == "issue":
+            logger.warning(f"⚠ {self._tag}Printer belum siap, tiket tetap diterbitkan")
+            return True
 
-            # Biar CPU ga 100%
-            time.sleep(0.01)
+        # "refuse": batalkan pilihan, tombol berikutnya ditolak sampai printer siap
+        logger.warning(f"⚠ {self._tag}Printer belum siap, pilihan dibatalkan")
+        self._periph.sound.play(Settings.Hardware.PRINTER_NOT_READY_CLIP)
+        self._selected_service = None
+        self._hold_deadline = None
+        self._printer_refused = True
+        self._pressed.clear()
+        self._fsm.restart_timeout()
+        return False
+
+    def _handle_generating_ticket(self) -> None:
+        service = self._selected_service
+        ticket_number = self._ticket_gen.create_ean_ticket(service.id)
+
+        time_in = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        self._payload.update(
+            {
+                "ticket_number": ticket_number,
+                "time_in": time_in,
+                "service_name": service.name,
+                "price": service.price,
+            }
+        )
+
+        self._fsm.trigger(Event.TICKET_GENERATED)
+
+    def _handle_sending_data(self) -> None:
+        correlation_id = self._acks.track(self._payload["ticket_number"])
+        message = dict(self._payload, correlation_id=correlation_id)
+        if self._outbox is not None:
+            try:
+                # fsync ke disk dulu, baru network_process diberi tahu
+                message["outbox_id"] = self._outbox.put(
+                    self._payload, correlation_id
+                )
+            except Exception as e:
+                logger.error(f"❌ Gagal tulis outbox, kirim tanpa outbox: {e}")
+        self._enqueue_upload(message)
+        self._fsm.trigger(Event.DATA_SENT)
+
+    def _enqueue_upload(self, message: Dict[str, Any]) -> None:
+        with self._lock:
+            self._to_net.put(message, timeout=5)
+
+    def _handle_printing_ticket(self) -> None:
+        if self._to_print is not None:
+            # Serahkan ke spooler, gate tidak menunggu printer
+            self._to_print.put_nowait(
+                {
+                    "job_id": self._payload["ticket_number"],
+                    "payload": dict(self._payload),
+                }
+            )
+        else:
+            started = time.monotonic()
+            ok = PrintTicket.print_ticket(self._periph.printer, self._payload)
+            if self._metrics is not None:
+                self._metrics.print_result(bool(ok), time.monotonic() - started)
+            if self._events is not None:
+                self._events.record(
+                    "print", self._event_lane, self._payload["ticket_number"], bool(ok)
+                )
+            if not ok:
+                # misal: set indikator error, atau kirim info ke server
+                # tapi JANGAN raise Exception lagi
+                logger.warning("⚠ Tiket tidak tercetak karena printer tidak tersedia")
+                self._signal_print_failed()
+        self._fsm.trigger(Event.PRINT_DONE)
+
+    def _handle_gate_open(self) -> None:
+        # Pulse dijadwalkan, loop tidak block
+        self._periph.gate_controller.firePulse(0.5)
+        self._periph.sound.stop()
+        self._periph.sound.play("taking_ticket")
+        self._fsm.trigger(Event.GATE_OPENED)
+
+    def _handle_vehicle_staying(self) -> None:
+        if not self._periph.input_loop.read_input():
+            self._fsm.trigger(Event.VEHICLE_ENTER)
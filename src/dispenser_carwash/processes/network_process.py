@@ -0,0 +1,368 @@
+import multiprocessing as mp
+import queue
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.processes.main_process import NetworkManager
+from dispenser_carwash.utils.http_session import (
+    close_shared_session,
+    connection_stats,
+)
+from dispenser_carwash.utils.logger import set_drop_hook, setup_logger
+from dispenser_carwash.utils.metrics import get_metrics
+from dispenser_carwash.utils.outbox import TicketOutbox
+
+logger = setup_logger(__name__)
+
+REQUIRED_KEYS = {"ticket_number", "time_in", "service_name", "price"}
+
+# Status per tiket dari endpoint batch yang dianggap sudah tersimpan di server
+BATCH_OK_STATUS = ("ok", "duplicate")
+
+# Key internal di pesan to_net, tidak ikut dikirim ke server
+MESSAGE_KEYS = ("outbox_id", "correlation_id")
+
+
+def is_valid_payload(payload: Any) -> bool:
+    if not isinstance(payload, dict):
+        logger.error(f"❌ Payload bukan dict: {payload}")
+        return False
+
+    missing_keys = REQUIRED_KEYS - payload.keys()
+    if missing_keys:
+        logger.error(
+            f"⚠ Payload kurang key: {missing_keys} -> {payload}"
+        )
+        return False
+
+    if any(v in (None, "") for v in payload.values()):
+        logger.warning(f"⚠ Ada data None/kosong: {payload}")
+    return True
+
+
+def split_message(
+    message: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Pisahkan payload untuk server dari key internal pesan to_net."""
+    payload = {
+        k: v for k, v in message.items() if k not in MESSAGE_KEYS
+    }
+    return payload, message.get("correlation_id")
+
+
+def report(
+    from_net: mp.Queue,
+    status: str,
+    payload: Dict[str, Any],
+    correlation_id: Optional[str],
+    detail: Optional[str] = None,
+) -> None:
+    """Kirim ack ("ok") atau error balik ke MainProcess lewat from_net."""
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.uploads.labels(status).inc()
+    from_net.put(
+        {
+            "status": status,
+            "correlation_id": correlation_id,
+            "ticket_number": payload.get("ticket_number"),
+            "detail": detail,
+        }
+    )
+
+
+def observe_upload(started: float) -> None:
+    """Catat durasi satu request upload (per tiket atau per batch)."""
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.upload_seconds.labels().observe(
+            time.monotonic() - started
+        )
+
+
+def watch_outbox(outbox: TicketOutbox) -> int:
+    """outbox.count() sekaligus update gauge carwash_outbox_depth."""
+    depth = outbox.count()
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.outbox_depth.labels().set(depth)
+    return depth
+
+
+def install_metrics() -> None:
+    """Di awal network process: log yang dibuang dihitung sebagai process="network"."""
+    metrics = get_metrics()
+    if metrics is not None:
+        set_drop_hook(metrics.log_dropped.labels("network").inc)
+
+
+def _send(
+    net: NetworkManager,
+    payload: Dict[str, Any],
+    from_net: mp.Queue,
+    correlation_id: Optional[str] = None,
+) -> bool:
+    try:
+        logger.info(f"📡 Mengirim ke server: {payload}")
+        started = time.monotonic()
+        response = net.send_data(payload)
+        observe_upload(started)
+        logger.info(net.get_last_response())
+        logger.info(connection_stats.summary())
+    except Exception as e:
+        logger.error(f"🚨 Gagal kirim data ke server: {e}")
+        report(from_net, "error", payload, correlation_id, str(e))
+        return False
+
+    if response is None:
+        report(
+            from_net,
+            "error",
+            payload,
+            correlation_id,
+            "server tidak merespon",
+        )
+        return False
+
+    report(from_net, "ok", payload, correlation_id)
+    return True
+
+
+def _drain_single(
+    net: NetworkManager, outbox: TicketOutbox, from_net: mp.Queue
+) -> int:
+    sent = 0
+    for outbox_id, payload, correlation_id in outbox.pending():
+        if not is_valid_payload(payload):
+            # Payload rusak tidak akan pernah sukses, buang supaya tidak macet
+            outbox.ack(outbox_id)
+            report(
+                from_net,
+                "error",
+                payload,
+                correlation_id,
+                "payload tidak valid",
+            )
+            continue
+
+        outbox.mark_attempt(outbox_id)
+        if not _send(net, payload, from_net, correlation_id):
+            break
+
+        outbox.ack(outbox_id)
+        sent += 1
+    return sent
+
+
+def _send_chunk(
+    net: NetworkManager,
+    outbox: TicketOutbox,
+    chunk: List[Tuple[int, Dict[str, Any], Optional[str]]],
+    from_net: mp.Queue,
+) -> Optional[int]:
+    """
+    Kirim satu batch. Return jumlah tiket yang di-ack,
+    None kalau request batch gagal total.
+    """
+    valid: List[Tuple[int, Dict[str, Any], Optional[str]]] = []
+    for outbox_id, payload, correlation_id in chunk:
+        if is_valid_payload(payload):
+            valid.append((outbox_id, payload, correlation_id))
+        else:
+            outbox.ack(outbox_id)
+            report(
+                from_net,
+                "error",
+                payload,
+                correlation_id,
+                "payload tidak valid",
+            )
+    if not valid:
+        return 0
+
+    for outbox_id, _, _ in valid:
+        outbox.mark_attempt(outbox_id)
+
+    logger.info(f"📡 Mengirim batch {len(valid)} tiket ke server")
+    started = time.monotonic()
+    results = net.send_batch([payload for _, payload, _ in valid])
+    observe_upload(started)
+    logger.info(connection_stats.summary())
+    if results is None:
+        for _, payload, correlation_id in valid:
+            report(
+                from_net,
+                "error",
+                payload,
+                correlation_id,
+                "batch gagal",
+            )
+        return None
+
+    acked = 0
+    for outbox_id, payload, correlation_id in valid:
+        result = results.get(str(payload["ticket_number"]))
+        if (
+            result is not None
+            and result.get("status") in BATCH_OK_STATUS
+        ):
+            outbox.ack(outbox_id)
+            report(from_net, "ok", payload, correlation_id)
+            acked += 1
+            continue
+
+        # Ditolak / tidak ada di response: tetap di outbox, dicoba lagi nanti
+        detail = (result or {}).get(
+            "detail", "tidak ada di response batch"
+        )
+        report(from_net, "error", payload, correlation_id, detail)
+    return acked
+
+
+def drain_outbox(
+    net: NetworkManager,
+    outbox: TicketOutbox,
+    from_net: mp.Queue,
+    batch_size: int = 1,
+) -> int:
+    """
+    Kirim semua tiket di outbox, paling lama dulu.
+    Berhenti di kegagalan pertama (server kemungkinan mati), sisanya
+    dicoba lagi di putaran berikutnya. Return jumlah yang terkirim.
+
+    batch_size > 1 dan server mendukung batch: tiket dikirim per batch,
+    tiket yang ditolak dalam batch dilewati dan dicoba lagi di putaran
+    berikutnya. Kalau endpoint batch ternyata tidak ada, lanjut per tiket.
+    """
+    if batch_size <= 1 or not net.supports_batch():
+        return _drain_single(net, outbox, from_net)
+
+    sent = 0
+    after_id = 0
+    while True:
+        chunk = outbox.pending(limit=batch_size, after_id=after_id)
+        if not chunk:
+            return sent
+
+        acked = _send_chunk(net, outbox, chunk, from_net)
+        if acked is None:
+            if not net.supports_batch():
+                return sent + _drain_single(net, outbox, from_net)
+            return sent
+
+        sent += acked
+        after_id = chunk[-1][0]
+
+
+def _collect_batch_window(
+    to_net: mp.Queue,
+    batch_size: int,
+    window: float,
+) -> Tuple[int, List[Any], bool]:
+    """
+    Setelah notifikasi tiket pertama, tunggu tiket lain sampai batch_size
+    atau window detik. Return (jumlah notifikasi outbox, pesan lain, stop?).
+    """
+    deadline = time.monotonic() + window
+    count = 1
+    others: List[Any] = []
+    while count < batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            message = to_net.get(timeout=remaining)
+        except queue.Empty:
+            break
+
+        if message == "__STOP__":
+            return count, others, True
+        if isinstance(message, dict) and "outbox_id" in message:
+            count += 1
+        else:
+            others.append(message)
+    return count, others, False
+
+
+# =====================================================
+#  Network process
+# =====================================================
+def network_process(
+    net: NetworkManager,
+    to_net: mp.Queue,
+    from_net: mp.Queue,
+    outbox_path: Optional[str] = None,
+):
+    """
+    Upload tiket ke server.
+
+    Tiket dari MainProcess sudah ditulis ke outbox (ada key 'outbox_id'),
+    pesan di to_net cuma jadi pemicu. Tiket baru dihapus dari outbox setelah
+    server membalas. Saat start, sisa outbox dari run sebelumnya langsung
+    dikirim ulang. Selama outbox belum kosong, dicoba lagi tiap
+    Settings.Server.RETRY_INTERVAL detik.
+
+    Mode batch (Settings.Server.BATCH_ENABLED): tiket dikumpulkan sampai
+    BATCH_SIZE atau BATCH_WINDOW detik, lalu dikirim dalam satu request.
+    """
+    install_metrics()
+    outbox = TicketOutbox(outbox_path)
+    batch_size = (
+        Settings.Server.BATCH_SIZE
+        if Settings.Server.BATCH_ENABLED
+        else 1
+    )
+
+    backlog = watch_outbox(outbox)
+    if backlog:
+        logger.info(f"📦 Replay {backlog} tiket dari outbox")
+        drain_outbox(net, outbox, from_net, batch_size)
+
+    stop = False
+    while not stop:
+        wait = (
+            Settings.Server.RETRY_INTERVAL
+            if watch_outbox(outbox)
+            else None
+        )
+        try:
+            payload = to_net.get(timeout=wait)
+        except queue.Empty:
+            drain_outbox(net, outbox, from_net, batch_size)
+            continue
+
+        if payload == "__STOP__":
+            break
+
+        messages = [payload]
+        if isinstance(payload, dict) and "outbox_id" in payload:
+            if batch_size > 1 and net.supports_batch():
+                _, others, stop = _collect_batch_window(
+                    to_net, batch_size, Settings.Server.BATCH_WINDOW
+                )
+                messages.extend(others)
+            drain_outbox(net, outbox, from_net, batch_size)
+
+        # Payload tanpa outbox: kirim langsung seperti biasa
+        for message in messages:
+            if isinstance(message, dict) and "outbox_id" in message:
+                continue
+            if not isinstance(message, dict):
+                logger.error(f"❌ Payload bukan dict: {message}")
+                continue
+            payload, correlation_id = split_message(message)
+            if is_valid_payload(payload):
+                _send(net, payload, from_net, correlation_id)
+            else:
+                report(
+                    from_net,
+                    "error",
+                    payload,
+                    correlation_id,
+                    "payload tidak valid",
+                )
+
+    logger.info("🛑 Network process stopping...")
+    outbox.close()
+    close_shared_session()
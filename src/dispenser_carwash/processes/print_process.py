@@ -0,0 +1,125 @@
+import multiprocessing as mp
+import time
+
+from dispenser_carwash.hardware.printer import (
+    PrinterUnavailable,
+    UsbEscposDriver,
+)
+from dispenser_carwash.hardware.printer_health import (
+    PrinterHealthMonitor,
+)
+from dispenser_carwash.processes.main_process import PrintTicket
+from dispenser_carwash.processes.ticket_template import (
+    get_ticket_template,
+)
+from dispenser_carwash.utils.logger import set_drop_hook, setup_logger
+from dispenser_carwash.utils.metrics import get_metrics
+
+logger = setup_logger(__name__)
+
+
+def install_metrics(lane: str) -> None:
+    """Di awal print process: log yang dibuang dihitung sebagai process="print-<lane>"."""
+    metrics = get_metrics()
+    if metrics is not None:
+        set_drop_hook(metrics.log_dropped.labels(f"print-{lane}").inc)
+
+
+# =====================================================
+#  Print spooler process
+# =====================================================
+def print_process(
+    vid: int,
+    pid: int,
+    to_print: mp.Queue,
+    from_print: mp.Queue,
+    lane: str = "main",
+):
+    """
+    Spooler printer di proses terpisah (pola sama dengan network_process).
+
+    Job dari to_print: {"job_id": ..., "payload": {ticket_number, time_in, service_name, price}}
+    Hasil ke from_print: {"job_id": ..., "status": "ok"/"error", "detail": ..., "duration": ...}
+    Status printer ke from_print setiap berubah: {"printer": PrinterStatus}
+
+    Tiket dirender jadi satu buffer ESC/POS lalu dikirim dalam satu
+    bulk transfer, jadi reconnect (kalau perlu) cuma terjadi sekali per tiket.
+    Driver USB dibuat di dalam proses ini karena handle USB tidak bisa di-pickle.
+
+    PrinterHealthMonitor mem-polling status & reconnect di background, jadi
+    job tidak pernah menunggu reconnect; printer yang jelas tidak siap
+    langsung dijawab error.
+
+    lane: nama lane pemilik printer, untuk label metrik proses ini.
+    """
+    install_metrics(lane)
+    driver = UsbEscposDriver(vid=vid, pid=pid)
+    health = PrinterHealthMonitor(
+        driver,
+        on_change=lambda status: from_print.put({"printer": status}),
+    )
+    health.start()
+    # Compile bagian statis tiket sekali saat proses start
+    get_ticket_template()
+
+    while True:
+        job = to_print.get()
+
+        if job == "__STOP__":
+            logger.info("🛑 Print process stopping...")
+            break
+
+        if not isinstance(job, dict) or "payload" not in job:
+            logger.error(f"❌ Job print tidak valid: {job}")
+            continue
+
+        job_id = job.get("job_id")
+        started = time.monotonic()
+
+        status = health.status
+        if status is not None and not status.ready:
+            logger.error(
+                f"❌ Tiket {job_id} tidak dicetak, printer {status.describe()}"
+            )
+            from_print.put(
+                {
+                    "job_id": job_id,
+                    "status": "error",
+                    "detail": f"printer {status.describe()}",
+                    "duration": time.monotonic() - started,
+                }
+            )
+            continue
+
+        try:
+            buffer = PrintTicket.render_ticket(job["payload"])
+            driver.write_raw(buffer)
+            result = {
+                "job_id": job_id,
+                "status": "ok",
+                "detail": f"{len(buffer)} bytes",
+            }
+        except PrinterUnavailable as e:
+            logger.error(
+                f"❌ Gagal print tiket {job_id} (printer tidak siap): {e}"
+            )
+            result = {
+                "job_id": job_id,
+                "status": "error",
+                "detail": str(e),
+            }
+        except Exception as e:
+            logger.error(f"❌ Gagal print tiket {job_id}: {e}")
+            result = {
+                "job_id": job_id,
+                "status": "error",
+                "detail": str(e),
+            }
+
+        result["duration"] = time.monotonic() - started
+        from_print.put(result)
+        if result["status"] != "ok":
+            health.wake()
+
+    health.stop()
+    driver.close()
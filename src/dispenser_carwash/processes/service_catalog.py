@@ -0,0 +1,201 @@
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+Price = Union[int, float]
+
+
+class ServiceRecord:
+    """
+    price  : nilai asli dari service_data (masuk payload & tiket apa adanya)
+    amount : price yang sudah divalidasi sebagai angka (pengumuman harga)
+    """
+
+    __slots__ = ("id", "name", "price", "amount", "button", "sound")
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        price: Any,
+        button: Optional[str] = None,
+        sound: Optional[str] = None,
+        amount: Optional[Price] = None,
+    ):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.amount = (
+            _parse_price(price) if amount is None else amount
+        )
+        self.button = button
+        self.sound = sound
+
+    def __repr__(self) -> str:
+        return f"ServiceRecord(id={self.id}, name={self.name!r}, price={self.price}, button={self.button})"
+
+
+def _parse_price(value: Any) -> Price:
+    if isinstance(value, bool):
+        raise ValueError(f"price bukan angka: {value!r}")
+    price = float(str(value).strip())
+    if price < 0 or price != price:
+        raise ValueError(f"price tidak valid: {value!r}")
+    return int(price) if price.is_integer() else price
+
+
+class ServiceCatalog:
+    """
+    Katalog service dari init data, divalidasi sekali saat dibuat.
+
+    - lookup O(1) per id (get) dan per tombol (for_button)
+    - immutable: kalau harga berubah, buat katalog baru lalu ganti
+      referensinya (satu assignment = atomik bagi main loop). Service yang
+      sudah dipilih pelanggan tetap memakai record lama sampai tiket selesai.
+
+    Tombol: field "button" di service_data kalau ada, kalau tidak dari
+    Settings.Hardware.SERVICE_BUTTONS (tombol -> service_id). Hanya nama
+    tombol yang ada di Settings.Hardware.BUTTON_PINS yang diterima.
+    Suara: field "sound" kalau ada, kalau tidak dari Settings.Hardware.SERVICE_SOUNDS.
+    """
+
+    __slots__ = ("_by_id", "_by_button")
+
+    def __init__(self, records: List[ServiceRecord]):
+        self._by_id: Dict[int, ServiceRecord] = {}
+        self._by_button: Dict[str, ServiceRecord] = {}
+        for record in records:
+            if record.id in self._by_id:
+                logger.warning(
+                    f"⚠ service_id {record.id} dobel, dipakai yang pertama"
+                )
+                continue
+            self._by_id[record.id] = record
+            if record.button is None:
+                continue
+            if record.button in self._by_button:
+                logger.warning(
+                    f"⚠ Tombol {record.button} dipakai lebih dari satu service"
+                )
+                continue
+            self._by_button[record.button] = record
+
+    @classmethod
+    def from_service_data(
+        cls,
+        service_data: Optional[List[Dict[str, Any]]],
+        button_map: Optional[Dict[str, int]] = None,
+        sound_map: Optional[Dict[int, str]] = None,
+        buttons: Optional[Iterable[str]] = None,
+    ) -> Optional["ServiceCatalog"]:
+        """Return None kalau tidak ada satu pun service yang valid."""
+        if not service_data:
+            return None
+        if button_map is None:
+            button_map = Settings.Hardware.SERVICE_BUTTONS
+        if sound_map is None:
+            sound_map = Settings.Hardware.SERVICE_SOUNDS
+        known_buttons = set(
+            Settings.Hardware.BUTTON_PINS
+            if buttons is None
+            else buttons
+        )
+        button_for_id = {
+            service_id: button
+            for button, service_id in button_map.items()
+        }
+
+        records: List[ServiceRecord] = []
+        for item in service_data:
+            try:
+                service_id = int(item["id"])
+                name = str(item["name"]).strip()
+                if not name:
+                    raise ValueError("name kosong")
+                price = item["price"]
+                amount = _parse_price(price)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(
+                    f"⚠ service_data tidak valid, dilewati: {item} ({e})"
+                )
+                continue
+
+            button = item.get("button") or button_for_id.get(
+                service_id
+            )
+            if button is not None and button not in known_buttons:
+                # Nama tombol dipakai sebagai atribut Peripheral: jangan sampai
+                # "input_loop" / "printer" ikut dibaca sebagai tombol service
+                logger.warning(
+                    f"⚠ Tombol {button!r} untuk service {service_id} tidak dikenal "
+                    f"(pilihan: {', '.join(sorted(known_buttons))}), service dilewati"
+                )
+                continue
+
+            records.append(
+                ServiceRecord(
+                    id=service_id,
+                    name=name,
+                    price=price,
+                    amount=amount,
+                    button=button,
+                    sound=item.get("sound")
+                    or sound_map.get(service_id),
+                )
+            )
+
+        if not records:
+            logger.error("❌ Tidak ada service valid di service_data")
+            return None
+        return cls(records)
+
+    def get(self, service_id: int) -> Optional[ServiceRecord]:
+        return self._by_id.get(service_id)
+
+    def for_button(self, button: str) -> Optional[ServiceRecord]:
+        return self._by_button.get(button)
+
+    def buttons(self) -> Tuple[str, ...]:
+        return tuple(self._by_button)
+
+    def changes_from(
+        self, old: Optional["ServiceCatalog"]
+    ) -> List[str]:
+        """Ringkasan perubahan dibanding katalog lama (untuk log saat hot-swap)."""
+        if old is None:
+            return [f"{len(self)} service dimuat"]
+        changes = []
+        for record in self:
+            previous = old.get(record.id)
+            if previous is None:
+                changes.append(f"+ {record.name} ({record.price})")
+            elif (previous.name, previous.price, previous.button) != (
+                record.name,
+                record.price,
+                record.button,
+            ):
+                changes.append(
+                    f"~ {previous.name} {previous.price} -> {record.name} {record.price}"
+                )
+        for record in old:
+            if self.get(record.id) is None:
+                changes.append(f"- {record.name}")
+        return changes
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[ServiceRecord]:
+        return iter(self._by_id.values())
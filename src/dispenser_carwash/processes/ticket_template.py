@@ -0,0 +1,260 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from escpos.printer import Dummy
+
+from dispenser_carwash.hardware.printer import PrinterDriver
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# =====================================================
+#  Elemen layout (deklaratif)
+# =====================================================
+class Style:
+    """Ubah style teks. Hanya key yang berubah dari style aktif yang dikirim."""
+
+    __slots__ = ("options",)
+
+    def __init__(self, **options):
+        self.options = options
+
+
+class Text:
+    """Teks statis, sama untuk semua tiket."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class Field:
+    """Teks variabel, diambil dari data[name] per tiket."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class Barcode:
+    """Barcode variabel, kode diambil dari data[name] per tiket."""
+
+    __slots__ = ("name", "bc_type", "height", "width", "pos")
+
+    def __init__(
+        self,
+        name: str,
+        bc_type: str = "EAN13",
+        height: int = 64,
+        width: int = 3,
+        pos: str = "BELOW",
+    ):
+        self.name = name
+        self.bc_type = bc_type
+        self.height = height
+        self.width = width
+        self.pos = pos
+
+
+class Cut:
+    __slots__ = ()
+
+
+Element = Union[Style, Text, Field, Barcode, Cut]
+
+
+# Layout tiket carwash
+TICKET_LAYOUT: Tuple[Element, ...] = (
+    # Header: WELCOME + nama usaha
+    Style(font="b", bold=True, width=2, height=2, align="center"),
+    Text("WELCOME\n"),
+    Text("BALI DRIVE THRU CARWASH\n"),
+    # Alamat (font normal)
+    Style(font="b", bold=False, width=1, height=1, align="center"),
+    Text("Jl. Mahendradata Selatan No.19 Denpasar, Bali\n\n"),
+    # Info waktu
+    Field("time_in"),
+    Text("\n"),
+    # Barcode
+    Barcode(
+        "ticket_number", "EAN13", height=64, width=2, pos="BELOW"
+    ),
+    Text("\n"),
+    # Nama paket
+    Style(font="b", bold=True, width=2, height=2, align="center"),
+    Field("service_name"),
+    Text("\n"),
+    # Harga
+    Style(font="b", bold=False, width=1, height=1, align="center"),
+    Text("Rp."),
+    Field("price"),
+    Text("\n"),
+    # Cut kertas
+    Cut(),
+)
+
+# Kode contoh yang valid, hanya untuk mengambil byte pembungkus barcode saat compile
+_BARCODE_PLACEHOLDER = {"EAN13": "0000000000000"}
+
+
+class TicketTemplate:
+    """
+    Compile layout sekali jadi potongan byte ESC/POS statis + slot variabel.
+
+    Per tiket hanya nilai field yang di-encode lalu disisipkan di antara
+    potongan statis (prefix ... suffix), tanpa memanggil python-escpos lagi.
+    Field di-encode ASCII (codepage default printer sudah dipilih di prefix).
+    """
+
+    def __init__(self, layout: Sequence[Element] = TICKET_LAYOUT):
+        self._layout = tuple(layout)
+        # Isi: bytes (statis) atau (nama_field, kind) untuk slot variabel
+        self._parts: List[Union[bytes, Tuple[str, str]]] = []
+        self._fields: List[str] = []
+        self._compile()
+
+    # ---------- compile ----------
+    def _compile(self) -> None:
+        printer = Dummy()
+        active_style: Dict[str, Any] = {}
+
+        def flush() -> None:
+            if printer.output:
+                self._parts.append(printer.output)
+                printer.clear()
+
+        for element in self._layout:
+            if isinstance(element, Style):
+                changed = self._style_delta(
+                    active_style, element.options
+                )
+                if changed:
+                    printer.set(**changed)
+            elif isinstance(element, Text):
+                printer.text(element.text)
+            elif isinstance(element, Field):
+                flush()
+                self._parts.append((element.name, "text"))
+                self._fields.append(element.name)
+            elif isinstance(element, Barcode):
+                head, tail = self._compile_barcode(element)
+                printer._raw(head)
+                flush()
+                self._parts.append((element.name, element.bc_type))
+                self._fields.append(element.name)
+                printer._raw(tail)
+            elif isinstance(element, Cut):
+                printer.cut()
+            else:
+                raise TypeError(
+                    f"Elemen layout tidak dikenal: {element!r}"
+                )
+
+        flush()
+        logger.info(
+            f"🧾 Ticket template compiled: {self.static_size} byte statis, "
+            f"field: {', '.join(self._fields)}"
+        )
+
+    @staticmethod
+    def _style_delta(
+        active: Dict[str, Any], options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        changed = {
+            k: v for k, v in options.items() if active.get(k) != v
+        }
+        active.update(changed)
+        return changed
+
+    @staticmethod
+    def _compile_barcode(element: Barcode) -> Tuple[bytes, bytes]:
+        """Render barcode dengan kode contoh, lalu pisah byte sebelum & sesudah kode."""
+        placeholder = _BARCODE_PLACEHOLDER.get(element.bc_type)
+        if placeholder is None:
+            raise ValueError(
+                f"Barcode {element.bc_type} belum didukung template"
+            )
+
+        printer = Dummy()
+        printer.barcode(
+            placeholder,
+            element.bc_type,
+            height=element.height,
+            width=element.width,
+            pos=element.pos,
+        )
+        output = printer.output
+        index = output.rindex(placeholder.encode("ascii"))
+        return output[:index], output[index + len(placeholder) :]
+
+    # ---------- render ----------
+    @property
+    def fields(self) -> List[str]:
+        return list(self._fields)
+
+    @property
+    def static_size(self) -> int:
+        return sum(
+            len(part)
+            for part in self._parts
+            if isinstance(part, bytes)
+        )
+
+    def render(self, data: Dict[str, Any]) -> bytes:
+        """Gabungkan potongan statis dengan nilai field dari data."""
+        chunks: List[bytes] = []
+        for part in self._parts:
+            if isinstance(part, bytes):
+                chunks.append(part)
+                continue
+
+            name, kind = part
+            value = str(data[name])
+            if kind == "EAN13" and (
+                len(value) != 13 or not value.isdigit()
+            ):
+                raise ValueError(
+                    f"EAN13 harus 13 digit, dapat: {value!r}"
+                )
+            chunks.append(value.encode("ascii", "replace"))
+        return b"".join(chunks)
+
+    def apply(
+        self, driver: PrinterDriver, data: Dict[str, Any]
+    ) -> None:
+        """Jalankan layout langsung ke driver (mode cetak tanpa spooler)."""
+        active_style: Dict[str, Any] = {}
+        for element in self._layout:
+            if isinstance(element, Style):
+                changed = self._style_delta(
+                    active_style, element.options
+                )
+                if changed:
+                    driver.set(**changed)
+            elif isinstance(element, Text):
+                driver.text(element.text)
+            elif isinstance(element, Field):
+                driver.text(str(data[element.name]))
+            elif isinstance(element, Barcode):
+                driver.barcode(
+                    str(data[element.name]),
+                    element.bc_type,
+                    height=element.height,
+                    width=element.width,
+                    pos=element.pos,
+                )
+            elif isinstance(element, Cut):
+                driver.cut()
+
+
+_default_template: Optional[TicketTemplate] = None
+
+
+def get_ticket_template() -> TicketTemplate:
+    """Template default, di-compile sekali per proses."""
+    global _default_template
+    if _default_template is None:
+        _default_template = TicketTemplate(TICKET_LAYOUT)
+    return _default_template
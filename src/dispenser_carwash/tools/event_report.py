@@ -0,0 +1,230 @@
+"""
+Laporan offline dari event log (utils/event_log.py):
+
+- histogram lama tinggal (dwell time) per state, per lane
+- kendaraan per jam (tiket terbit = masuk GATE_OPEN), pergi tanpa memilih
+  dan timeout, per jam operasional
+- ringkasan cetak tiket & upload
+
+Jalankan:
+    python -m dispenser_carwash.tools.event_report events/events-20261017.jsonl [...]
+"""
+
+import json
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Batas bucket histogram (detik); bucket terakhir = lebih dari batas terakhir
+BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0, 60.0, 600.0)
+BAR_WIDTH = 30
+
+
+def _bucket_label(i: int) -> str:
+    def fmt(seconds: float) -> str:
+        return (
+            f"{seconds * 1e3:g} ms"
+            if seconds < 1
+            else f"{seconds:g} s"
+        )
+
+    if i == 0:
+        return f"< {fmt(BUCKETS[0])}"
+    if i == len(BUCKETS):
+        return f">= {fmt(BUCKETS[-1])}"
+    return f"{fmt(BUCKETS[i - 1])} - {fmt(BUCKETS[i])}"
+
+
+def _bucket_of(seconds: float) -> int:
+    for i, edge in enumerate(BUCKETS):
+        if seconds < edge:
+            return i
+    return len(BUCKETS)
+
+
+def _percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class Report:
+    def __init__(self):
+        # lane -> state -> [detik]
+        self.dwell: Dict[str, Dict[str, List[float]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        # (jam, lane) -> Counter(served / left / timeout)
+        self.hourly: Dict[Tuple[str, str], Counter] = defaultdict(
+            Counter
+        )
+        self.prints: Counter = Counter()
+        self.uploads: Counter = Counter()
+        self.upload_latency: List[float] = []
+        self.bad_lines = 0
+        self._entered: Dict[str, Tuple[str, float]] = {}
+        # Anchor monotonic -> wall clock dari record "clock" terakhir
+        self._anchor: Optional[Tuple[float, float]] = None
+        self._first_wall: Optional[float] = None
+        self._last_wall: Optional[float] = None
+
+    def _wall(self, t: float) -> Optional[float]:
+        if self._anchor is None:
+            return None
+        mono, wall = self._anchor
+        return wall + (t - mono)
+
+    def feed(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                self.bad_lines += 1
+                continue
+            if not isinstance(record, list) or len(record) < 3:
+                self.bad_lines += 1
+                continue
+
+            if record[0] == "clock":
+                # Proses baru / file baru: monotonic mulai dari basis lain
+                self._anchor = (record[1], record[2])
+                self._entered.clear()
+                continue
+
+            t, kind, lane = record[0], record[1], record[2]
+            wall = self._wall(t)
+            if wall is not None:
+                self._first_wall = (
+                    wall
+                    if self._first_wall is None
+                    else min(self._first_wall, wall)
+                )
+                self._last_wall = (
+                    wall
+                    if self._last_wall is None
+                    else max(self._last_wall, wall)
+                )
+
+            if kind == "tr":
+                self._transition(
+                    lane, t, wall, record[3], record[4], record[5]
+                )
+            elif kind == "print":
+                self.prints["ok" if record[4] else "gagal"] += 1
+            elif kind == "upload":
+                self.uploads[record[4]] += 1
+                if record[4] == "ok" and record[5] is not None:
+                    self.upload_latency.append(record[5])
+
+    def _transition(
+        self,
+        lane: str,
+        t: float,
+        wall: Optional[float],
+        previous: str,
+        event: str,
+        new: str,
+    ) -> None:
+        entered = self._entered.get(lane)
+        if entered is not None and entered[0] == previous:
+            self.dwell[lane][previous].append(t - entered[1])
+        self._entered[lane] = (new, t)
+
+        hour = (
+            datetime.fromtimestamp(wall).strftime("%Y-%m-%d %H:00")
+            if wall
+            else "?"
+        )
+        if new == "GATE_OPEN":
+            self.hourly[(hour, lane)]["served"] += 1
+        elif event == "LEAVE_WITHOUT_SELECTING":
+            self.hourly[(hour, lane)]["left"] += 1
+        elif event == "TIMEOUT":
+            self.hourly[(hour, lane)]["timeout"] += 1
+
+    def print_dwell(self, out=sys.stdout) -> None:
+        for lane in sorted(self.dwell):
+            print(f"== Lama tinggal per state [{lane}]", file=out)
+            for state, values in sorted(self.dwell[lane].items()):
+                ordered = sorted(values)
+                print(
+                    f"\n{state}  n={len(ordered)}  "
+                    f"p50={_percentile(ordered, 0.5):.3f} s  "
+                    f"p95={_percentile(ordered, 0.95):.3f} s  "
+                    f"max={ordered[-1]:.3f} s",
+                    file=out,
+                )
+                counts = Counter(_bucket_of(v) for v in ordered)
+                peak = max(counts.values())
+                for i in range(len(BUCKETS) + 1):
+                    if not counts[i]:
+                        continue
+                    bar = "#" * max(
+                        1, round(counts[i] / peak * BAR_WIDTH)
+                    )
+                    print(
+                        f"  {_bucket_label(i):>16} {counts[i]:7d} {bar}",
+                        file=out,
+                    )
+            print(file=out)
+
+    def print_hourly(self, out=sys.stdout) -> None:
+        print("== Kendaraan per jam", file=out)
+        print(
+            f"{'jam':<17} {'lane':<8} {'dilayani':>9} {'pergi':>6} {'timeout':>8}",
+            file=out,
+        )
+        total: Counter = Counter()
+        for (hour, lane), counts in sorted(self.hourly.items()):
+            total.update(counts)
+            print(
+                f"{hour:<17} {lane:<8} {counts['served']:9d} "
+                f"{counts['left']:6d} {counts['timeout']:8d}",
+                file=out,
+            )
+        if (
+            self._first_wall is not None
+            and self._last_wall > self._first_wall
+        ):
+            hours = (self._last_wall - self._first_wall) / 3600
+            print(
+                f"\ntotal {total['served']} kendaraan dalam {hours:.2f} jam = "
+                f"{total['served'] / hours:.1f} kendaraan/jam "
+                f"(semua lane), pergi {total['left']}, timeout {total['timeout']}",
+                file=out,
+            )
+        print(file=out)
+
+    def print_io(self, out=sys.stdout) -> None:
+        print(f"== Cetak tiket: {dict(self.prints) or '-'}", file=out)
+        line = f"== Upload: {dict(self.uploads) or '-'}"
+        if self.upload_latency:
+            ordered = sorted(self.upload_latency)
+            line += (
+                f"  latency p50={_percentile(ordered, 0.5) * 1e3:.1f} ms "
+                f"p95={_percentile(ordered, 0.95) * 1e3:.1f} ms"
+            )
+        print(line, file=out)
+        if self.bad_lines:
+            print(
+                f"(baris rusak dilewati: {self.bad_lines})", file=out
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        sys.exit(
+            "pakai: python -m dispenser_carwash.tools.event_report FILE.jsonl [...]"
+        )
+
+    report = Report()
+    for path in sorted(paths):
+        with open(path, encoding="utf-8") as f:
+            report.feed(f)
+    report.print_dwell()
+    report.print_hourly()
+    report.print_io()
+
+
+if __name__ == "__main__":
+    main()
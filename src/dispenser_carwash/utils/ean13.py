@@ -0,0 +1,170 @@
+"""
+EAN-13 untuk tiket: 899 (GS1 Indonesia) + service_id 2 digit + sequence 7 digit + checksum.
+
+- Jalur satu kode (make_code / checksum / is_valid / decode) memakai tabel
+  jumlah-berbobot yang dihitung sekali saat import, tanpa parsing per digit.
+- API bulk (generate_bulk / validate_bulk / decode_bulk) memakai NumPy dan
+  bekerja pada array int64 (kode 13 digit muat di int64). NumPy opsional,
+  hanya dibutuhkan untuk API bulk.
+"""
+
+from typing import Any, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy hanya untuk API bulk
+    np = None
+
+PREFIX = "899"  # GS1 Indonesia
+MAX_SERVICE_ID = 99
+MAX_SEQUENCE = 9_999_999
+
+# Bobot digit ke-1..12 (dari kiri): 1, 3, 1, 3, ...
+_WEIGHTS = (1, 3) * 6
+# sum(digit_ascii * bobot) untuk "000000000000", dikurangkan dari jumlah byte
+_ASCII_OFFSET = ord("0") * sum(_WEIGHTS)
+
+
+def _weighted_sum(digits: str, first_position: int) -> int:
+    return sum(
+        int(d) * _WEIGHTS[first_position + i]
+        for i, d in enumerate(digits)
+    )
+
+
+# Jumlah berbobot per bagian kode, dihitung sekali:
+#   posisi 0..4  : prefix + service_id      -> _SERVICE_SUM[service_id]
+#   posisi 5..7  : 3 digit atas sequence    -> _SEQ_HIGH_SUM[seq // 10000]
+#   posisi 8..11 : 4 digit bawah sequence   -> _SEQ_LOW_SUM[seq % 10000]
+_SERVICE_SUM = tuple(
+    _weighted_sum(f"{PREFIX}{sid:02d}", 0)
+    for sid in range(MAX_SERVICE_ID + 1)
+)
+_SEQ_HIGH_SUM = tuple(
+    _weighted_sum(f"{n:03d}", 5) for n in range(1000)
+)
+_SEQ_LOW_SUM = tuple(
+    _weighted_sum(f"{n:04d}", 8) for n in range(10000)
+)
+# checksum dari jumlah berbobot mod 10
+_CHECK_DIGIT = tuple((10 - r) % 10 for r in range(10))
+
+
+def checksum(number: str) -> int:
+    """Checksum EAN-13 untuk 12 digit input."""
+    if len(number) != 12 or not (
+        number.isascii() and number.isdigit()
+    ):
+        raise ValueError(
+            "EAN-13 checksum calculation requires exactly 12 digits"
+        )
+
+    raw = number.encode("ascii")
+    total = sum(raw[0::2]) + 3 * sum(raw[1::2]) - _ASCII_OFFSET
+    return _CHECK_DIGIT[total % 10]
+
+
+def make_code(service_id: int, sequence: int) -> str:
+    """Kode EAN-13 lengkap untuk satu tiket."""
+    if not 0 <= service_id <= MAX_SERVICE_ID:
+        raise ValueError(
+            f"service_id harus 0..{MAX_SERVICE_ID}, dapat {service_id}"
+        )
+    if not 0 <= sequence <= MAX_SEQUENCE:
+        raise ValueError(
+            f"sequence harus 0..{MAX_SEQUENCE}, dapat {sequence}"
+        )
+
+    high, low = divmod(sequence, 10000)
+    total = (
+        _SERVICE_SUM[service_id]
+        + _SEQ_HIGH_SUM[high]
+        + _SEQ_LOW_SUM[low]
+    )
+    return f"{PREFIX}{service_id:02d}{sequence:07d}{_CHECK_DIGIT[total % 10]}"
+
+
+def is_valid(code: str) -> bool:
+    if len(code) != 13 or not (code.isascii() and code.isdigit()):
+        return False
+    return checksum(code[:12]) == ord(code[12]) - 48
+
+
+def decode(code: str) -> Tuple[int, int]:
+    """Return (service_id, sequence). ValueError kalau kode tidak valid / bukan tiket kita."""
+    if not is_valid(code):
+        raise ValueError(f"Kode EAN-13 tidak valid: {code!r}")
+    if not code.startswith(PREFIX):
+        raise ValueError(f"Prefix bukan {PREFIX}: {code!r}")
+    return int(code[3:5]), int(code[5:12])
+
+
+# =====================================================
+#  Bulk (NumPy)
+# =====================================================
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError(
+            "API bulk EAN-13 butuh numpy (pip install numpy)"
+        )
+
+
+if np is not None:
+    _POW13 = 10 ** np.arange(
+        12, -1, -1, dtype=np.int64
+    )  # digit kiri ke kanan
+    _WEIGHTS_NP = np.array(_WEIGHTS, dtype=np.int64)
+    _PREFIX_VALUE = int(PREFIX) * 10**9  # 899 di digit 1..3 dari 12
+
+
+def _check_digits(base12: Any) -> Any:
+    """Checksum untuk array bilangan 12 digit (int64)."""
+    digits = (base12[:, None] // _POW13[1:]) % 10
+    return (10 - (digits @ _WEIGHTS_NP) % 10) % 10
+
+
+def generate_bulk(service_ids: Any, sequences: Any) -> Any:
+    """Array int64 kode EAN-13. service_ids boleh skalar (di-broadcast)."""
+    _require_numpy()
+    service_ids = np.asarray(service_ids, dtype=np.int64)
+    sequences = np.asarray(sequences, dtype=np.int64)
+    service_ids, sequences = np.broadcast_arrays(
+        service_ids, sequences
+    )
+
+    if np.any((service_ids < 0) | (service_ids > MAX_SERVICE_ID)):
+        raise ValueError(f"service_id harus 0..{MAX_SERVICE_ID}")
+    if np.any((sequences < 0) | (sequences > MAX_SEQUENCE)):
+        raise ValueError(f"sequence harus 0..{MAX_SEQUENCE}")
+
+    base = (_PREFIX_VALUE + service_ids * 10**7 + sequences).ravel()
+    return base * 10 + _check_digits(base)
+
+
+def validate_bulk(codes: Any) -> Any:
+    """Array bool: kode 13 digit dengan checksum benar (prefix tidak dicek)."""
+    _require_numpy()
+    codes = np.asarray(codes).astype(np.int64).ravel()
+    in_range = (codes >= 0) & (codes < 10**13)
+    safe = np.where(in_range, codes, 0)
+    return in_range & (_check_digits(safe // 10) == safe % 10)
+
+
+def decode_bulk(codes: Any) -> Tuple[Any, Any, Any]:
+    """
+    Return (service_ids, sequences, valid). Untuk kode yang tidak valid atau
+    prefix-nya bukan 899, valid=False dan service_id/sequence = -1.
+    """
+    _require_numpy()
+    codes = np.asarray(codes).astype(np.int64).ravel()
+    valid = validate_bulk(codes) & (codes // 10**10 == int(PREFIX))
+
+    base = codes // 10
+    service_ids = np.where(valid, (base // 10**7) % 100, -1)
+    sequences = np.where(valid, base % 10**7, -1)
+    return service_ids, sequences, valid
+
+
+def to_strings(codes: Any) -> List[str]:
+    """Array int64 -> list string 13 digit (leading zero dipertahankan)."""
+    return [f"{int(code):013d}" for code in codes]
@@ -0,0 +1,156 @@
+"""
+Event log terstruktur (JSON lines) untuk analisis perilaku lane:
+transisi FSM, input, cetak tiket dan upload.
+
+record() hanya menaruh tuple di ring buffer yang sudah dialokasikan
+(tanpa format, tanpa I/O, tanpa lock); thread flusher menulisnya ke
+file harian <EVENT_LOG_DIR>/events-YYYYMMDD.jsonl setiap EVENT_FLUSH detik.
+
+Format baris (timestamp = time.monotonic()):
+    ["clock", mono, wall]                       anchor, tiap file dibuka
+    [t, "tr", lane, state_lama, event, state_baru]
+    [t, "input", lane, source, active]
+    [t, "print", lane, ticket, ok]
+    [t, "upload", lane, ticket, status, latency]
+
+Kalau ring penuh sebelum sempat di-flush, record tertua hilang dan
+dihitung di .dropped. Laporan: python -m dispenser_carwash.tools.event_report
+"""
+
+import itertools
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, List, Optional, Tuple
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# (seq, t, kind, lane, fields)
+_Slot = Tuple[int, float, str, str, Tuple[Any, ...]]
+
+
+class EventRecorder:
+    def __init__(
+        self,
+        directory: Path = Settings.System.EVENT_LOG_DIR,
+        capacity: int = Settings.System.EVENT_BUFFER,
+        flush_interval: float = Settings.Interval.EVENT_FLUSH,
+    ):
+        self._dir = Path(directory)
+        self._capacity = capacity
+        self._ring: List[Optional[_Slot]] = [None] * capacity
+        # next() pada itertools.count atomik di bawah GIL: aman dari banyak thread lane
+        self._seq = itertools.count()
+        self._flushed = 0  # seq berikutnya yang harus ditulis
+        self._flush_interval = flush_interval
+        self._file: Optional[IO[str]] = None
+        self._file_day = ""
+        self._wake = threading.Event()
+        self._running = True
+        self.dropped = 0
+        self.written = 0
+        self._thread = threading.Thread(
+            target=self._run, name="event-log", daemon=True
+        )
+        self._thread.start()
+
+    def record(self, kind: str, lane: str, *fields: Any) -> None:
+        seq = next(self._seq)
+        self._ring[seq % self._capacity] = (
+            seq,
+            time.monotonic(),
+            kind,
+            lane,
+            fields,
+        )
+
+    def transition(
+        self, lane: str, previous: str, event: str, new: str
+    ) -> None:
+        self.record("tr", lane, previous, event, new)
+
+    def _collect(self) -> List[_Slot]:
+        slots: List[_Slot] = []
+        seq = self._flushed
+        capacity = self._capacity
+        while True:
+            slot = self._ring[seq % capacity]
+            if slot is None or slot[0] < seq:
+                break  # belum ditulis (atau writer belum selesai), lanjut flush berikutnya
+            if slot[0] > seq:
+                # Tertimpa sebelum sempat di-flush: lompat ke record tertua yang masih utuh
+                oldest = slot[0] - capacity + 1
+                self.dropped += oldest - seq
+                seq = oldest
+                continue
+            slots.append(slot)
+            seq += 1
+        self._flushed = seq
+        return slots
+
+    def _open_for_today(self) -> IO[str]:
+        day = datetime.now().strftime("%Y%m%d")
+        if self._file is None or day != self._file_day:
+            if self._file is not None:
+                self._file.close()
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._file = open(
+                self._dir / f"events-{day}.jsonl",
+                "a",
+                encoding="utf-8",
+            )
+            self._file_day = day
+            # Anchor monotonic -> wall clock, dipakai laporan untuk jam operasional
+            self._file.write(
+                json.dumps(["clock", time.monotonic(), time.time()])
+                + "\n"
+            )
+        return self._file
+
+    def flush(self) -> int:
+        slots = self._collect()
+        if not slots:
+            return 0
+        f = self._open_for_today()
+        dumps = json.JSONEncoder(
+            separators=(",", ":"), ensure_ascii=False
+        ).encode
+        f.write(
+            "".join(
+                dumps([round(t, 6), kind, lane, *fields]) + "\n"
+                for _, t, kind, lane, fields in slots
+            )
+        )
+        f.flush()
+        self.written += len(slots)
+        return len(slots)
+
+    def _run(self) -> None:
+        while self._running:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Gagal tulis event log: {e}")
+
+    def close(self) -> None:
+        """Hentikan flusher dan tulis sisa record."""
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout=2)
+        try:
+            self.flush()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self.dropped:
+            logger.warning(
+                f"⚠ {self.dropped} event hilang (ring buffer penuh)"
+            )
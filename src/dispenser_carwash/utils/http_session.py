@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import (
+    HTTPConnectionPool,
+    HTTPSConnectionPool,
+)
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ConnectionStats:
+    """
+    Statistik koneksi HTTP per proses:
+    - new_connections : koneksi TCP (dan TLS) baru yang dibuka
+    - requests        : total request yang dikirim lewat session
+    - reused          : request yang memakai koneksi keep-alive yang sudah ada
+    - handshake / latency rata-rata dalam detik
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.new_connections = 0
+            self.requests = 0
+            self.handshake_total = 0.0
+            self.latency_total = 0.0
+
+    def record_connect(self, duration: float) -> None:
+        with self._lock:
+            self.new_connections += 1
+            self.handshake_total += duration
+
+    def record_request(self, duration: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.latency_total += duration
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            reused = max(0, self.requests - self.new_connections)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused": reused,
+                "handshake_avg": (
+                    self.handshake_total / self.new_connections
+                    if self.new_connections
+                    else 0.0
+                ),
+                "latency_avg": (
+                    self.latency_total / self.requests
+                    if self.requests
+                    else 0.0
+                ),
+            }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        return (
+            f"📶 HTTP: {s['requests']} request, {s['new_connections']} koneksi baru, "
+            f"{s['reused']} reuse, handshake avg {s['handshake_avg'] * 1e3:.1f} ms, "
+            f"latency avg {s['latency_avg'] * 1e3:.1f} ms"
+        )
+
+
+connection_stats = ConnectionStats()
+
+
+# ---------- urllib3 hooks: ukur setiap connect() baru ----------
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        connection_stats.record_connect(time.perf_counter() - started)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        connection_stats.record_connect(time.perf_counter() - started)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter dengan pool keep-alive dan pencatatan statistik.
+    pool_connections : jumlah host yang pool-nya disimpan
+    pool_maxsize     : maksimal koneksi per host
+    pool_block       : True = tunggu koneksi bebas kalau limit per host tercapai
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            connection_stats.record_request(
+                time.perf_counter() - started
+            )
+
+
+def create_session(
+    pool_connections: int = Settings.Server.POOL_CONNECTIONS,
+    pool_maxsize: int = Settings.Server.POOL_MAXSIZE,
+    pool_block: bool = Settings.Server.POOL_BLOCK,
+) -> requests.Session:
+    session = requests.Session()
+    adapter = PooledAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+# Satu session per proses. Disimpan bersama pid supaya proses hasil fork
+# tidak memakai socket milik parent.
+_shared_session: Optional[requests.Session] = None
+_shared_pid: Optional[int] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_session() -> requests.Session:
+    global _shared_session, _shared_pid
+    with _shared_lock:
+        if _shared_session is None or _shared_pid != os.getpid():
+            _shared_session = create_session()
+            _shared_pid = os.getpid()
+            connection_stats.reset()
+            logger.info(
+                f"🌐 HTTP session pool dibuat (pid {_shared_pid})"
+            )
+        return _shared_session
+
+
+def close_shared_session() -> None:
+    global _shared_session, _shared_pid
+    with _shared_lock:
+        if _shared_session is not None and _shared_pid == os.getpid():
+            _shared_session.close()
+        _shared_session = None
+        _shared_pid = None
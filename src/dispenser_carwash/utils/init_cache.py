@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Naikkan kalau struktur snapshot berubah, snapshot lama otomatis diabaikan
+SNAPSHOT_VERSION = 1
+
+
+def _checksum(data: Dict[str, Any]) -> str:
+    canonical = json.dumps(
+        data, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class InitDataCache:
+    """
+    Snapshot lokal init data (last_ticket_number + service_data).
+
+    File JSON: {"version", "saved_at", "checksum", "data"}.
+    Ditulis atomik (file sementara + fsync + rename), jadi file yang
+    terbaca selalu utuh. Snapshot dengan versi beda atau checksum salah
+    dianggap tidak ada.
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None):
+        self._path = Path(path or Settings.System.INIT_CACHE_FILE)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(
+                f"⚠ Snapshot init data tidak bisa dibaca: {e}"
+            )
+            return None
+
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            logger.warning(
+                f"⚠ Versi snapshot init data beda: {snapshot.get('version')}"
+            )
+            return None
+
+        data = snapshot.get("data")
+        if not isinstance(data, dict) or snapshot.get(
+            "checksum"
+        ) != _checksum(data):
+            logger.warning(
+                "⚠ Checksum snapshot init data tidak cocok, diabaikan"
+            )
+            return None
+
+        age = time.time() - snapshot.get("saved_at", 0)
+        logger.info(
+            f"💾 Snapshot init data dimuat (umur {age:.0f} s)"
+        )
+        return data
+
+    def save(self, data: Dict[str, Any]) -> None:
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "checksum": _checksum(data),
+            "data": data,
+        }
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.error(f"❌ Gagal simpan snapshot init data: {e}")
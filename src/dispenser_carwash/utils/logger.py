@@ -1,55 +1,338 @@
+"""
+Logging antar proses.
+
+- setup_logger() memasang satu QueueHandler di root logger per proses
+  (dipanggil di setiap modul, handler tetap satu)
+- queue dibatasi (Settings.System.LOG_QUEUE_SIZE); kalau penuh record
+  dibuang dan dihitung, loop FSM tidak pernah menunggu I/O log
+- satu listener process (start_listener) menguras queue dan menulis
+  per batch ke file yang dirotasi per ukuran & per waktu, plus console
+- sebelum start_listener() (atau setelah stop_listener()) tidak ada yang
+  menguras queue: record langsung ditulis ke stderr, tidak dibuang
+
+Proses anak (fork) mewarisi handler & queue. Untuk start method "spawn",
+panggil worker_configurer(queue) di awal proses anak.
+"""
+
+import atexit
 import logging
 import logging.handlers
 import multiprocessing as mp
-from typing import Optional
+import os
+import queue
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
 
-# Queue global untuk logging antar proses
+_FORMAT = "[%(asctime)s] %(levelname)-8s [%(processName)s] %(name)s: %(message)s"
+_EXC_FORMATTER = logging.Formatter()
+
+# Queue global untuk logging antar proses (dibuat saat record pertama)
 _log_queue: Optional[mp.Queue] = None
+_listener: Optional[mp.Process] = None
+_listener_running = False
 
 
 def get_queue() -> mp.Queue:
     global _log_queue
     if _log_queue is None:
-        _log_queue = mp.Queue(-1)  # unlimited size
+        # Import di sini: settings juga memakai setup_logger saat di-import
+        from dispenser_carwash.config.settings import Settings
+
+        _log_queue = mp.Queue(Settings.System.LOG_QUEUE_SIZE)
+        # Didaftarkan setelah multiprocessing.util (atexit LIFO): jalan lebih dulu
+        atexit.register(_release_queue)
     return _log_queue
 
 
-def listener_configurer():
-    root = logging.getLogger()
-    handler = logging.StreamHandler()
+class _StderrHandler(logging.StreamHandler):
+    """Seperti logging.lastResort: selalu menulis ke sys.stderr yang aktif."""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.setFormatter(
+            logging.Formatter(_FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
+        )
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler yang tidak pernah block: queue penuh -> record dibuang & dihitung.
+    Selama listener belum jalan, record ke queue global ditulis ke stderr.
+    """
+
+    def __init__(self, log_queue: Optional[mp.Queue] = None):
+        # queue None = queue global, dibuat saat record pertama
+        logging.Handler.__init__(self)
+        self.queue = log_queue
+        self.listener = None
+        self.dropped = 0
+        self._reported = 0
+        # (pid, fn): hook milik proses yang memasangnya, tidak ikut ke anak fork
+        self._drop_hook: Optional[Tuple[int, Callable[[], None]]] = (
+            None
+        )
+        self._fallback = _StderrHandler()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.queue is None and not _listener_running:
+            # Belum ada listener: queue tidak dibaca siapa pun dan cepat penuh
+            self._fallback.handle(record)
+            return
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Cukup render pesan (args bisa tidak picklable); format lengkap di listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        log_queue = (
+            self.queue if self.queue is not None else get_queue()
+        )
+        try:
+            if self.dropped > self._reported:
+                log_queue.put_nowait(self._dropped_record())
+                self._reported = self.dropped
+            log_queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            hook = self._drop_hook
+            if hook is not None and hook[0] == os.getpid():
+                hook[1]()
+
+    def _dropped_record(self) -> logging.LogRecord:
+        return logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "processName": mp.current_process().name,
+                "msg": f"⚠ {self.dropped - self._reported} log dibuang, queue log penuh "
+                f"(total {self.dropped})",
+            }
+        )
+
+
+def _installed_handler() -> Optional[DroppingQueueHandler]:
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            return handler
+    return None
+
+
+def set_drop_hook(hook: Optional[Callable[[], None]]) -> None:
+    """Dipanggil setiap record proses ini dibuang (mis. counter metrik)."""
+    handler = worker_configurer()
+    handler._drop_hook = (
+        (os.getpid(), hook) if hook is not None else None
+    )
+
+
+def dropped_count() -> int:
+    """Jumlah record yang dibuang proses ini karena queue log penuh."""
+    handler = _installed_handler()
+    return handler.dropped if handler is not None else 0
+
+
+class BatchedRotatingFileHandler(
+    logging.handlers.RotatingFileHandler
+):
+    """
+    Rotasi kalau file melewati max_bytes ATAU sudah berumur interval detik.
+    flush() ditunda: listener memanggil flush_batch() sekali per batch.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int,
+        backup_count: int,
+        interval: float,
+    ):
+        super().__init__(
+            filename,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+        )
+        self._interval = interval
+        self._rollover_at = time.time() + interval
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self._interval and time.time() >= self._rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self._rollover_at = time.time() + self._interval
+
+
+def listener_configurer(
+    log_file: str,
+    max_bytes: int,
+    backup_count: int,
+    interval: float,
+    console: bool = True,
+) -> List[logging.Handler]:
     formatter = logging.Formatter(
-        "[%(asctime)s] %(levelname)-8s [%(processName)s] %(message)s",
-        datefmt="%H:%M:%S",
+        _FORMAT, datefmt="%Y-%m-%d %H:%M:%S"
     )
-    handler.setFormatter(formatter)
-    root.addHandler(handler)
-    root.setLevel(logging.INFO)
+    handlers: List[logging.Handler] = [
+        BatchedRotatingFileHandler(
+            log_file, max_bytes, backup_count, interval
+        )
+    ]
+    if console:
+        handlers.append(logging.StreamHandler(sys.stderr))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
 
 
-def listener_process(queue: mp.Queue):
-    listener_configurer()
-    while True:
-        try:
-            record = queue.get()
+def listener_process(
+    log_queue: mp.Queue,
+    log_file: str,
+    max_bytes: int,
+    backup_count: int,
+    interval: float,
+    batch_size: int,
+    console: bool = True,
+    on_written: Optional[Callable[[int], None]] = None,
+):
+    # Warisan fork: jangan sampai record listener masuk lagi ke queue
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    handlers = listener_configurer(
+        log_file, max_bytes, backup_count, interval, console
+    )
+    running = True
+    while running:
+        batch = [log_queue.get()]
+        while len(batch) < batch_size:
+            try:
+                batch.append(log_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        for record in batch:
             if record is None:  # sinyal shutdown
+                running = False
                 break
-            logger = logging.getLogger(record.name)
-            logger.handle(record)
-        except Exception:
-            pass
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    try:
+                        handler.handle(record)
+                    except Exception:
+                        pass
+
+        for handler in handlers:
+            if isinstance(handler, BatchedRotatingFileHandler):
+                handler.flush_batch()
+            else:
+                handler.flush()
+        if on_written is not None:
+            on_written(len(batch) if running else len(batch) - 1)
+
+    for handler in handlers:
+        handler.close()
+
+
+def start_listener(
+    on_written: Optional[Callable[[int], None]] = None,
+) -> mp.Process:
+    """
+    Jalankan listener process (sekali, di proses utama sebelum proses lain dibuat).
+    on_written(n) dipanggil di listener setiap n record selesai ditulis.
+    """
+    global _listener, _listener_running
+    from dispenser_carwash.config.settings import Settings
+
+    system = Settings.System
+    logging.getLogger().setLevel(system.LOG_LEVEL)
+    if _listener is None:
+        _listener = mp.Process(
+            target=listener_process,
+            args=(
+                get_queue(),
+                str(system.LOG_FILE),
+                system.LOG_MAX_BYTES,
+                system.LOG_BACKUP_COUNT,
+                system.LOG_ROTATE_INTERVAL,
+                system.LOG_BATCH,
+                system.LOG_CONSOLE,
+                on_written,
+            ),
+            name="log-listener",
+            daemon=True,
+        )
+        _listener.start()
+        _listener_running = True
+    return _listener
+
+
+def stop_listener(timeout: float = 2.0) -> None:
+    """Kirim sinyal shutdown, tunggu record yang tersisa ditulis."""
+    global _listener, _listener_running
+    if _listener is None:
+        return
+    try:
+        get_queue().put(None, timeout=timeout)
+    except queue.Full:
+        pass
+    _listener.join(timeout)
+    if _listener.is_alive():
+        _listener.terminate()
+    _listener = None
+    _listener_running = False
+
+
+def _release_queue() -> None:
+    # Tanpa listener tidak ada yang membaca pipe: jangan tunggu feeder thread
+    # queue saat exit (dulu membuat proses menggantung)
+    if _log_queue is not None and not _listener_running:
+        _log_queue.cancel_join_thread()
 
 
-def worker_configurer(queue: mp.Queue):
-    h = logging.handlers.QueueHandler(queue)
+def worker_configurer(
+    log_queue: Optional[mp.Queue] = None,
+) -> DroppingQueueHandler:
+    """Pasang QueueHandler di root logger, hanya sekali per proses."""
     root = logging.getLogger()
-    root.addHandler(h)
-    root.setLevel(logging.INFO)
+    handler = _installed_handler()
+    if handler is None or (
+        log_queue is not None and handler.queue is not log_queue
+    ):
+        if handler is not None:
+            root.removeHandler(handler)
+        handler = DroppingQueueHandler(log_queue)
+        root.addHandler(handler)
+        if (
+            root.level == logging.WARNING
+        ):  # default logging, belum diatur
+            root.setLevel(logging.INFO)
+    return handler
 
 
 def setup_logger(name: str = "app", queue: Optional[mp.Queue] = None):
-    if queue is None:
-        q = get_queue()
-        worker_configurer(q)
-    else:
-        worker_configurer(queue)
+    worker_configurer(queue)
     return logging.getLogger(name)
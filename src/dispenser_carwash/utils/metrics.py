@@ -0,0 +1,541 @@
+"""
+Metrik gaya Prometheus (counter, gauge, histogram bucket tetap) di shared memory.
+
+Semua series dideklarasikan di depan (label value sudah diketahui: nama
+lane, state, ...), lalu registry mengalokasikan satu mp.RawArray("d").
+Proses anak (fork: network, log listener, spooler) mewarisi array yang
+sama, jadi tiap proses menulis langsung ke memori bersama.
+
+Hot path tanpa lock: tiap slot diasumsikan punya satu penulis (series
+per lane ditulis thread lane itu). Family dengan locked=True (penulis
+beberapa thread di satu proses: drop log, upload dari thread pool) memakai
+satu threading.Lock per family; lock itu per proses, jadi label tiap
+proses tetap harus terpisah (mis. log_dropped{process="main"/"network"/
+"print-<lane>"}).
+Scrape bisa melihat histogram yang sedang di-update (count beda satu
+dengan bucket), wajar untuk metrik.
+
+Endpoint teks: MetricsServer -> http://<host>:<port>/metrics
+"""
+
+import bisect
+import multiprocessing as mp
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+# Detik: dari state FSM (ms) sampai pelanggan yang lama memilih (menit)
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+)
+
+
+class _Family:
+    kind = ""
+    slots_per_series = 1
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        label_values: Sequence[LabelValues] = ((),),
+        locked: bool = False,
+    ):
+        self._registry = registry
+        self._lock = threading.Lock() if locked else None
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        # label values -> offset slot pertama series tersebut
+        self._offsets: Dict[LabelValues, int] = {}
+        for values in label_values:
+            values = tuple(values)
+            if len(values) != len(self.label_names):
+                raise ValueError(
+                    f"{name}: label {values} tidak cocok dengan {self.label_names}"
+                )
+            self._offsets[values] = registry._reserve(
+                self.slots_per_series
+            )
+
+    def _labels_text(
+        self, values: LabelValues, extra: str = ""
+    ) -> str:
+        pairs = [
+            f'{k}="{v}"' for k, v in zip(self.label_names, values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self, data) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, offset in self._offsets.items():
+            lines.append(
+                f"{self.name}{self._labels_text(values)} {_num(data[offset])}"
+            )
+        return lines
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _CounterChild:
+    __slots__ = ("_data", "_i")
+
+    def __init__(self, data, index: int):
+        self._data = data
+        self._i = index
+
+    def inc(self, amount: float = 1) -> None:
+        self._data[self._i] += amount
+
+    def value(self) -> float:
+        return self._data[self._i]
+
+
+class _LockedCounterChild(_CounterChild):
+    __slots__ = ("_lock",)
+
+    def __init__(self, data, index: int, lock: threading.Lock):
+        super().__init__(data, index)
+        self._lock = lock
+
+    def inc(self, amount: float = 1) -> None:
+        # += di RawArray bukan atomik antar thread
+        with self._lock:
+            self._data[self._i] += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self._data[self._i] = value
+
+    def dec(self, amount: float = 1) -> None:
+        self._data[self._i] -= amount
+
+
+class _HistogramChild:
+    """Slot: [bucket_0 .. bucket_n-1, +Inf, sum, count] (bucket tidak kumulatif)."""
+
+    __slots__ = ("_data", "_i", "_buckets", "_sum", "_count")
+
+    def __init__(self, data, index: int, buckets: Tuple[float, ...]):
+        self._data = data
+        self._i = index
+        self._buckets = buckets
+        self._sum = index + len(buckets) + 1
+        self._count = self._sum + 1
+
+    def observe(self, value: float) -> None:
+        data = self._data
+        data[self._i + bisect.bisect_left(self._buckets, value)] += 1
+        data[self._sum] += value
+        data[self._count] += 1
+
+    def count(self) -> float:
+        return self._data[self._count]
+
+
+class _LockedHistogramChild(_HistogramChild):
+    __slots__ = ("_lock",)
+
+    def __init__(
+        self,
+        data,
+        index: int,
+        buckets: Tuple[float, ...],
+        lock: threading.Lock,
+    ):
+        super().__init__(data, index, buckets)
+        self._lock = lock
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            super().observe(value)
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def labels(self, *values: str) -> _CounterChild:
+        if self._lock is not None:
+            return _LockedCounterChild(
+                self._registry.data, self._offsets[values], self._lock
+            )
+        return _CounterChild(
+            self._registry.data, self._offsets[values]
+        )
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def labels(self, *values: str) -> _GaugeChild:
+        return _GaugeChild(self._registry.data, self._offsets[values])
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        registry,
+        name,
+        help,
+        label_names=(),
+        label_values=((),),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        locked: bool = False,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self.slots_per_series = len(self.buckets) + 3
+        super().__init__(
+            registry, name, help, label_names, label_values, locked
+        )
+
+    def labels(self, *values: str) -> _HistogramChild:
+        offset = self._offsets[values]
+        if self._lock is not None:
+            return _LockedHistogramChild(
+                self._registry.data, offset, self.buckets, self._lock
+            )
+        return _HistogramChild(
+            self._registry.data, offset, self.buckets
+        )
+
+    def render(self, data) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        n = len(self.buckets)
+        for values, offset in self._offsets.items():
+            cumulative = 0.0
+            for i, edge in enumerate((*self.buckets, "+Inf")):
+                cumulative += data[offset + i]
+                le = edge if edge == "+Inf" else _num(float(edge))
+                labels = self._labels_text(values, f'le="{le}"')
+                lines.append(
+                    f"{self.name}_bucket{labels} {_num(cumulative)}"
+                )
+            lines.append(
+                f"{self.name}_sum{self._labels_text(values)} {_num(data[offset + n + 1])}"
+            )
+            lines.append(
+                f"{self.name}_count{self._labels_text(values)} {_num(data[offset + n + 2])}"
+            )
+        return lines
+
+
+class MetricsRegistry:
+    """Deklarasikan semua family dulu, lalu allocate() sebelum fork."""
+
+    def __init__(self):
+        self._families: List[_Family] = []
+        self._size = 0
+        self.data = None
+
+    def _reserve(self, slots: int) -> int:
+        if self.data is not None:
+            raise RuntimeError(
+                "registry sudah dialokasikan, deklarasi metrik harus di depan"
+            )
+        offset = self._size
+        self._size += slots
+        return offset
+
+    def counter(
+        self,
+        name: str,
+        help: str,
+        label_names=(),
+        label_values=((),),
+        locked: bool = False,
+    ) -> Counter:
+        family = Counter(
+            self, name, help, label_names, label_values, locked
+        )
+        self._families.append(family)
+        return family
+
+    def gauge(
+        self, name: str, help: str, label_names=(), label_values=((),)
+    ) -> Gauge:
+        family = Gauge(self, name, help, label_names, label_values)
+        self._families.append(family)
+        return family
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        label_names=(),
+        label_values=((),),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        locked: bool = False,
+    ) -> Histogram:
+        family = Histogram(
+            self,
+            name,
+            help,
+            label_names,
+            label_values,
+            buckets,
+            locked,
+        )
+        self._families.append(family)
+        return family
+
+    def allocate(self) -> None:
+        # RawArray: shared memory tanpa lock, diwariskan ke proses anak lewat fork
+        self.data = mp.RawArray("d", max(1, self._size))
+
+    def render(self) -> str:
+        data = self.data
+        lines: List[str] = []
+        for family in self._families:
+            lines.extend(family.render(data))
+        return "\n".join(lines) + "\n"
+
+
+class CarwashMetrics:
+    """Series dispenser. Dibuat sekali di proses utama (init_metrics) sebelum fork."""
+
+    def __init__(self, lanes: Sequence[str]):
+        # Import di sini: main_process mengimpor modul ini
+        from dispenser_carwash.processes.main_process import State
+
+        lanes = list(lanes) or ["main"]
+        self.states = [state.name for state in State]
+        per_lane = [(lane,) for lane in lanes]
+        registry = MetricsRegistry()
+        self.registry = registry
+
+        self.vehicles_served = registry.counter(
+            "carwash_vehicles_served_total",
+            "Kendaraan yang mendapat tiket (gate dibuka)",
+            ("lane",),
+            per_lane,
+        )
+        self.arrivals_abandoned = registry.counter(
+            "carwash_arrivals_abandoned_total",
+            "Kendaraan datang tapi tidak memilih service",
+            ("lane", "reason"),
+            list(product(lanes, ("left", "timeout"))),
+        )
+        self.state_seconds = registry.histogram(
+            "carwash_state_seconds",
+            "Lama tinggal di tiap state FSM",
+            ("lane", "state"),
+            list(product(lanes, self.states)),
+        )
+        self.select_seconds = registry.histogram(
+            "carwash_select_seconds",
+            "ARRIVED sampai SERVICE_SELECTED (pelanggan menunggu/memilih)",
+            ("lane",),
+            per_lane,
+        )
+        self.gate_seconds = registry.histogram(
+            "carwash_gate_seconds",
+            "SERVICE_SELECTED sampai gate dibuka",
+            ("lane",),
+            per_lane,
+        )
+        self.print_seconds = registry.histogram(
+            "carwash_print_seconds",
+            "Durasi cetak tiket",
+            ("lane",),
+            per_lane,
+        )
+        self.printer_failures = registry.counter(
+            "carwash_printer_failures_total",
+            "Tiket yang gagal dicetak",
+            ("lane",),
+            per_lane,
+        )
+        self.uploads = registry.counter(
+            "carwash_uploads_total",
+            "Hasil upload tiket ke server",
+            ("status",),
+            [("ok",), ("error",)],
+            locked=True,
+        )
+        self.upload_seconds = registry.histogram(
+            "carwash_upload_seconds",
+            "Durasi request upload (per tiket atau per batch)",
+            locked=True,
+        )
+        self.outbox_depth = registry.gauge(
+            "carwash_outbox_depth",
+            "Tiket di outbox yang belum di-ack server",
+        )
+        self.log_records = registry.counter(
+            "carwash_log_records_total",
+            "Record log yang ditulis listener",
+        )
+        self.log_dropped = registry.counter(
+            "carwash_log_dropped_total",
+            "Record log dibuang karena queue penuh",
+            ("process",),
+            # Satu print process per lane, masing-masing label sendiri
+            [("main",), ("network",)]
+            + [(f"print-{lane}",) for lane in lanes],
+            locked=True,
+        )
+        registry.allocate()
+
+
+class LaneMetrics:
+    """
+    Handle series satu lane, dipasang sebagai listener transisi FSM.
+    on_transition dipanggil thread lane; print_result dari thread lane (cetak
+    langsung) atau thread hasil spooler, tidak keduanya (satu penulis per slot).
+    """
+
+    def __init__(self, metrics: CarwashMetrics, lane: str):
+        self._state = {
+            state: metrics.state_seconds.labels(lane, state)
+            for state in metrics.states
+        }
+        self._served = metrics.vehicles_served.labels(lane)
+        self._left = metrics.arrivals_abandoned.labels(lane, "left")
+        self._timeout = metrics.arrivals_abandoned.labels(
+            lane, "timeout"
+        )
+        self._select = metrics.select_seconds.labels(lane)
+        self._gate = metrics.gate_seconds.labels(lane)
+        self._print = metrics.print_seconds.labels(lane)
+        self._print_failed = metrics.printer_failures.labels(lane)
+        self._entered = time.monotonic()
+        self._arrived: Optional[float] = None
+        self._selected: Optional[float] = None
+
+    def on_transition(self, previous, event, new) -> None:
+        now = time.monotonic()
+        self._state[previous.name].observe(now - self._entered)
+        self._entered = now
+
+        name = event.name
+        if name == "ARRIVED":
+            self._arrived = now
+        elif name == "SERVICE_SELECTED":
+            if self._arrived is not None:
+                self._select.observe(now - self._arrived)
+            self._selected = now
+        elif name == "LEAVE_WITHOUT_SELECTING":
+            self._left.inc()
+        elif name == "TIMEOUT":
+            self._timeout.inc()
+        if new.name == "GATE_OPEN":
+            self._served.inc()
+            if self._selected is not None:
+                self._gate.observe(now - self._selected)
+                self._selected = None
+
+    def print_result(
+        self, ok: bool, duration: Optional[float] = None
+    ) -> None:
+        if duration is not None:
+            self._print.observe(duration)
+        if not ok:
+            self._print_failed.inc()
+
+
+_metrics: Optional[CarwashMetrics] = None
+
+
+def init_metrics(lanes: Sequence[str]) -> CarwashMetrics:
+    """Panggil di proses utama sebelum proses anak dibuat."""
+    global _metrics
+    _metrics = CarwashMetrics(lanes)
+    return _metrics
+
+
+def get_metrics() -> Optional[CarwashMetrics]:
+    """None kalau metrik tidak diaktifkan (benchmark, test)."""
+    return _metrics
+
+
+class MetricsServer:
+    """Endpoint teks Prometheus di thread daemon (hanya baca shared memory)."""
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        host: str = Settings.Metrics.HOST,
+        port: int = Settings.Metrics.PORT,
+    ):
+        registry_ = registry
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry_.render().encode()
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    "text/plain; version=0.0.4; charset=utf-8",
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="metrics-http",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(
+            f"📈 Metrics di http://{self._server.server_address[0]}:{self.port}/metrics"
+        )
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,147 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TicketOutbox:
+    """
+    Outbox tiket di SQLite (WAL) supaya upload tidak hilang saat server
+    mati atau proses crash.
+
+    - put()   : tulis tiket dan commit (synchronous=FULL -> fsync) sebelum return
+    - pending(): tiket yang belum di-ack server, urut dari yang paling lama
+    - ack()   : hapus tiket setelah server membalas sukses
+
+    Satu koneksi per proses. MainProcess menulis, network_process membaca
+    dan menghapus. WAL mengizinkan keduanya jalan bersamaan.
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None):
+        self._path = str(path or Settings.System.OUTBOX_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self._path,
+            timeout=5,
+            isolation_level=None,  # autocommit, transaksi diatur manual
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticket_number TEXT UNIQUE,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                correlation_id TEXT
+            )
+            """)
+        # Outbox lama (sebelum ada correlation_id)
+        columns = {
+            row[1]
+            for row in self._conn.execute("PRAGMA table_info(outbox)")
+        }
+        if "correlation_id" not in columns:
+            self._conn.execute(
+                "ALTER TABLE outbox ADD COLUMN correlation_id TEXT"
+            )
+
+    def put(
+        self,
+        payload: Dict[str, Any],
+        correlation_id: Optional[str] = None,
+    ) -> int:
+        """Simpan tiket secara durable. Return id outbox."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(ticket_number, payload, created_at, correlation_id) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    str(payload.get("ticket_number")),
+                    json.dumps(payload),
+                    time.time(),
+                    correlation_id,
+                ),
+            )
+            if cursor.rowcount:
+                return cursor.lastrowid
+
+            # Tiket yang sama sudah ada (misal replay), pakai id lama
+            row = self._conn.execute(
+                "SELECT id FROM outbox WHERE ticket_number = ?",
+                (str(payload.get("ticket_number")),),
+            ).fetchone()
+            return row[0]
+
+    def pending(
+        self,
+        limit: Optional[int] = None,
+        after_id: int = 0,
+    ) -> List[Tuple[int, Dict[str, Any], Optional[str]]]:
+        """
+        Tiket belum terkirim dengan id > after_id, urut dari yang paling lama.
+        Return list (outbox_id, payload, correlation_id).
+        """
+        query = "SELECT id, payload, correlation_id FROM outbox WHERE id > ? ORDER BY id"
+        params: Tuple = (after_id,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (after_id, limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            (row_id, json.loads(payload), correlation_id)
+            for row_id, payload, correlation_id in rows
+        ]
+
+    def contains(self, outbox_id: int) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM outbox WHERE id = ?", (outbox_id,)
+            ).fetchone()
+        return row is not None
+
+    def ack(self, outbox_id: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM outbox WHERE id = ?", (outbox_id,)
+            )
+
+    def mark_attempt(self, outbox_id: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET attempts = attempts + 1 WHERE id = ?",
+                (outbox_id,),
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox"
+            ).fetchone()[0]
+
+    def oldest_age(self) -> float:
+        """Umur (detik) tiket paling lama yang belum terkirim, 0 kalau kosong."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(created_at) FROM outbox"
+            ).fetchone()
+        return (
+            time.time() - row[0]
+            if row and row[0] is not None
+            else 0.0
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
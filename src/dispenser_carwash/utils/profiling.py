@@ -0,0 +1,300 @@
+"""
+Instrumentasi hot path lane (aktif kalau Settings.Profiling.ENABLED).
+
+- HotPathStats.wrap(): wall & CPU (thread_time) per panggilan state
+  handler / method hardware. Kalau dimatikan, callable asli dipakai apa
+  adanya: tidak ada wrapper sama sekali.
+- begin_iteration()/end_iteration(): peringatan kalau satu iterasi loop
+  melewati LOOP_BUDGET, lengkap dengan call terlama di iterasi itu.
+- install_dump_signal(): kill -USR1 <pid> -> sampling profiler selama
+  SAMPLE_SECONDS, hasilnya file .folded (format flamegraph) di PROFILE_DIR
+  plus tabel wall/CPU semua lane di log.
+"""
+
+import copy
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Atribut Peripheral yang dibungkus (input_events tidak: get() memang menunggu)
+PERIPHERAL_ATTRS = (
+    "input_loop",
+    "service_1",
+    "service_2",
+    "service_3",
+    "service_4",
+    "gate_controller",
+    "indicator_status",
+    "printer",
+    "sound",
+)
+
+
+class CallStats:
+    __slots__ = ("calls", "wall", "cpu", "max_wall")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.max_wall = 0.0
+
+
+class HotPathStats:
+    """
+    Statistik satu lane. Ditulis thread lane; call dari thread lain (mis.
+    blink dari print-result-listener) ikut dihitung, angkanya bisa sedikit
+    meleset tapi tidak pernah block.
+    """
+
+    def __init__(
+        self,
+        lane: str = "",
+        budget: Optional[float] = Settings.Profiling.LOOP_BUDGET,
+        warn_interval: float = Settings.Profiling.BUDGET_WARN_INTERVAL,
+    ):
+        self.lane = lane
+        self._tag = f"[{lane}] " if lane else ""
+        self._stats: Dict[str, CallStats] = {}
+        self._budget = budget
+        self._warn_interval = warn_interval
+        # (nama, wall) call di iterasi loop yang sedang berjalan
+        self._iteration: List[Tuple[str, float]] = []
+        self._iteration_started = 0.0
+        self._last_warning = 0.0
+        self._suppressed = 0
+        self.over_budget = 0
+        self.iterations = 0
+        _registry.append(self)
+
+    def wrap(
+        self, name: str, fn: Callable[..., Any]
+    ) -> Callable[..., Any]:
+        stats = self._stats.setdefault(name, CallStats())
+        iteration = self._iteration
+
+        def timed(*args, **kwargs):
+            wall0 = time.perf_counter()
+            cpu0 = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                wall = time.perf_counter() - wall0
+                stats.calls += 1
+                stats.wall += wall
+                stats.cpu += time.thread_time() - cpu0
+                if wall > stats.max_wall:
+                    stats.max_wall = wall
+                iteration.append((name, wall))
+
+        timed.__name__ = getattr(fn, "__name__", name)
+        timed.__wrapped__ = fn
+        return timed
+
+    def begin_iteration(self) -> None:
+        self._iteration.clear()
+        self._iteration_started = time.perf_counter()
+
+    def end_iteration(self) -> None:
+        elapsed = time.perf_counter() - self._iteration_started
+        self.iterations += 1
+        if self._budget is None or elapsed <= self._budget:
+            return
+
+        self.over_budget += 1
+        now = time.monotonic()
+        if now - self._last_warning < self._warn_interval:
+            self._suppressed += 1
+            return
+
+        slowest = sorted(
+            self._iteration, key=lambda call: call[1], reverse=True
+        )[:3]
+        detail = (
+            ", ".join(
+                f"{name} {wall * 1e3:.1f} ms"
+                for name, wall in slowest
+            )
+            or "-"
+        )
+        suppressed = (
+            f" (+{self._suppressed} iterasi lambat lain)"
+            if self._suppressed
+            else ""
+        )
+        logger.warning(
+            f"🐢 {self._tag}Iterasi loop {elapsed * 1e3:.1f} ms > budget "
+            f"{self._budget * 1e3:.0f} ms: {detail}{suppressed}"
+        )
+        self._last_warning = now
+        self._suppressed = 0
+
+    def snapshot(self) -> Dict[str, CallStats]:
+        return dict(self._stats)
+
+    def summary(self) -> str:
+        lines = [
+            f"{self._tag}{'call':<36} {'n':>7} {'wall ms':>9} {'cpu ms':>9} "
+            f"{'avg ms':>8} {'max ms':>8}"
+        ]
+        ordered = sorted(
+            self._stats.items(),
+            key=lambda item: item[1].wall,
+            reverse=True,
+        )
+        for name, stats in ordered:
+            if not stats.calls:
+                continue
+            lines.append(
+                f"{self._tag}{name:<36} {stats.calls:7d} {stats.wall * 1e3:9.1f} "
+                f"{stats.cpu * 1e3:9.1f} {stats.wall / stats.calls * 1e3:8.3f} "
+                f"{stats.max_wall * 1e3:8.2f}"
+            )
+        lines.append(
+            f"{self._tag}iterasi {self.iterations}, lewat budget {self.over_budget}"
+        )
+        return "\n".join(lines)
+
+
+_registry: List[HotPathStats] = []
+
+
+class _TimedProxy:
+    """Bungkus method objek hardware (dibuat sekali per nama, di-cache)."""
+
+    def __init__(self, target: Any, prefix: str, stats: HotPathStats):
+        self._target = target
+        self._prefix = prefix
+        self._stats = stats
+        self._methods: Dict[str, Callable[..., Any]] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        wrapped = self._methods.get(name)
+        if wrapped is not None:
+            return wrapped
+        value = getattr(self._target, name)
+        if not callable(value) or name.startswith("_"):
+            return value
+        wrapped = self._stats.wrap(f"{self._prefix}.{name}", value)
+        self._methods[name] = wrapped
+        return wrapped
+
+
+def instrument_peripheral(periph: Any, stats: HotPathStats) -> Any:
+    """Salinan Peripheral dengan hardware yang dibungkus timer (aslinya tidak diubah)."""
+    timed = copy.copy(periph)
+    for attr in PERIPHERAL_ATTRS:
+        target = getattr(periph, attr, None)
+        if target is not None:
+            setattr(timed, attr, _TimedProxy(target, attr, stats))
+    return timed
+
+
+# =====================================================
+#  Sampling profiler (on-demand lewat sinyal)
+# =====================================================
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+
+
+def sample_stacks(
+    seconds: float, interval: float
+) -> Tuple[Counter, int]:
+    """Ambil stack semua thread tiap `interval` detik. Return (folded stack -> n, jumlah sampel)."""
+    me = threading.get_ident()
+    names = {}
+    folded: Counter = Counter()
+    samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if ident not in names:
+                names = {
+                    t.ident: t.name for t in threading.enumerate()
+                }
+            stack.append(names.get(ident, str(ident)))
+            folded[";".join(reversed(stack))] += 1
+        samples += 1
+        time.sleep(interval)
+    return folded, samples
+
+
+def dump_profile(
+    seconds: float = Settings.Profiling.SAMPLE_SECONDS,
+    interval: float = Settings.Profiling.SAMPLE_INTERVAL,
+    directory: Path = Settings.Profiling.PROFILE_DIR,
+) -> Path:
+    folded, samples = sample_stacks(seconds, interval)
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = (
+        directory / f"profile-{datetime.now():%Y%m%d-%H%M%S}.folded"
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in folded.most_common():
+            f.write(f"{stack} {count}\n")
+
+    # Frame paling atas = tempat thread sedang berada (termasuk menunggu)
+    leaves: Counter = Counter()
+    for stack, count in folded.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    top = "\n".join(
+        f"  {count:6d}  {leaf}"
+        for leaf, count in leaves.most_common(15)
+    )
+    logger.info(
+        f"🔬 Profil {samples} sampel ({seconds:g} s) -> {path}\n{top}"
+    )
+    for stats in _registry:
+        logger.info(f"⏱ Hot path\n{stats.summary()}")
+    return path
+
+
+_dumping = threading.Lock()
+
+
+def _dump_in_background(signum, frame) -> None:
+    # Handler sinyal harus cepat: sampling di thread sendiri, satu dump sekaligus
+    if not _dumping.acquire(blocking=False):
+        logger.info("🔬 Profil masih berjalan, sinyal diabaikan")
+        return
+
+    def _run() -> None:
+        try:
+            dump_profile()
+        except Exception as e:
+            logger.error(f"❌ Gagal dump profil: {e}")
+        finally:
+            _dumping.release()
+
+    threading.Thread(
+        target=_run, name="profile-dump", daemon=True
+    ).start()
+
+
+def install_dump_signal(
+    signal_name: Optional[str] = Settings.Profiling.SAMPLE_SIGNAL,
+) -> None:
+    """Pasang di main thread. Tanpa sinyal masuk tidak ada overhead sama sekali."""
+    if not signal_name:
+        return
+    signal.signal(getattr(signal, signal_name), _dump_in_background)
+    logger.info(f"🔬 Dump profil: kill -{signal_name[3:]} <pid>")
@@ -0,0 +1,200 @@
+import random
+import threading
+import time
+from enum import Enum, auto
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff dengan full jitter:
+        delay(attempt) = random(0, min(max_delay, base_delay * 2^(attempt-1)))
+    Jitter membuat dispenser-dispenser tidak retry serempak saat server restart.
+    rng: sumber random (default modul random), bisa diganti di test.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 2,
+        max_delay: float = Settings.Server.BACKOFF_MAX_DELAY,
+        rng: Optional[random.Random] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random
+
+    def backoff(self, attempt: int) -> float:
+        cap = min(
+            self.max_delay, self.base_delay * (2 ** (attempt - 1))
+        )
+        return self._rng.uniform(0, cap)
+
+
+class CircuitState(Enum):
+    CLOSED = auto()  # normal, request jalan
+    OPEN = auto()  # server dianggap mati, request langsung ditolak
+    HALF_OPEN = auto()  # satu request percobaan boleh lewat
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker per endpoint.
+    - CLOSED -> OPEN setelah failure_threshold kegagalan berturut-turut
+    - OPEN -> HALF_OPEN setelah reset_timeout detik (satu probe diizinkan)
+    - HALF_OPEN -> CLOSED kalau probe sukses, kembali OPEN kalau gagal
+    clock: sumber waktu monotonic (detik), bisa diganti di test.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = Settings.Server.CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = Settings.Server.CIRCUIT_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._clock = clock
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return True
+
+            if self._state == CircuitState.OPEN:
+                if (
+                    self._clock() - self._opened_at
+                    < self._reset_timeout
+                ):
+                    return False
+                self._state = CircuitState.HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(
+                    f"🟡 Circuit {self.name}: HALF_OPEN, coba satu request"
+                )
+
+            # HALF_OPEN: hanya satu probe dalam satu waktu
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info(
+                    f"🟢 Circuit {self.name}: CLOSED, server kembali normal"
+                )
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == CircuitState.HALF_OPEN or (
+                self._state == CircuitState.CLOSED
+                and self._failures >= self._failure_threshold
+            ):
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                logger.warning(
+                    f"🔴 Circuit {self.name}: OPEN selama {self._reset_timeout} s "
+                    f"({self._failures} kegagalan)"
+                )
+
+
+class RetryBudget:
+    """
+    Batasi retry relatif terhadap jumlah request (token bucket):
+    tiap request pertama menabung `ratio` token, tiap retry memakai 1 token,
+    plus isi ulang minimum `min_per_second` supaya retry tetap mungkin
+    saat trafik sepi. Mencegah retry storm saat server bermasalah.
+    """
+
+    def __init__(
+        self,
+        ratio: float = Settings.Server.RETRY_BUDGET_RATIO,
+        min_per_second: float = Settings.Server.RETRY_BUDGET_MIN_PER_SECOND,
+        max_tokens: float = Settings.Server.RETRY_BUDGET_MAX_TOKENS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ratio = ratio
+        self._min_per_second = min_per_second
+        self._max_tokens = max_tokens
+        self._clock = clock
+        self._tokens = max_tokens
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self._max_tokens,
+            self._tokens
+            + (now - self._updated) * self._min_per_second,
+        )
+        self._updated = now
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(
+                self._max_tokens, self._tokens + self._ratio
+            )
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+# Registry per proses: semua requester ke endpoint yang sama berbagi breaker
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_budget: Optional[RetryBudget] = None
+
+
+def endpoint_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    key = endpoint_key(url)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key)
+        return breaker
+
+
+def get_retry_budget() -> RetryBudget:
+    global _budget
+    with _breakers_lock:
+        if _budget is None:
+            _budget = RetryBudget()
+        return _budget
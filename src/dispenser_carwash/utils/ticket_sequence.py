@@ -0,0 +1,104 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TicketSequence:
+    """
+    Alokator nomor urut tiket yang tahan mati listrik.
+
+    Nomor dipesan per blok (block_size). Batas atas blok ("reserved") ditulis
+    durable (file sementara + fsync + rename + fsync direktori) SEBELUM nomor
+    pertama di blok itu dipakai, jadi cuma satu fsync per blok, bukan per tiket.
+
+    Setelah restart, sisa nomor di blok terakhir dilewati (mulai dari
+    reserved + 1). Ada celah nomor, tapi tidak pernah ada nomor dobel.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        block_size: int = Settings.System.SEQUENCE_BLOCK,
+    ):
+        if block_size < 1:
+            raise ValueError("block_size minimal 1")
+        self._path = Path(path or Settings.System.SEQUENCE_FILE)
+        self._block_size = block_size
+        self._lock = threading.Lock()
+
+        # Hook untuk stress test: dipanggil sebelum rename file blok baru
+        self.before_commit: Optional[Callable[[], None]] = None
+
+        self._reserved = self._load()
+        self._last = self._reserved
+
+    def _load(self) -> int:
+        try:
+            raw = self._path.read_text(encoding="ascii").strip()
+        except FileNotFoundError:
+            return 0
+        try:
+            return int(raw)
+        except ValueError:
+            # Rename atomik seharusnya mencegah ini; jangan tebak, minta sync server
+            raise RuntimeError(
+                f"File sequence rusak: {self._path} -> {raw!r}"
+            )
+
+    def _persist(self, reserved: int) -> None:
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="ascii") as f:
+            f.write(str(reserved))
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self.before_commit is not None:
+            self.before_commit()
+
+        os.replace(tmp_path, self._path)
+        # Rename baru durable setelah direktorinya di-fsync
+        dir_fd = os.open(self._path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _reserve_through(self, number: int) -> None:
+        """Pastikan `number` sudah masuk blok yang tersimpan di disk."""
+        if number <= self._reserved:
+            return
+        reserved = number + self._block_size - 1
+        self._persist(reserved)
+        self._reserved = reserved
+
+    def next(self) -> int:
+        with self._lock:
+            number = self._last + 1
+            self._reserve_through(number)
+            self._last = number
+            return number
+
+    def sync(self, server_last: int) -> None:
+        """Rekonsiliasi dengan last_ticket_number server. Hanya boleh maju."""
+        with self._lock:
+            if server_last <= self._last:
+                return
+            logger.info(
+                f"🔢 Sequence tiket disinkronkan: {self._last} -> {server_last}"
+            )
+            self._reserve_through(server_last)
+            self._last = server_last
+
+    def last(self) -> int:
+        with self._lock:
+            return self._last
+
+    def reserved(self) -> int:
+        with self._lock:
+            return self._reserved
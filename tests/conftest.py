@@ -0,0 +1,82 @@
+import pytest
+import usb.core
+from escpos.printer import Dummy
+
+from dispenser_carwash.hardware import printer as printer_module
+from dispenser_carwash.hardware.printer import (
+    RT_OFFLINE_CAUSE,
+    RT_PAPER,
+    RT_PRINTER,
+)
+
+# Byte status DLE EOT printer siap (bit 1 & 4 selalu 1)
+STATUS_OK = 0x12
+
+
+class FakeUsbBus:
+    """
+    Pengganti escpos Usb: printer Dummy yang menjawab DLE EOT dari
+    `status`, mencatat bulk write lain, dan bisa "dicabut" (present).
+    """
+
+    def __init__(self):
+        self.present = True
+        self.status = {
+            RT_PRINTER: STATUS_OK,
+            RT_OFFLINE_CAUSE: STATUS_OK,
+            RT_PAPER: STATUS_OK,
+        }
+        self.devices = []
+
+    @property
+    def device(self):
+        return self.devices[-1] if self.devices else None
+
+    def writes(self):
+        return [
+            msg for device in self.devices for msg in device.writes
+        ]
+
+    def open(self, *args, **kwargs):
+        if not self.present:
+            raise usb.core.USBError("No such device", errno=19)
+        device = _FakeUsb(self)
+        self.devices.append(device)
+        return device
+
+
+class _FakeUsb(Dummy):
+    def __init__(self, bus: FakeUsbBus):
+        super().__init__()
+        self._bus = bus
+        self.in_ep = 0x81
+        self.device = self
+        self.writes = []
+        self._replies = []
+
+    def _raw(self, msg: bytes) -> None:
+        if not self._bus.present:
+            raise usb.core.USBError("No such device", errno=19)
+        reply = self._bus.status.get(bytes(msg))
+        if reply is not None:
+            self._replies.append(reply)
+            return
+        self.writes.append(bytes(msg))
+        super()._raw(msg)
+
+    def read(self, endpoint, size, timeout):
+        if self._replies:
+            return bytes([self._replies.pop(0)])
+        raise usb.core.USBTimeoutError("timeout")
+
+
+@pytest.fixture
+def usb_bus(monkeypatch):
+    bus = FakeUsbBus()
+    monkeypatch.setattr(printer_module, "Usb", bus.open)
+    monkeypatch.setattr(
+        usb.core,
+        "find",
+        lambda **kwargs: object() if bus.present else None,
+    )
+    return bus
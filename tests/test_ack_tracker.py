@@ -0,0 +1,78 @@
+import queue
+
+from dispenser_carwash.processes.ack_tracker import AckTracker
+
+
+def _ok(correlation_id, ticket_number="1"):
+    return {
+        "status": "ok",
+        "correlation_id": correlation_id,
+        "ticket_number": ticket_number,
+        "detail": None,
+    }
+
+
+def test_pending_table_bounded_evicts_oldest():
+    tracker = AckTracker(queue.Queue(), max_pending=3)
+
+    ids = [tracker.track(str(i)) for i in range(5)]
+
+    assert tracker.pending_count() == 3
+    assert tracker.evicted == 2
+    # Yang dibuang paling lama, urutan sisanya tetap
+    assert tracker.get(ids[0]) is None
+    assert tracker.get(ids[1]) is None
+    assert list(tracker._pending) == ids[2:]
+
+
+def test_ack_after_eviction_is_counted_but_ignored():
+    from_net = queue.Queue()
+    tracker = AckTracker(from_net, max_pending=1)
+    first = tracker.track("1")
+    second = tracker.track("2")
+
+    from_net.put(_ok(first, "1"))
+    from_net.put(_ok(second, "2"))
+    tracker.drain()
+
+    assert tracker.acked == 2
+    assert tracker.pending_count() == 0
+
+
+def test_drain_capped_at_100_per_call():
+    from_net = queue.Queue()
+    tracker = AckTracker(from_net, max_pending=500)
+    ids = [tracker.track(str(i)) for i in range(250)]
+    for correlation_id in ids:
+        from_net.put(_ok(correlation_id))
+
+    # Satu iterasi loop FSM tidak boleh tertahan oleh banjir ack
+    assert tracker.drain() == 100
+    assert tracker.pending_count() == 150
+    assert from_net.qsize() == 150
+
+    assert tracker.drain() == 100
+    assert tracker.drain() == 50
+    assert tracker.drain() == 0
+    assert tracker.pending_count() == 0
+
+
+def test_error_keeps_ticket_pending_with_detail():
+    from_net = queue.Queue()
+    tracker = AckTracker(from_net)
+    correlation_id = tracker.track("1")
+
+    from_net.put(
+        {
+            "status": "error",
+            "correlation_id": correlation_id,
+            "ticket_number": "1",
+            "detail": "server tidak merespon",
+        }
+    )
+    tracker.drain()
+
+    entry = tracker.get(correlation_id)
+    assert entry.errors == 1
+    assert entry.last_error == "server tidak merespon"
+    assert tracker.errors == 1
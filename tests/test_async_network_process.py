@@ -0,0 +1,109 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from dispenser_carwash.processes.async_network_process import (
+    AsyncNetworkWorker,
+)
+from dispenser_carwash.utils.outbox import TicketOutbox
+
+
+class SlowNet:
+    """NetworkManager palsu: tiap upload makan waktu, concurrency dicatat."""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.sent = []
+        self._lock = threading.Lock()
+        self._active = Counter()
+        self.max_active = 0
+        self.max_active_per_ticket = Counter()
+
+    def supports_batch(self):
+        return False
+
+    def send_data(self, payload):
+        number = payload["ticket_number"]
+        with self._lock:
+            self._active[number] += 1
+            self.max_active = max(
+                self.max_active, sum(self._active.values())
+            )
+            self.max_active_per_ticket[number] = max(
+                self.max_active_per_ticket[number],
+                self._active[number],
+            )
+        time.sleep(self.latency)
+        with self._lock:
+            self._active[number] -= 1
+            self.sent.append(number)
+        return {"status": "ok", "ticket_number": number}
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = TicketOutbox(str(tmp_path / "outbox.sqlite3"))
+    yield box
+    box.close()
+
+
+def _ticket(number):
+    return {
+        "ticket_number": number,
+        "time_in": "2025-11-20 15:45:01",
+        "service_name": "Basic",
+        "price": 25000,
+    }
+
+
+def _run(net, outbox, messages):
+    to_net = queue.Queue()
+    for message in messages:
+        to_net.put(message)
+    to_net.put("__STOP__")
+    from_net = queue.Queue()
+    worker = AsyncNetworkWorker(
+        net, to_net, from_net, outbox, concurrency=4, batch_size=1
+    )
+    asyncio.run(worker.run())
+    return worker, from_net
+
+
+def test_same_ticket_never_uploaded_concurrently(outbox):
+    # Satu baris outbox + dua pesan langsung untuk tiket yang sama
+    outbox.put(_ticket("1111111111116"), "a")
+    outbox.put(_ticket("2222222222222"), "b")
+    outbox.put(_ticket("3333333333338"), "c")
+    net = SlowNet()
+
+    worker, from_net = _run(
+        net,
+        outbox,
+        [
+            dict(_ticket("1111111111116"), correlation_id="d"),
+            dict(_ticket("1111111111116"), correlation_id="e"),
+        ],
+    )
+
+    assert net.max_active_per_ticket["1111111111116"] == 1
+    assert net.sent.count("1111111111116") == 3
+    # Lock per tiket, bukan global: tiket lain tetap jalan paralel
+    assert net.max_active >= 2
+    assert outbox.count() == 0
+    assert worker._ticket_locks == {}
+    assert from_net.qsize() == 5
+
+
+def test_outbox_row_not_sent_twice_while_in_flight(outbox):
+    outbox.put(_ticket("1111111111116"), "a")
+    net = SlowNet(latency=0.1)
+
+    # Notifikasi berulang selama upload masih jalan tidak bikin upload dobel
+    _run(net, outbox, [{"outbox_id": 1}] * 5)
+
+    assert net.sent == ["1111111111116"]
+    assert outbox.count() == 0
@@ -0,0 +1,126 @@
+import random
+
+import pytest
+
+from dispenser_carwash.utils import ean13
+
+
+# Implementasi lama (TicketGenerator._checksum_ean_13 sebelum modul ean13)
+def legacy_checksum(number: str) -> int:
+    if len(number) != 12 or not number.isdigit():
+        raise ValueError(
+            "EAN-13 checksum calculation requires exactly 12 digits"
+        )
+    sum_odd = sum(int(number[i]) for i in range(0, 12, 2))
+    sum_even = sum(int(number[i]) for i in range(1, 12, 2))
+    return (10 - ((sum_odd + 3 * sum_even) % 10)) % 10
+
+
+def legacy_make_code(service_id: int, sequence: int) -> str:
+    raw_number = f"899{service_id:02d}{sequence:07d}"
+    return f"{raw_number}{legacy_checksum(raw_number)}"
+
+
+def _pairs():
+    rng = random.Random(13)
+    edges = [
+        (0, 0),
+        (0, ean13.MAX_SEQUENCE),
+        (ean13.MAX_SERVICE_ID, 0),
+        (ean13.MAX_SERVICE_ID, ean13.MAX_SEQUENCE),
+        (1, 9999),
+        (1, 10000),
+    ]
+    return edges + [
+        (
+            rng.randint(0, ean13.MAX_SERVICE_ID),
+            rng.randint(0, ean13.MAX_SEQUENCE),
+        )
+        for _ in range(5000)
+    ]
+
+
+def test_make_code_matches_legacy():
+    for service_id, sequence in _pairs():
+        assert ean13.make_code(
+            service_id, sequence
+        ) == legacy_make_code(service_id, sequence)
+
+
+def test_checksum_matches_legacy():
+    rng = random.Random(7)
+    for _ in range(5000):
+        number = f"{rng.randrange(10 ** 12):012d}"
+        assert ean13.checksum(number) == legacy_checksum(number)
+
+
+@pytest.mark.parametrize(
+    "number", ["", "12345678901", "1234567890123", "12345678901a"]
+)
+def test_checksum_rejects_bad_input(number):
+    with pytest.raises(ValueError):
+        ean13.checksum(number)
+
+
+def test_checksum_rejects_non_ascii_digits():
+    # "١" (angka Arab) lolos str.isdigit() di kode lama
+    with pytest.raises(ValueError):
+        ean13.checksum("١" * 12)
+
+
+def test_is_valid_and_decode():
+    code = ean13.make_code(3, 1234567)
+    assert ean13.is_valid(code)
+    assert ean13.decode(code) == (3, 1234567)
+
+    broken = code[:12] + str((int(code[12]) + 1) % 10)
+    assert not ean13.is_valid(broken)
+    with pytest.raises(ValueError):
+        ean13.decode(broken)
+
+
+def test_decode_rejects_foreign_prefix():
+    number = "400123456789"
+    code = f"{number}{legacy_checksum(number)}"
+    assert ean13.is_valid(code)
+    with pytest.raises(ValueError):
+        ean13.decode(code)
+
+
+@pytest.mark.parametrize(
+    "service_id, sequence", [(-1, 0), (100, 0), (0, -1), (0, 10**7)]
+)
+def test_make_code_range(service_id, sequence):
+    with pytest.raises(ValueError):
+        ean13.make_code(service_id, sequence)
+
+
+def test_bulk_matches_single():
+    np = pytest.importorskip("numpy")
+    pairs = _pairs()
+    service_ids = np.array([s for s, _ in pairs], dtype=np.int64)
+    sequences = np.array([q for _, q in pairs], dtype=np.int64)
+
+    codes = ean13.generate_bulk(service_ids, sequences)
+
+    assert ean13.to_strings(codes) == [
+        legacy_make_code(s, q) for s, q in pairs
+    ]
+    assert ean13.validate_bulk(codes).all()
+    decoded_ids, decoded_seqs, valid = ean13.decode_bulk(codes)
+    assert valid.all()
+    assert (decoded_ids == service_ids).all()
+    assert (decoded_seqs == sequences).all()
+
+
+def test_bulk_flags_invalid_codes():
+    np = pytest.importorskip("numpy")
+    good = ean13.generate_bulk(1, np.array([5, 6], dtype=np.int64))
+    codes = np.concatenate(
+        [good, good + 1, [4001234567890 // 10 * 10]]
+    )
+
+    _, sequences, valid = ean13.decode_bulk(codes)
+
+    assert valid.tolist() == [True, True, False, False, False]
+    assert sequences.tolist()[2:] == [-1, -1, -1]
@@ -0,0 +1,148 @@
+import time
+
+import pytest
+
+from dispenser_carwash.processes.main_process import (
+    Event,
+    MainFSM,
+    State,
+)
+
+
+@pytest.fixture
+def fsm():
+    return MainFSM("test")
+
+
+def test_dispatch_only_runs_current_state_handler(fsm):
+    calls = []
+    fsm.register(State.IDLE, lambda: calls.append("idle"))
+    fsm.register(State.GREETING, lambda: calls.append("greeting"))
+
+    fsm.dispatch()
+    assert calls == ["idle"]
+
+    assert fsm.trigger(Event.ARRIVED)
+    fsm.dispatch()
+    assert calls == ["idle", "greeting"]
+
+
+def test_invalid_transition_keeps_state(fsm):
+    assert not fsm.trigger(Event.PRINT_DONE)
+    assert fsm.state == State.IDLE
+    assert fsm.last_event is None
+
+
+def test_exit_listener_enter_order(fsm):
+    order = []
+    fsm.register(
+        State.IDLE, on_exit=lambda: order.append("exit IDLE")
+    )
+    fsm.register(
+        State.GREETING,
+        on_enter=lambda: order.append("enter GREETING"),
+    )
+    fsm.add_listener(
+        lambda previous, event, new: order.append(
+            f"{previous.name}>{new.name}"
+        )
+    )
+
+    fsm.trigger(Event.ARRIVED)
+
+    assert order == ["exit IDLE", "IDLE>GREETING", "enter GREETING"]
+    assert fsm.last_event == Event.ARRIVED
+
+
+def test_start_runs_initial_on_enter(fsm):
+    entered = []
+    fsm.register(
+        State.IDLE, on_enter=lambda: entered.append(fsm.state)
+    )
+    fsm.start()
+    assert entered == [State.IDLE]
+
+
+def _to_selecting(fsm, timeout):
+    handled = []
+    fsm.register(
+        State.SELECTING_SERVICE,
+        lambda: handled.append(True),
+        timeout=timeout,
+    )
+    fsm.trigger(Event.ARRIVED)
+    fsm.trigger(Event.GREETING_DONE)
+    return handled
+
+
+def test_timeout_triggers_instead_of_handler(fsm):
+    handled = _to_selecting(fsm, timeout=0.0)
+
+    fsm.dispatch()
+
+    assert fsm.state == State.IDLE
+    assert fsm.last_event == Event.TIMEOUT
+    assert handled == []
+
+
+def test_time_until_timeout(fsm):
+    _to_selecting(fsm, timeout=60)
+    remaining = fsm.time_until_timeout()
+    assert remaining is not None and 59 < remaining <= 60
+
+    fsm.trigger(Event.LEAVE_WITHOUT_SELECTING)
+    assert fsm.time_until_timeout() is None
+
+
+def test_cancel_timeout(fsm):
+    handled = _to_selecting(fsm, timeout=0.0)
+    fsm.cancel_timeout()
+
+    fsm.dispatch()
+
+    assert fsm.state == State.SELECTING_SERVICE
+    assert handled == [True]
+    assert fsm.time_until_timeout() is None
+
+
+def test_restart_timeout(fsm):
+    _to_selecting(fsm, timeout=0.05)
+    fsm.cancel_timeout()
+    fsm.restart_timeout()
+    assert fsm.time_until_timeout() is not None
+
+    time.sleep(0.06)
+    fsm.dispatch()
+    assert fsm.state == State.IDLE
+
+
+def test_timeout_ignored_without_transition(fsm):
+    # GREETING tidak punya transisi TIMEOUT: handler tetap jalan
+    handled = []
+    fsm.register(
+        State.GREETING, lambda: handled.append(True), timeout=0.0
+    )
+    fsm.trigger(Event.ARRIVED)
+
+    fsm.dispatch()
+
+    assert fsm.state == State.GREETING
+    assert handled == [True]
+
+
+def test_instrument_wraps_handlers(fsm):
+    names = []
+    fsm.register(State.IDLE, lambda: None, on_exit=lambda: None)
+
+    def wrap(name, fn):
+        def wrapped():
+            names.append(name)
+            return fn()
+
+        return wrapped
+
+    fsm.instrument(wrap)
+    fsm.dispatch()
+    fsm.trigger(Event.ARRIVED)
+
+    assert names == ["IDLE.handler", "IDLE.on_exit"]
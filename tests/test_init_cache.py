@@ -0,0 +1,79 @@
+import json
+import os
+
+from dispenser_carwash.utils import init_cache
+from dispenser_carwash.utils.init_cache import InitDataCache
+
+DATA = {
+    "last_ticket_number": 42,
+    "service_data": [
+        {"id": 1, "name": "Basic", "price": 25000},
+        {"id": 2, "name": "Complete", "price": 35000},
+    ],
+}
+
+
+def _rewrite(path, **changes):
+    snapshot = json.loads(path.read_text())
+    snapshot.update(changes)
+    path.write_text(json.dumps(snapshot))
+
+
+def test_save_load_round_trip(tmp_path):
+    path = tmp_path / "init.json"
+    InitDataCache(path).save(DATA)
+
+    assert InitDataCache(path).load() == DATA
+    # File sementara sudah di-rename, tidak tertinggal
+    assert os.listdir(tmp_path) == ["init.json"]
+
+
+def test_save_replaces_previous_snapshot(tmp_path):
+    path = tmp_path / "init.json"
+    cache = InitDataCache(path)
+    cache.save(DATA)
+
+    cache.save(dict(DATA, last_ticket_number=43))
+
+    assert cache.load()["last_ticket_number"] == 43
+
+
+def test_failed_write_keeps_old_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / "init.json"
+    cache = InitDataCache(path)
+    cache.save(DATA)
+
+    def crash(*args):
+        raise OSError("disk penuh")
+
+    monkeypatch.setattr(init_cache.os, "replace", crash)
+    cache.save(dict(DATA, last_ticket_number=99))
+
+    assert cache.load() == DATA
+
+
+def test_checksum_mismatch_rejected(tmp_path):
+    path = tmp_path / "init.json"
+    InitDataCache(path).save(DATA)
+
+    # Data diubah tanpa update checksum (file rusak / diedit manual)
+    _rewrite(path, data=dict(DATA, last_ticket_number=7))
+
+    assert InitDataCache(path).load() is None
+
+
+def test_version_mismatch_rejected(tmp_path):
+    path = tmp_path / "init.json"
+    InitDataCache(path).save(DATA)
+
+    _rewrite(path, version=init_cache.SNAPSHOT_VERSION + 1)
+
+    assert InitDataCache(path).load() is None
+
+
+def test_missing_or_truncated_file(tmp_path):
+    path = tmp_path / "init.json"
+    assert InitDataCache(path).load() is None
+
+    path.write_text('{"version": 1, "data": {')
+    assert InitDataCache(path).load() is None
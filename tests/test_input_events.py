@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from dispenser_carwash.hardware.simulation import SimulatedLane
+from dispenser_carwash.processes.main_process import (
+    Event,
+    MainFSM,
+    MainProcess,
+    State,
+)
+from dispenser_carwash.utils.ticket_sequence import TicketSequence
+
+
+@pytest.fixture(scope="module")
+def sim():
+    return SimulatedLane(
+        "test",
+        loop_pin=0,
+        button_pins={f"service_{k + 1}": 1 + k for k in range(4)},
+        gate_pin=5,
+        led_pin=6,
+    )
+
+
+@pytest.fixture
+def lane(sim, tmp_path):
+    sim.leave()
+    sim.periph.input_events.drain()
+    fsm = MainFSM("test")
+    process = MainProcess(
+        queue.Queue(),
+        queue.Queue(),
+        threading.Lock(),
+        sim.periph,
+        fsm,
+        sequence=TicketSequence(tmp_path / "seq"),
+    )
+    return process, fsm
+
+
+def _wait_in_thread(process):
+    done = threading.Event()
+
+    def wait():
+        process._wait_next_iteration(False)
+        done.set()
+
+    threading.Thread(target=wait, daemon=True).start()
+    return done
+
+
+@pytest.mark.parametrize(
+    "state",
+    [State.IDLE, State.SELECTING_SERVICE, State.VEHICLE_STAYING],
+)
+def test_pin_edge_wakes_blocked_wait(sim, lane, state):
+    process, fsm = lane
+    fsm.state = state
+
+    done = _wait_in_thread(process)
+    # Tanpa edge: loop tetap tidur
+    assert not done.wait(0.2)
+
+    started = time.monotonic()
+    sim.arrive()
+    assert done.wait(1.0)
+    assert time.monotonic() - started < 0.5
+
+    # Edge yang membangunkan tidak hilang, diproses di iterasi berikutnya
+    assert "input_loop" in process._collect_pressed()
+
+
+def test_button_edge_wakes_selecting(sim, lane):
+    process, fsm = lane
+    fsm.state = State.SELECTING_SERVICE
+
+    done = _wait_in_thread(process)
+    sim.press("service_2")
+
+    assert done.wait(1.0)
+    assert "service_2" in process._collect_pressed()
+
+
+def test_state_timeout_fires_without_edges(lane):
+    process, fsm = lane
+    fsm.register(State.SELECTING_SERVICE, lambda: None, timeout=0.2)
+    fsm.trigger(Event.ARRIVED)
+    fsm.trigger(Event.GREETING_DONE)
+
+    started = time.monotonic()
+    process._wait_next_iteration(False)
+    elapsed = time.monotonic() - started
+
+    assert 0.15 <= elapsed < 0.6
+    fsm.dispatch()
+    assert fsm.state == State.IDLE
+    assert fsm.last_event == Event.TIMEOUT
+
+
+def test_busy_states_do_not_block(lane):
+    process, fsm = lane
+    fsm.state = State.PRINTING_TICKET
+
+    started = time.monotonic()
+    process._wait_next_iteration(False)
+
+    assert time.monotonic() - started < 0.05
@@ -0,0 +1,128 @@
+import queue
+
+import pytest
+
+from dispenser_carwash.config.settings import Settings
+from dispenser_carwash.processes.lane import (
+    AckRouter,
+    LaneConfig,
+    load_lane_configs,
+)
+
+
+def _lane(name, base):
+    return {
+        "name": name,
+        "loop_pin": base,
+        "button_pins": {"basic": base + 1, "complete": base + 2},
+        "gate_pin": base + 3,
+        "led_pin": base + 4,
+    }
+
+
+def _ack(correlation_id, ticket_number="1"):
+    return {
+        "status": "ok",
+        "correlation_id": correlation_id,
+        "ticket_number": ticket_number,
+        "detail": None,
+    }
+
+
+def _drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+
+def test_router_routes_by_lane_prefix():
+    from_net = queue.Queue()
+    router = AckRouter(from_net, ["lane1", "lane2"])
+    router.start()
+
+    for message in (
+        _ack("lane1:aaa", "1"),
+        _ack("lane2:bbb", "2"),
+        _ack("lane1:ccc", "3"),
+        _ack("ddd", "4"),  # replay outbox lama, tanpa lane
+        _ack("lane9:eee", "5"),  # lane tidak dikenal
+        _ack(None, "6"),
+        "bukan dict",
+    ):
+        from_net.put(message)
+    from_net.put("__STOP__")
+    router._thread.join(timeout=2)
+
+    assert not router._thread.is_alive()
+    lane1 = _drain(router.queue_for("lane1"))
+    lane2 = _drain(router.queue_for("lane2"))
+    assert [m["ticket_number"] for m in lane1] == ["1", "3"]
+    assert [m["ticket_number"] for m in lane2] == ["2"]
+
+
+def test_router_prefix_must_be_exact_lane_name():
+    from_net = queue.Queue()
+    router = AckRouter(from_net, ["lane1", "lane10"])
+    router.start()
+
+    from_net.put(_ack("lane10:aaa"))
+    from_net.put("__STOP__")
+    router._thread.join(timeout=2)
+
+    assert router.queue_for("lane1").empty()
+    assert router.queue_for("lane10").qsize() == 1
+
+
+def test_lane_name_with_colon_rejected():
+    with pytest.raises(ValueError):
+        LaneConfig(**_lane("lane:1", 2))
+
+
+def test_default_single_lane_from_legacy_pins(monkeypatch):
+    monkeypatch.setattr(Settings.Hardware, "LANES", [])
+
+    lanes = load_lane_configs()
+
+    assert [lane.name for lane in lanes] == ["lane1"]
+    assert lanes[0].loop_pin == Settings.Hardware.LOOP_SENSOR_PIN
+
+
+def test_load_multiple_lanes(monkeypatch):
+    monkeypatch.setattr(
+        Settings.Hardware, "LANES", [_lane("A", 2), _lane("B", 10)]
+    )
+
+    lanes = load_lane_configs()
+
+    assert [lane.name for lane in lanes] == ["A", "B"]
+    assert lanes[1].pins() == [10, 13, 14, 11, 12]
+
+
+def test_duplicate_lane_name_rejected(monkeypatch):
+    monkeypatch.setattr(
+        Settings.Hardware, "LANES", [_lane("A", 2), _lane("A", 10)]
+    )
+
+    with pytest.raises(ValueError, match="dobel"):
+        load_lane_configs()
+
+
+def test_shared_pin_rejected(monkeypatch):
+    second = _lane("B", 10)
+    second["gate_pin"] = 3  # sama dengan tombol pertama lane A
+    monkeypatch.setattr(
+        Settings.Hardware, "LANES", [_lane("A", 2), second]
+    )
+
+    with pytest.raises(ValueError, match="Pin 3"):
+        load_lane_configs()
+
+
+def test_lane_missing_pin_rejected(monkeypatch):
+    broken = _lane("A", 2)
+    del broken["gate_pin"]
+    monkeypatch.setattr(Settings.Hardware, "LANES", [broken])
+
+    with pytest.raises(TypeError):
+        load_lane_configs()
@@ -0,0 +1,47 @@
+import logging
+import queue
+
+from dispenser_carwash.utils import logger as log_module
+from dispenser_carwash.utils.logger import DroppingQueueHandler
+
+
+def _logger(handler):
+    log = logging.getLogger("test-logger-fallback")
+    log.handlers = [handler]
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    return log
+
+
+def test_without_listener_records_go_to_stderr(monkeypatch, capsys):
+    monkeypatch.setattr(log_module, "_listener_running", False)
+
+    # Queue global tidak boleh disentuh sebelum listener jalan
+    def no_queue():
+        raise AssertionError("queue dipakai sebelum listener jalan")
+
+    monkeypatch.setattr(log_module, "get_queue", no_queue)
+    handler = DroppingQueueHandler()
+
+    _logger(handler).info("🚗 halo %s", "lane1")
+
+    err = capsys.readouterr().err
+    assert "🚗 halo lane1" in err
+    assert "test-logger-fallback" in err
+    assert handler.dropped == 0
+
+
+def test_with_listener_records_go_to_queue(monkeypatch, capsys):
+    log_queue = queue.Queue(maxsize=1)
+    monkeypatch.setattr(log_module, "_listener_running", True)
+    monkeypatch.setattr(log_module, "get_queue", lambda: log_queue)
+    handler = DroppingQueueHandler()
+    log = _logger(handler)
+
+    log.info("satu")
+    log.info("dua")
+
+    assert capsys.readouterr().err == ""
+    assert log_queue.get_nowait().msg == "satu"
+    # Queue penuh: dibuang & dihitung, tidak ke stderr
+    assert handler.dropped == 1
@@ -0,0 +1,172 @@
+import queue
+
+import pytest
+import requests
+
+from dispenser_carwash.processes.main_process import NetworkManager
+from dispenser_carwash.processes.network_process import (
+    _send_chunk,
+    drain_outbox,
+)
+from dispenser_carwash.utils import retry_policy
+from dispenser_carwash.utils.outbox import TicketOutbox
+
+URL = "http://server.test/api/tickets"
+BATCH_URL = "http://server.test/api/tickets/batch"
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Error", response=self
+            )
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """
+    Pengganti requests.Session: endpoint batch menolak tiket di
+    `rejected`, batch=False berarti endpoint batch 404.
+    """
+
+    def __init__(self, batch=True, rejected=()):
+        self.batch = batch
+        self.rejected = set(rejected)
+        self.calls = []
+
+    def request(self, method, url, timeout=None, json=None):
+        self.calls.append((url, json))
+        if url == BATCH_URL:
+            if not self.batch:
+                return FakeResponse(404, {"detail": "Not Found"})
+            results = []
+            for ticket in json["tickets"]:
+                number = str(ticket["ticket_number"])
+                status = "error" if number in self.rejected else "ok"
+                results.append(
+                    {
+                        "ticket_number": number,
+                        "status": status,
+                        "detail": "ditolak",
+                    }
+                )
+            return FakeResponse(200, {"results": results})
+        return FakeResponse(
+            200,
+            {"status": "ok", "ticket_number": json["ticket_number"]},
+        )
+
+    def urls(self):
+        return [url for url, _ in self.calls]
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    # Breaker & budget global per proses, jangan bocor antar test
+    monkeypatch.setattr(retry_policy, "_breakers", {})
+    monkeypatch.setattr(retry_policy, "_budget", None)
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = TicketOutbox(str(tmp_path / "outbox.sqlite3"))
+    yield box
+    box.close()
+
+
+def _ticket(i):
+    return {
+        "ticket_number": f"{i:013d}",
+        "time_in": "2025-11-20 15:45:01",
+        "service_name": "Basic",
+        "price": 25000,
+    }
+
+
+def _fill(outbox, n):
+    return [outbox.put(_ticket(i), f"lane1:{i}") for i in range(n)]
+
+
+def _drain_queue(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+
+def _net(session):
+    return NetworkManager(
+        URL, retries=1, delay=0, session=session, batch_url=BATCH_URL
+    )
+
+
+def test_send_chunk_acks_only_accepted_tickets(outbox):
+    ids = _fill(outbox, 4)
+    session = FakeSession(rejected={_ticket(1)["ticket_number"]})
+    from_net = queue.Queue()
+
+    acked = _send_chunk(
+        _net(session), outbox, outbox.pending(limit=4), from_net
+    )
+
+    assert acked == 3
+    assert [row[0] for row in outbox.pending()] == [ids[1]]
+    replies = {
+        r["correlation_id"]: r["status"]
+        for r in _drain_queue(from_net)
+    }
+    assert replies == {
+        "lane1:0": "ok",
+        "lane1:1": "error",
+        "lane1:2": "ok",
+        "lane1:3": "ok",
+    }
+
+
+def test_drain_skips_rejected_and_continues(outbox):
+    ids = _fill(outbox, 5)
+    session = FakeSession(
+        rejected={
+            _ticket(0)["ticket_number"],
+            _ticket(3)["ticket_number"],
+        }
+    )
+
+    sent = drain_outbox(
+        _net(session), outbox, queue.Queue(), batch_size=2
+    )
+
+    # Tiket yang ditolak tidak memblok batch berikutnya
+    assert sent == 3
+    assert [row[0] for row in outbox.pending()] == [ids[0], ids[3]]
+    assert session.urls() == [BATCH_URL] * 3
+
+
+def test_drain_falls_back_to_single_post_after_404(outbox):
+    _fill(outbox, 3)
+    session = FakeSession(batch=False)
+    net = _net(session)
+    from_net = queue.Queue()
+
+    sent = drain_outbox(net, outbox, from_net, batch_size=10)
+
+    assert sent == 3
+    assert outbox.count() == 0
+    assert not net.supports_batch()
+    assert session.urls() == [BATCH_URL, URL, URL, URL]
+    statuses = [r["status"] for r in _drain_queue(from_net)]
+    # Batch gagal dilaporkan dulu, lalu tiap tiket ok lewat POST biasa
+    assert statuses == ["error"] * 3 + ["ok"] * 3
+
+    # Putaran berikutnya langsung per tiket, batch tidak dicoba lagi
+    _fill(outbox, 1)
+    drain_outbox(net, outbox, from_net, batch_size=10)
+    assert session.urls()[-1] == URL
+    assert session.urls().count(BATCH_URL) == 1
@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+from gpiozero import LED
+
+from dispenser_carwash.hardware.out_bool import OutputGpio
+from dispenser_carwash.hardware.output_scheduler import (
+    OutputScheduler,
+)
+from dispenser_carwash.hardware.simulation import use_mock_pins
+
+PIN = 20
+
+
+@pytest.fixture
+def output():
+    factory = use_mock_pins()
+    scheduler = OutputScheduler("test-output")
+    out = OutputGpio(LED(PIN), scheduler)
+    pin = factory.pin(PIN)
+    yield out, pin
+    out.close()
+    scheduler.stop()
+
+
+def _changes_after(pin, seconds: float) -> list:
+    pin.clear_states()
+    time.sleep(seconds)
+    return [s.state for s in pin.states[1:]]
+
+
+def test_turn_off_stops_running_blink(output):
+    out, pin = output
+    out.blink(0.01, 0.01)
+    time.sleep(0.055)
+
+    out.turn_off()
+
+    assert not out.readState()
+    assert not out.is_scheduled()
+    assert _changes_after(pin, 0.1) == []
+
+
+def test_cancel_stops_pulse(output):
+    out, pin = output
+    out.firePulse(0.05)
+    assert out.readState()
+    assert out.is_scheduled()
+
+    out.cancel()
+
+    # cancel() tidak menyentuh pin: tetap on, pulse tidak mematikannya
+    assert _changes_after(pin, 0.1) == []
+    assert out.readState()
+
+
+def test_pulse_completes(output):
+    out, _ = output
+    out.firePulse(0.02)
+    time.sleep(0.08)
+    assert not out.readState()
+    assert not out.is_scheduled()
+
+
+def test_cancel_racing_blink_steps_never_restarts(output):
+    # Cancel tepat saat step blink sedang jalan di thread scheduler:
+    # step yang sudah keluar dari heap tidak boleh menjadwal ulang blink
+    out, pin = output
+    stop = threading.Event()
+
+    def hammer():
+        while not stop.is_set():
+            out.blink(0.001, 0.001)
+            time.sleep(0.0015)
+            out.turn_off()
+
+    thread = threading.Thread(target=hammer)
+    thread.start()
+    time.sleep(0.3)
+    stop.set()
+    thread.join()
+
+    assert not out.readState()
+    assert _changes_after(pin, 0.05) == []
+    assert not out.is_scheduled()
+
+
+class _PausingDriver:
+    """LED palsu: off() pertama dari thread scheduler berhenti sebentar."""
+
+    def __init__(self):
+        self.is_lit = False
+        self.ops = []
+        self.paused = threading.Event()
+
+    def on(self):
+        self.is_lit = True
+        self.ops.append("on")
+
+    def off(self):
+        self.is_lit = False
+        self.ops.append("off")
+        if (
+            threading.current_thread().name == "test-pause"
+            and not self.paused.is_set()
+        ):
+            self.paused.set()
+            time.sleep(0.05)
+
+    def close(self):
+        pass
+
+
+def test_turn_off_during_blink_step_wins():
+    scheduler = OutputScheduler("test-pause")
+    driver = _PausingDriver()
+    out = OutputGpio(driver, scheduler)
+    try:
+        out.blink(0.01, 0.01)
+        assert driver.paused.wait(1.0)
+
+        # Step blink sedang di tengah jalan (sudah lolos cek generasi)
+        out.turn_off()
+        marker = len(driver.ops)
+        time.sleep(0.1)
+
+        assert driver.ops[marker:] == []
+        assert not driver.is_lit
+    finally:
+        scheduler.stop()
+
+
+def test_blink_n_times_ends_off(output):
+    out, pin = output
+    pin.clear_states()
+    out.blink(0.01, 0.01, n=3)
+    time.sleep(0.12)
+
+    states = [s.state for s in pin.states[1:]]
+    assert states == [True, False] * 3
+    assert not out.is_scheduled()
@@ -0,0 +1,84 @@
+import pytest
+
+from dispenser_carwash.utils.outbox import TicketOutbox
+
+
+def _payload(n: int) -> dict:
+    return {
+        "ticket_number": f"89901{n:07d}0",
+        "time_in": "2025-11-20 15:45:01",
+        "service_name": "Complete",
+        "price": 35000,
+    }
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = TicketOutbox(tmp_path / "outbox.sqlite3")
+    yield box
+    box.close()
+
+
+def test_pending_oldest_first(outbox):
+    ids = [
+        outbox.put(_payload(n), correlation_id=f"c{n}")
+        for n in range(3)
+    ]
+
+    pending = outbox.pending()
+
+    assert [row[0] for row in pending] == ids
+    assert pending[0][1] == _payload(0)
+    assert pending[0][2] == "c0"
+    assert outbox.count() == 3
+
+
+def test_same_ticket_is_stored_once(outbox):
+    first = outbox.put(_payload(1))
+    again = outbox.put(_payload(1), correlation_id="replay")
+
+    assert again == first
+    assert outbox.count() == 1
+
+
+def test_ack_removes_ticket(outbox):
+    keep = outbox.put(_payload(1))
+    done = outbox.put(_payload(2))
+
+    outbox.ack(done)
+
+    assert outbox.contains(keep)
+    assert not outbox.contains(done)
+    assert [row[0] for row in outbox.pending()] == [keep]
+
+
+def test_pending_limit_and_after_id(outbox):
+    ids = [outbox.put(_payload(n)) for n in range(5)]
+
+    assert [row[0] for row in outbox.pending(limit=2)] == ids[:2]
+    assert [
+        row[0] for row in outbox.pending(limit=2, after_id=ids[1])
+    ] == ids[2:4]
+    assert outbox.pending(after_id=ids[-1]) == []
+
+
+def test_survives_reopen(tmp_path):
+    path = tmp_path / "outbox.sqlite3"
+    box = TicketOutbox(path)
+    outbox_id = box.put(_payload(7), correlation_id="lane1:1")
+    box.mark_attempt(outbox_id)
+    box.close()
+
+    reopened = TicketOutbox(path)
+    try:
+        assert reopened.pending() == [
+            (outbox_id, _payload(7), "lane1:1")
+        ]
+    finally:
+        reopened.close()
+
+
+def test_oldest_age(outbox):
+    assert outbox.oldest_age() == 0.0
+    outbox.put(_payload(1))
+    assert outbox.oldest_age() >= 0.0
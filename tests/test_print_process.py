@@ -0,0 +1,132 @@
+import logging
+import queue
+import threading
+
+import pytest
+
+from dispenser_carwash.hardware.printer import RT_PAPER
+from dispenser_carwash.processes.print_process import (
+    install_metrics,
+    print_process,
+)
+from dispenser_carwash.utils import metrics as metrics_module
+from dispenser_carwash.utils.logger import (
+    set_drop_hook,
+    worker_configurer,
+)
+from dispenser_carwash.utils.metrics import CarwashMetrics
+
+PAYLOAD = {
+    "ticket_number": "8990100000017",
+    "time_in": "2025-11-20 15:45:01",
+    "service_name": "Complete",
+    "price": 35000,
+}
+PAPER_OUT = 0x72
+
+
+@pytest.fixture
+def spooler(usb_bus):
+    to_print, from_print = queue.Queue(), queue.Queue()
+    thread = threading.Thread(
+        target=print_process,
+        args=(0x28E9, 0x0289, to_print, from_print),
+        daemon=True,
+    )
+
+    def start():
+        thread.start()
+        return to_print, from_print
+
+    yield start
+    if thread.is_alive():
+        to_print.put("__STOP__")
+        thread.join(timeout=5)
+
+
+def _next(from_print, key):
+    """Pesan berikutnya yang punya key (status printer / hasil job)."""
+    while True:
+        message = from_print.get(timeout=5)
+        if key in message:
+            return message
+
+
+def test_one_bulk_write_per_ticket(usb_bus, spooler):
+    to_print, from_print = spooler()
+    assert _next(from_print, "printer")["printer"].ready
+
+    for n in range(3):
+        to_print.put({"job_id": n, "payload": PAYLOAD})
+    results = [_next(from_print, "job_id") for _ in range(3)]
+
+    assert [r["status"] for r in results] == ["ok"] * 3
+    writes = usb_bus.writes()
+    assert len(writes) == 3
+    for buffer in writes:
+        assert PAYLOAD["ticket_number"].encode() in buffer
+        assert b"Complete" in buffer
+
+
+def test_not_ready_printer_refuses_then_recovers(usb_bus, spooler):
+    usb_bus.status[RT_PAPER] = PAPER_OUT
+    to_print, from_print = spooler()
+    status = _next(from_print, "printer")["printer"]
+    assert not status.ready and status.paper_out
+
+    # Kertas diisi lagi: job pertama masih ditolak (status terakhir),
+    # tapi gagal = health.wake() -> status baru dipublikasikan
+    usb_bus.status[RT_PAPER] = 0x12
+    to_print.put({"job_id": "held", "payload": PAYLOAD})
+    refused = _next(from_print, "job_id")
+    assert refused["status"] == "error"
+    assert "kertas habis" in refused["detail"]
+    assert usb_bus.writes() == []
+
+    assert _next(from_print, "printer")["printer"].ready
+    to_print.put({"job_id": "after", "payload": PAYLOAD})
+    assert _next(from_print, "job_id")["status"] == "ok"
+    assert len(usb_bus.writes()) == 1
+
+
+def test_disconnected_printer_fails_fast(usb_bus, spooler):
+    usb_bus.present = False
+    to_print, from_print = spooler()
+    assert not _next(from_print, "printer")["printer"].connected
+
+    to_print.put({"job_id": 1, "payload": PAYLOAD})
+    result = _next(from_print, "job_id")
+
+    assert result["status"] == "error"
+    assert result["duration"] < 0.5
+    assert usb_bus.writes() == []
+
+
+def test_invalid_job_is_skipped(usb_bus, spooler):
+    to_print, from_print = spooler()
+    _next(from_print, "printer")
+
+    to_print.put({"job_id": 1})
+    to_print.put({"job_id": 2, "payload": PAYLOAD})
+
+    assert _next(from_print, "job_id")["job_id"] == 2
+
+
+def test_dropped_logs_counted_under_print_label(monkeypatch):
+    metrics = CarwashMetrics(["lane1", "lane2"])
+    monkeypatch.setattr(metrics_module, "_metrics", metrics)
+    handler = worker_configurer()
+    full = queue.Queue(maxsize=1)
+    full.put_nowait(None)
+    monkeypatch.setattr(handler, "queue", full)
+
+    install_metrics("lane2")
+    try:
+        handler.enqueue(logging.makeLogRecord({"msg": "dibuang"}))
+    finally:
+        set_drop_hook(None)
+
+    dropped = metrics.log_dropped
+    assert dropped.labels("print-lane2").value() == 1
+    assert dropped.labels("print-lane1").value() == 0
+    assert dropped.labels("main").value() == 0
@@ -0,0 +1,109 @@
+import queue
+
+import pytest
+
+from dispenser_carwash.hardware.printer import (
+    RT_PAPER,
+    PrinterStatus,
+    PrinterUnavailable,
+    UsbEscposDriver,
+)
+from dispenser_carwash.hardware.printer_health import (
+    PrinterHealthMonitor,
+)
+
+OK = 0x12  # bit 1 & 4 selalu 1
+
+
+@pytest.mark.parametrize(
+    "printer, offline_cause, paper, expected",
+    [
+        (OK, OK, OK, dict(online=True, paper_near_end=False)),
+        # DLE EOT 4 bit 2-3: sensor kertas hampir habis
+        (OK, OK, 0x1E, dict(paper_near_end=True, paper_out=False)),
+        # DLE EOT 4 bit 5-6: kertas habis
+        (OK, OK, 0x72, dict(paper_out=True)),
+        # DLE EOT 2 bit 5: berhenti karena kertas habis
+        (OK, 0x32, OK, dict(paper_out=True)),
+        # DLE EOT 1 bit 3: offline
+        (0x1A, OK, OK, dict(online=False)),
+        # DLE EOT 2 bit 2: cover terbuka
+        (OK, 0x16, OK, dict(cover_open=True)),
+    ],
+)
+def test_from_bytes_decodes_status(
+    printer, offline_cause, paper, expected
+):
+    status = PrinterStatus.from_bytes(printer, offline_cause, paper)
+
+    assert status.connected
+    for name, value in expected.items():
+        assert getattr(status, name) == value
+
+
+def test_ready_only_when_printable():
+    assert PrinterStatus.from_bytes(OK, OK, OK).ready
+    # Hampir habis masih bisa cetak
+    near_end = PrinterStatus.from_bytes(OK, OK, 0x1E)
+    assert near_end.ready
+    assert "hampir habis" in near_end.describe()
+
+    assert not PrinterStatus.from_bytes(OK, OK, 0x72).ready
+    assert not PrinterStatus.from_bytes(0x1A, OK, OK).ready
+    assert not PrinterStatus.from_bytes(OK, 0x16, OK).ready
+    assert not PrinterStatus(connected=False).ready
+    # Printer tidak menjawab status: dianggap siap
+    assert PrinterStatus(connected=True).ready
+
+
+def test_query_status_reads_dle_eot(usb_bus):
+    usb_bus.status[RT_PAPER] = 0x1E
+    driver = UsbEscposDriver(vid=0x28E9, pid=0x0289)
+
+    status = driver.query_status()
+
+    assert status.paper_near_end and status.ready
+    # Query status tidak ikut tercatat sebagai data cetak
+    assert usb_bus.writes() == []
+
+
+def test_monitor_reconnects_before_next_print(usb_bus):
+    usb_bus.present = False
+    driver = UsbEscposDriver(vid=0x28E9, pid=0x0289)
+    changes = queue.Queue()
+    # Interval panjang: poll hanya lewat start() & wake()
+    monitor = PrinterHealthMonitor(driver, changes.put, interval=60)
+    monitor.start()
+    try:
+        assert not changes.get(timeout=2).connected
+
+        # Print path tidak pernah reconnect sendiri
+        with pytest.raises(PrinterUnavailable):
+            driver.write_raw(b"tiket")
+        assert usb_bus.devices == []
+
+        usb_bus.present = True
+        monitor.wake()
+        status = changes.get(timeout=2)
+        assert status.connected and status.ready
+        assert len(usb_bus.devices) == 1
+
+        driver.write_raw(b"tiket")
+        # Cetak memakai handle yang sudah dibuka monitor
+        assert len(usb_bus.devices) == 1
+        assert usb_bus.writes() == [b"tiket"]
+    finally:
+        monitor.stop()
+        driver.close()
+
+
+def test_monitor_marks_unplugged_printer(usb_bus):
+    driver = UsbEscposDriver(vid=0x28E9, pid=0x0289)
+    monitor = PrinterHealthMonitor(driver, interval=60)
+    assert monitor.poll().ready
+
+    usb_bus.present = False
+
+    assert not monitor.poll().connected
+    assert not driver.connected
+    assert monitor.status == PrinterStatus(connected=False)
@@ -0,0 +1,137 @@
+import random
+
+import pytest
+
+from dispenser_carwash.utils.retry_policy import (
+    CircuitBreaker,
+    CircuitState,
+    RetryBudget,
+    RetryPolicy,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class EdgeRandom(random.Random):
+    """uniform() selalu ambil batas atas, untuk cek cap backoff."""
+
+    def uniform(self, a, b):
+        return b
+
+
+def test_breaker_full_cycle():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "test", failure_threshold=3, reset_timeout=10, clock=clock
+    )
+
+    # CLOSED: gagal di bawah threshold masih boleh request
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    clock.advance(9.9)
+    assert not breaker.allow_request()
+
+    # Setelah reset_timeout: HALF_OPEN, hanya satu probe
+    clock.advance(0.1)
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+
+def test_breaker_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, reset_timeout=5, clock=clock
+    )
+    breaker.record_failure()
+    clock.advance(5)
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    # Timeout dihitung ulang dari probe yang gagal
+    clock.advance(4)
+    assert not breaker.allow_request()
+    clock.advance(1)
+    assert breaker.allow_request()
+
+
+def test_retry_budget_runs_out_and_refills():
+    clock = FakeClock()
+    budget = RetryBudget(
+        ratio=0.5, min_per_second=0.1, max_tokens=2, clock=clock
+    )
+
+    assert budget.try_spend()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    # Dua request pertama menabung 2 * 0.5 = 1 token retry
+    budget.record_request()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    # Isi ulang minimum: 0.1 token/detik
+    clock.advance(9)
+    assert not budget.try_spend()
+    clock.advance(1)
+    assert budget.try_spend()
+
+
+def test_retry_budget_capped_at_max_tokens():
+    clock = FakeClock()
+    budget = RetryBudget(
+        ratio=1, min_per_second=1, max_tokens=3, clock=clock
+    )
+    for _ in range(10):
+        budget.record_request()
+    clock.advance(100)
+
+    spent = 0
+    while budget.try_spend():
+        spent += 1
+    assert spent == 3
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_backoff_full_jitter_within_bounds(seed):
+    policy = RetryPolicy(
+        base_delay=0.5, max_delay=3, rng=random.Random(seed)
+    )
+
+    for attempt in range(1, 8):
+        cap = min(3, 0.5 * 2 ** (attempt - 1))
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0 <= d <= cap for d in delays)
+        # Full jitter: tersebar di seluruh rentang, bukan di dekat cap saja
+        assert min(delays) < cap * 0.1
+        assert max(delays) > cap * 0.9
+
+
+def test_backoff_cap_grows_then_saturates():
+    policy = RetryPolicy(base_delay=1, max_delay=5, rng=EdgeRandom())
+
+    assert [policy.backoff(n) for n in range(1, 6)] == [1, 2, 4, 5, 5]
@@ -0,0 +1,165 @@
+import pytest
+
+from dispenser_carwash.processes.service_catalog import ServiceCatalog
+
+BUTTON_MAP = {"service_1": 1, "service_2": 2}
+SOUND_MAP = {1: "service_basic"}
+BUTTONS = ("service_1", "service_2", "service_3")
+
+
+def _catalog(service_data, **kwargs):
+    kwargs.setdefault("button_map", BUTTON_MAP)
+    kwargs.setdefault("sound_map", SOUND_MAP)
+    kwargs.setdefault("buttons", BUTTONS)
+    return ServiceCatalog.from_service_data(service_data, **kwargs)
+
+
+def test_lookup_by_id_and_button():
+    catalog = _catalog(
+        [
+            {"id": 1, "name": "Basic", "price": 25000},
+            {"id": 2, "name": " Complete ", "price": 35000},
+        ]
+    )
+
+    basic = catalog.get(1)
+    assert basic.name == "Basic"
+    assert basic.button == "service_1"
+    assert basic.sound == "service_basic"
+    assert catalog.for_button("service_2").name == "Complete"
+    assert catalog.buttons() == ("service_1", "service_2")
+    assert len(catalog) == 2
+
+
+def test_fields_from_service_data_override_settings():
+    catalog = _catalog(
+        [
+            {
+                "id": 1,
+                "name": "Basic",
+                "price": 1,
+                "button": "service_3",
+                "sound": "x",
+            }
+        ]
+    )
+    record = catalog.get(1)
+    assert (record.button, record.sound) == ("service_3", "x")
+
+
+def test_price_keeps_original_value():
+    catalog = _catalog(
+        [
+            {"id": 1, "name": "Basic", "price": "25000"},
+            {"id": 2, "name": "Complete", "price": 35000.0},
+        ]
+    )
+
+    assert catalog.get(1).price == "25000"
+    assert catalog.get(1).amount == 25000
+    assert isinstance(catalog.get(2).price, float)
+    assert catalog.get(2).amount == 35000
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        {"name": "Tanpa id", "price": 1},
+        {"id": "x", "name": "Id bukan angka", "price": 1},
+        {"id": 3, "name": "  ", "price": 1},
+        {"id": 3, "name": "Tanpa harga"},
+        {"id": 3, "name": "Harga teks", "price": "murah"},
+        {"id": 3, "name": "Harga negatif", "price": -1},
+        {"id": 3, "name": "Harga NaN", "price": "nan"},
+        {"id": 3, "name": "Harga bool", "price": True},
+    ],
+)
+def test_invalid_entries_are_skipped(item):
+    catalog = _catalog([{"id": 1, "name": "Basic", "price": 1}, item])
+    assert len(catalog) == 1
+
+
+@pytest.mark.parametrize(
+    "button",
+    ["input_loop", "gate_controller", "printer", "service_9"],
+)
+def test_unknown_button_is_rejected(button):
+    catalog = _catalog(
+        [
+            {"id": 1, "name": "Basic", "price": 1},
+            {
+                "id": 2,
+                "name": "Complete",
+                "price": 2,
+                "button": button,
+            },
+        ]
+    )
+
+    assert catalog.get(2) is None
+    assert button not in catalog.buttons()
+
+
+def test_default_buttons_come_from_button_pins():
+    catalog = ServiceCatalog.from_service_data(
+        [
+            {
+                "id": 1,
+                "name": "Basic",
+                "price": 1,
+                "button": "input_loop",
+            }
+        ]
+    )
+    assert catalog is None
+
+
+def test_duplicate_id_and_button_keep_first():
+    catalog = _catalog(
+        [
+            {"id": 1, "name": "Basic", "price": 1},
+            {"id": 1, "name": "Basic lagi", "price": 2},
+            {
+                "id": 5,
+                "name": "Rebut tombol",
+                "price": 3,
+                "button": "service_1",
+            },
+        ]
+    )
+
+    assert catalog.get(1).name == "Basic"
+    assert catalog.for_button("service_1").id == 1
+    assert catalog.get(5).button == "service_1"
+
+
+@pytest.mark.parametrize("service_data", [None, [], [{"id": 1}]])
+def test_no_valid_service_returns_none(service_data):
+    assert _catalog(service_data) is None
+
+
+def test_changes_from():
+    old = _catalog(
+        [
+            {"id": 1, "name": "Basic", "price": 1},
+            {"id": 2, "name": "Complete", "price": 2},
+        ]
+    )
+    new = _catalog(
+        [
+            {"id": 1, "name": "Basic", "price": 1},
+            {"id": 2, "name": "Complete", "price": 3},
+            {"id": 3, "name": "Perfect", "price": 4},
+        ]
+    )
+
+    assert new.changes_from(None) == ["3 service dimuat"]
+    assert new.changes_from(old) == [
+        "~ Complete 2 -> Complete 3",
+        "+ Perfect (4)",
+    ]
+    assert old.changes_from(new) == [
+        "~ Complete 3 -> Complete 2",
+        "- Perfect",
+    ]
+    assert new.changes_from(new) == []
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from dispenser_carwash.processes.main_process import TicketGenerator
+from dispenser_carwash.utils import ean13
+from dispenser_carwash.utils.ticket_sequence import TicketSequence
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "ticket_sequence"
+
+
+def test_next_is_consecutive(path):
+    sequence = TicketSequence(path, block_size=10)
+    assert [sequence.next() for _ in range(25)] == list(range(1, 26))
+    assert sequence.reserved() == 30
+
+
+def test_one_write_per_block(path, monkeypatch):
+    sequence = TicketSequence(path, block_size=10)
+    writes = []
+    persist = sequence._persist
+    monkeypatch.setattr(
+        sequence,
+        "_persist",
+        lambda reserved: (writes.append(reserved), persist(reserved)),
+    )
+
+    for _ in range(25):
+        sequence.next()
+
+    assert writes == [10, 20, 30]
+
+
+def test_restart_skips_rest_of_block(path):
+    sequence = TicketSequence(path, block_size=10)
+    issued = [sequence.next() for _ in range(3)]
+
+    restarted = TicketSequence(path, block_size=10)
+
+    assert restarted.next() == 11
+    assert restarted.next() not in issued
+
+
+def test_crash_before_commit_never_reuses_numbers(path):
+    sequence = TicketSequence(path, block_size=5)
+    issued = [sequence.next() for _ in range(5)]
+
+    def crash():
+        raise OSError("power loss")
+
+    sequence.before_commit = crash
+    with pytest.raises(OSError):
+        sequence.next()
+
+    restarted = TicketSequence(path, block_size=5)
+    assert restarted.next() == 6
+    assert restarted.last() not in issued
+
+
+def test_sync_only_moves_forward(path):
+    sequence = TicketSequence(path, block_size=10)
+    sequence.sync(100)
+    sequence.sync(50)
+
+    assert sequence.last() == 100
+    assert sequence.next() == 101
+    assert TicketSequence(path).next() > 101
+
+
+def test_unique_across_threads(path):
+    sequence = TicketSequence(path, block_size=7)
+    numbers = []
+    lock = threading.Lock()
+
+    def take():
+        local = [sequence.next() for _ in range(200)]
+        with lock:
+            numbers.extend(local)
+
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(numbers) == len(set(numbers)) == 1600
+
+
+def test_generator_codes_unique_across_restart(path):
+    first = TicketGenerator(0, TicketSequence(path, block_size=10))
+    codes = [first.create_ean_ticket(service_id=2) for _ in range(4)]
+
+    # Restart, server masih melaporkan nomor lama
+    second = TicketGenerator(2, TicketSequence(path, block_size=10))
+    codes += [
+        second.create_ean_ticket(service_id=2) for _ in range(4)
+    ]
+
+    assert len(set(codes)) == len(codes)
+    assert all(ean13.is_valid(code) for code in codes)
+    assert [ean13.decode(code)[1] for code in codes[4:]] == [
+        11,
+        12,
+        13,
+        14,
+    ]
+
+
+def test_generator_follows_server_number(path):
+    generator = TicketGenerator(41, TicketSequence(path))
+    assert ean13.decode(generator.create_ean_ticket(1)) == (1, 42)
+
+    generator.sync_last_number(99)
+    assert ean13.decode(generator.create_ean_ticket(1)) == (1, 100)
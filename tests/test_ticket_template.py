@@ -0,0 +1,178 @@
+import pytest
+
+from dispenser_carwash.hardware.printer import EscposBufferDriver
+from dispenser_carwash.processes import ticket_template
+from dispenser_carwash.processes.ticket_template import (
+    TicketTemplate,
+    get_ticket_template,
+)
+
+TICKETS = [
+    {
+        "ticket_number": "8990100000036",
+        "time_in": "2025-11-20 15:45:01",
+        "service_name": "Complete",
+        "price": 25000,
+    },
+    {
+        "ticket_number": "1234567890128",
+        "time_in": "2025-11-21 08:00:59",
+        "service_name": "Hidrolik + Wax",
+        "price": "75000",
+    },
+]
+
+# Command ESC/POS yang dipakai layout: prefix -> jumlah byte argumen
+_COMMANDS = {
+    b"\x1bE": 1,  # bold
+    b"\x1bM": 1,  # font
+    b"\x1ba": 1,  # align
+    b"\x1bt": 1,  # codepage
+    b"\x1bd": 1,  # feed n baris
+    b"\x1dh": 1,  # tinggi barcode
+    b"\x1dw": 1,  # lebar barcode
+    b"\x1df": 1,  # font HRI
+    b"\x1dH": 1,  # posisi HRI
+    b"\x1dV": 1,  # cut
+}
+
+
+def _legacy_print(driver, data):
+    """Urutan panggilan driver PrintTicket.print_ticket sebelum template."""
+    driver.set(font="b", bold=True, width=2, height=2, align="center")
+    driver.text("WELCOME\n")
+    driver.text("BALI DRIVE THRU CARWASH\n")
+    driver.set(
+        font="b", bold=False, width=1, height=1, align="center"
+    )
+    driver.text("Jl. Mahendradata Selatan No.19 Denpasar, Bali\n\n")
+    driver.set(
+        font="b", bold=False, width=1, height=1, align="center"
+    )
+    driver.text(str(data["time_in"]))
+    driver.text("\n")
+    driver.barcode(
+        str(data["ticket_number"]),
+        "EAN13",
+        height=64,
+        width=2,
+        pos="BELOW",
+    )
+    driver.text("\n")
+    driver.set(font="b", bold=True, width=2, height=2, align="center")
+    driver.text(str(data["service_name"]))
+    driver.text("\n")
+    driver.set(
+        font="b", bold=False, width=1, height=1, align="center"
+    )
+    driver.text("Rp.")
+    driver.text(str(data["price"]))
+    driver.text("\n")
+    driver.cut()
+
+
+def _printed(stream: bytes):
+    """
+    Simulasi printer sederhana: hasil cetak sebagai list
+    (state printer, isi) per teks/barcode/cut. Command style yang
+    diulang tanpa perubahan tidak mengubah hasil cetak.
+    """
+    state = {}
+    printed = []
+    text = bytearray()
+
+    def flush():
+        if text:
+            printed.append(
+                (tuple(sorted(state.items())), bytes(text))
+            )
+            text.clear()
+
+    i = 0
+    while i < len(stream):
+        prefix = stream[i : i + 2]
+        if prefix == b"\x1dk":
+            flush()
+            end = stream.index(b"\x00", i + 3)
+            printed.append(
+                (tuple(sorted(state.items())), stream[i : end + 1])
+            )
+            i = end + 1
+        elif prefix in _COMMANDS:
+            size = _COMMANDS[prefix]
+            arg = stream[i + 2 : i + 2 + size]
+            if prefix in (b"\x1bd", b"\x1dV"):
+                flush()
+                printed.append((prefix, arg))
+            else:
+                # Style baru berlaku untuk teks sesudahnya
+                if state.get(prefix) != arg:
+                    flush()
+                state[prefix] = arg
+            i += 2 + size
+        elif stream[i] in (0x1B, 0x1D):
+            pytest.fail(
+                f"Command tak dikenal di offset {i}: {prefix!r}"
+            )
+        else:
+            text.append(stream[i])
+            i += 1
+    flush()
+    return printed
+
+
+@pytest.mark.parametrize("data", TICKETS)
+def test_render_prints_same_ticket_as_legacy_driver(data):
+    legacy = EscposBufferDriver()
+    _legacy_print(legacy, data)
+
+    rendered = TicketTemplate().render(data)
+
+    assert _printed(rendered) == _printed(legacy.getvalue())
+    # Template hanya membuang command style yang berulang
+    assert len(rendered) < len(legacy.getvalue())
+
+
+@pytest.mark.parametrize("data", TICKETS)
+def test_render_matches_apply_byte_for_byte(data):
+    template = TicketTemplate()
+    driver = EscposBufferDriver()
+    template.apply(driver, data)
+
+    assert template.render(data) == driver.getvalue()
+
+
+def test_compiled_parts_reused_across_renders(monkeypatch):
+    template = TicketTemplate()
+    static_parts = [
+        p for p in template._parts if isinstance(p, bytes)
+    ]
+
+    # Render tidak boleh membuat escpos Dummy lagi
+    def no_dummy(*args, **kwargs):
+        raise AssertionError("render memanggil python-escpos lagi")
+
+    monkeypatch.setattr(ticket_template, "Dummy", no_dummy)
+
+    outputs = [template.render(data) for data in TICKETS * 3]
+
+    assert outputs[0] == outputs[2] == outputs[4]
+    assert outputs[1] == outputs[3] == outputs[5]
+    # Potongan statis masih objek yang sama, tidak di-compile ulang
+    now = [p for p in template._parts if isinstance(p, bytes)]
+    assert all(a is b for a, b in zip(now, static_parts))
+    assert len(now) == len(static_parts)
+
+
+def test_default_template_compiled_once(monkeypatch):
+    monkeypatch.setattr(ticket_template, "_default_template", None)
+
+    first = get_ticket_template()
+    assert get_ticket_template() is first
+
+
+def test_render_rejects_invalid_ean13():
+    data = dict(TICKETS[0], ticket_number="12345")
+
+    with pytest.raises(ValueError):
+        TicketTemplate().render(data)